@@ -0,0 +1,1198 @@
+"""
+Benchmarks for the weather module.
+
+Each benchmark is a function named bench_<name>, and can be run from the
+command line with
+    python benchmarks.py <name> [options]
+Use "python benchmarks.py --help" to see the available benchmarks, and
+"python benchmarks.py <name> --help" to see the options for one of them.
+
+Unless WEATHER_CHECK_CONTRACTS is already set, contract checking is turned
+off before the weather module is imported: it re-validates every attribute
+of an object after every method call, which would dwarf everything these
+benchmarks are trying to measure.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import partial
+from typing import Callable, Optional, TextIO
+
+os.environ.setdefault('WEATHER_CHECK_CONTRACTS', '0')
+
+# pylint: disable=wrong-import-position
+import weather
+from weather import DailyWeather, HistoricalWeather
+
+# The first day of every synthetic history.
+FIRST_DAY = date(1970, 1, 1)
+
+
+def synthetic_statistics(rng: random.Random) \
+        -> tuple[tuple[float, float, float], tuple[float, float, float]]:
+    """Return the temperature and precipitation statistics of a plausible,
+    randomly generated day of weather, drawing random numbers from <rng>.
+
+    About a third of the days have some precipitation, and a few of those
+    have only trace amounts.
+    """
+    low = round(rng.uniform(-30.0, 25.0), 1)
+    high = round(low + rng.uniform(0.0, 15.0), 1)
+    avg = round((low + high) / 2, 1)
+
+    if rng.random() < 0.65:
+        return (avg, low, high), (0.0, 0.0, 0.0)
+    elif rng.random() < 0.1:
+        if low < 0:
+            return (avg, low, high), (-1.0, 0.0, -1.0)
+        return (avg, low, high), (-1.0, -1.0, 0.0)
+    elif low < 0:
+        snow = round(rng.uniform(0.0, 20.0), 1)
+        return (avg, low, high), (snow, 0.0, snow)
+    else:
+        rain = round(rng.uniform(0.0, 30.0), 1)
+        return (avg, low, high), (rain, rain, 0.0)
+
+
+def synthetic_weather(rng: random.Random) -> DailyWeather:
+    """Return a plausible, randomly generated day of weather, drawing random
+    numbers from <rng>. See synthetic_statistics.
+    """
+    return DailyWeather(*synthetic_statistics(rng))
+
+
+def synthetic_history(history_type: type, name: str, years: int,
+                      seed: int = 0) -> HistoricalWeather:
+    """Return a history of type <history_type> called <name>, holding
+    <years> years of consecutive synthetic daily weather.
+
+    The same <seed> always gives the same weather.
+    """
+    rng = random.Random(seed)
+    history = history_type(name, (rng.uniform(42.0, 70.0),
+                                  rng.uniform(-140.0, -53.0)))
+    first = FIRST_DAY.toordinal()
+    last = date(FIRST_DAY.year + years, 1, 1).toordinal()
+    for ordinal in range(first, last):
+        history.add_weather(date.fromordinal(ordinal), synthetic_weather(rng))
+    return history
+
+
+def write_station_csv(path: str, name: str, years: int, seed: int = 0,
+                      missing_rate: float = 0.0) -> int:
+    """Write <years> years of synthetic daily weather for a station called
+    <name> to a new csv file at <path>, in the format given in the handout,
+    and return the number of rows written.
+
+    About <missing_rate> of the days are missing data: half of those are in
+    gaps of up to two weeks of days left out of the file, and the other half
+    have one of the measurements load_data needs left blank, so that
+    load_data skips them. Trace amounts are written with a
+    "T" flag, as in the real files.
+
+    The same <seed> and <missing_rate> always give the same file.
+
+    Preconditions:
+    - 0 <= missing_rate <= 1
+    """
+    history = synthetic_history(HistoricalWeather, name, years, seed)
+    lat, long = history.coordinates
+    rng = random.Random(f'{seed}-missing')
+    needed = [weather.MAX_TEMP, weather.MIN_TEMP, weather.MEAN_TEMP,
+              weather.TOTAL_RAIN, weather.TOTAL_SNOW, weather.TOTAL_PRECIP]
+    with open(path, 'w') as f:
+        f.write('Longitude (x),Latitude (y),Station Name,Climate ID,'
+                'Date/Time,Year,Month,Day,Data Quality,Max Temp (°C),'
+                'Max Temp Flag,Min Temp (°C),Min Temp Flag,Mean Temp (°C),'
+                'Mean Temp Flag,Heat Deg Days (°C),Heat Deg Days Flag,'
+                'Cool Deg Days (°C),Cool Deg Days Flag,Total Rain (mm),'
+                'Total Rain Flag,Total Snow (cm),Total Snow Flag,'
+                'Total Precip (mm),Total Precip Flag,Snow on Grnd (cm),'
+                'Snow on Grnd Flag,Dir of Max Gust (10s deg),'
+                'Dir of Max Gust Flag,Spd of Max Gust (km/h),'
+                'Spd of Max Gust Flag\n')
+        rows = 0
+        gap = 0
+        for day in history._records:  # pylint: disable=protected-access
+            if gap > 0:
+                gap -= 1
+                continue
+            blank = None
+            chance = rng.random()
+            if chance < missing_rate / 2 / 7.5:
+                # Gaps are 7.5 days long on average.
+                gap = rng.randint(1, 14) - 1
+                continue
+            elif chance < missing_rate / 2 / 7.5 + missing_rate / 2:
+                blank = rng.choice(needed)
+
+            w = history.retrieve_weather(day)
+            precip, rain, snow = (_csv_amount(w.precipitation),
+                                  _csv_amount(w.rainfall),
+                                  _csv_amount(w.snowfall))
+            row = (f'{long:.2f},{lat:.2f},{name},{seed:07},{day},'
+                   f'{day.year},{day.month:02},{day.day:02},,'
+                   f'{w.high_temp},,{w.low_temp},,{w.avg_temp},,'
+                   f'{max(18 - w.avg_temp, 0):.1f},,'
+                   f'{max(w.avg_temp - 18, 0):.1f},,'
+                   f'{rain[0]},{rain[1]},{snow[0]},{snow[1]},'
+                   f'{precip[0]},{precip[1]},0,,,,,\n')
+            if blank is not None:
+                columns = row.split(',')
+                columns[blank] = ''
+                row = ','.join(columns)
+            f.write(row)
+            rows += 1
+    return rows
+
+
+def write_country_folder(folder: str, stations: int, years: int,
+                         missing_rate: float = 0.0) -> int:
+    """Write one synthetic station csv file per station into the existing
+    folder <folder>, each holding <years> years of data with the given
+    <missing_rate> (see write_station_csv), and return the total number of
+    rows written.
+    """
+    return sum(write_station_csv(os.path.join(folder, f'STN{i:05}.csv'),
+                                 f'STN{i:05}', years, i, missing_rate)
+               for i in range(stations))
+
+
+def _csv_amount(amount: float) -> tuple[float, str]:
+    """Return the value and flag columns of a csv file for a precipitation
+    <amount>, where -1 means trace amounts.
+    """
+    if amount == -1:
+        return 0.0, 'T'
+    else:
+        return amount, ''
+
+
+def readlines_load_data(f: TextIO) -> Optional[HistoricalWeather]:
+    """Return a HistoricalWeather record representing the weather data in the
+    already open csv file <f>, the way load_data used to: by reading the whole
+    file into a list of lines, walking it twice, splitting every column of
+    every line, and building a DailyWeather for every row.
+
+    This is kept only as a baseline for bench_load.
+    """
+    lines = f.readlines()[1:]
+    if not lines:
+        return None
+
+    for line in lines:
+        data = line.split(',')
+        if data[weather.STN_NAME]:
+            try:
+                result = HistoricalWeather(data[weather.STN_NAME],
+                                           (float(data[weather.LAT]),
+                                            float(data[weather.LONG])))
+                break
+            except ValueError:
+                pass
+
+    for line in lines:
+        data = line.split(',')
+        try:
+            precip = weather._replace_trace(  # pylint: disable=protected-access
+                float(data[weather.TOTAL_PRECIP]),
+                data[weather.TOTAL_PRECIP_FLAG])
+            rain = weather._replace_trace(  # pylint: disable=protected-access
+                float(data[weather.TOTAL_RAIN]), data[weather.TOTAL_RAIN_FLAG])
+            snow = weather._replace_trace(  # pylint: disable=protected-access
+                float(data[weather.TOTAL_SNOW]), data[weather.TOTAL_SNOW_FLAG])
+            result.add_weather(
+                date(int(data[weather.YEAR]), int(data[weather.MONTH]),
+                     int(data[weather.DAY])),
+                DailyWeather((float(data[weather.MEAN_TEMP]),
+                              float(data[weather.MIN_TEMP]),
+                              float(data[weather.MAX_TEMP])),
+                             (precip, rain, snow)))
+        except ValueError:
+            pass
+
+    return result
+
+
+def _measure_memory(build: Callable[[], object]) -> tuple[int, float]:
+    """Return the number of bytes still allocated after calling <build>,
+    while the result of the call is alive, and how long the call took in
+    seconds.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return allocated, elapsed
+
+
+def bench_memory(stations: int, years: int) -> None:
+    """Compare the memory needed to hold <stations> histories of <years>
+    years each, using a dictionary of DailyWeather objects and using columns.
+    """
+    days = stations * (date(FIRST_DAY.year + years, 1, 1) - FIRST_DAY).days
+    print(f'{stations} stations x {years} years = {days} station-days')
+    for history_type in (HistoricalWeather, weather.ColumnarWeather):
+        allocated, elapsed = _measure_memory(
+            lambda t=history_type: [synthetic_history(t, f'STN{i}', years, i)
+                                    for i in range(stations)])
+        print(f'{history_type.__name__ : <20} {allocated / 2 ** 20 : >10.1f} '
+              f'MiB {allocated / days : >8.1f} bytes/day '
+              f'(built in {elapsed:.1f}s)')
+
+
+class DictDailyWeather:
+    """A day of weather laid out the way DailyWeather was before it used
+    __slots__, with its attributes in a per-instance __dict__.
+
+    This is kept only as a baseline for bench_daily_weather.
+    """
+    avg_temp: float
+    low_temp: float
+    high_temp: float
+    precipitation: float
+    rainfall: float
+    snowfall: float
+
+    def __init__(self, temperature_statistics: tuple[float, float, float],
+                 precipitation_statistics: tuple[float, float, float]) -> None:
+        self.avg_temp = temperature_statistics[0]
+        self.low_temp = temperature_statistics[1]
+        self.high_temp = temperature_statistics[2]
+        self.precipitation = precipitation_statistics[0]
+        self.rainfall = precipitation_statistics[1]
+        self.snowfall = precipitation_statistics[2]
+
+
+def bench_daily_weather(stations: int, years: int) -> None:
+    """Report the bytes per day needed for one DailyWeather per day, for
+    <stations> stations of <years> years of synthetic weather each: with
+    the old __dict__ layout, with __slots__, and with __slots__ and dry days
+    shared by interned_weather.
+
+    Only the DailyWeather objects themselves are counted; their values are
+    made beforehand. Contract checking gives every DailyWeather a __dict__
+    on top of its __slots__, so run with WEATHER_CHECK_CONTRACTS=1 to see
+    what that costs.
+    """
+    rng = random.Random(0)
+    days = [synthetic_statistics(rng) for _ in range(
+        stations * (date(FIRST_DAY.year + years, 1, 1) - FIRST_DAY).days)]
+    dry = sum(1 for _, precipitation in days if precipitation == (0, 0, 0))
+    print(f'{len(days)} days, {dry} with no precipitation, contracts '
+          f'{"on" if weather.CHECK_CONTRACTS else "off"}')
+    if '__dict__' in DailyWeather.__slots__:
+        print('DailyWeather has a __dict__ for contract checking, so '
+              '__slots__ saves no memory')
+
+    layouts = [('__dict__', DictDailyWeather),
+               ('__slots__', DailyWeather),
+               ('__slots__ + interned', weather.interned_weather)]
+    for label, make in layouts:
+        # pylint: disable=protected-access
+        weather._DRY_DAYS.clear()
+        allocated, elapsed = _measure_memory(
+            lambda m=make: [m(temperatures, precipitation)
+                            for temperatures, precipitation in days])
+        # The list holding the objects is not part of their cost.
+        allocated -= sys.getsizeof([None] * len(days))
+        print(f'{label : <22} {allocated / len(days) : >8.1f} bytes/day '
+              f'(built in {elapsed:.2f}s)')
+    weather._DRY_DAYS.clear()  # pylint: disable=protected-access
+
+
+def bench_load(years: int, repeat: int) -> None:
+    """Compare the throughput and peak memory of the old readlines loader
+    with load_data, on a synthetic station file of <years> years of data.
+    """
+    loaders = [('readlines', readlines_load_data),
+               ('load_data', weather.load_data),
+               ('load_data columnar',
+                lambda f: weather.load_data(f, columnar=True))]
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'station.csv')
+        rows = write_station_csv(path, 'STN', years)
+        size = os.path.getsize(path)
+        print(f'{rows} rows, {size / 2 ** 20:.1f} MiB')
+
+        for label, loader in loaders:
+            best = None
+            for _ in range(repeat):
+                with open(path) as f:
+                    start = time.perf_counter()
+                    loader(f)
+                    elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+
+            with open(path) as f:
+                tracemalloc.start()
+                history = loader(f)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                del history
+
+            print(f'{label : <20} {rows / best : >10.0f} rows/s '
+                  f'{peak / 2 ** 20 : >8.1f} MiB peak')
+
+
+def bench_load_country(stations: int, years: int,
+                       workers: list[int]) -> None:
+    """Time load_country on a folder of <stations> synthetic station files of
+    <years> years each, with each number of worker processes in <workers>.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        rows = write_country_folder(folder, stations, years)
+        print(f'{stations} stations, {rows} rows')
+        for count in workers:
+            start = time.perf_counter()
+            country = weather.load_country(folder, 'Synthetia',
+                                           workers=count)
+            elapsed = time.perf_counter() - start
+            del country
+            print(f'{count : >3} workers {elapsed : >8.2f}s '
+                  f'{rows / elapsed : >10.0f} rows/s')
+
+
+def bench_async_load(stations: int, years: int, delay: float,
+                     readers: list[int]) -> None:
+    """Time load_country_async on a folder of <stations> synthetic station
+    files of <years> years each, read by a stand-in for a slow network mount
+    that waits <delay> seconds before opening each file, with each number of
+    concurrent readers in <readers>. Also report the peak memory used on top
+    of the loaded Country, which should not grow with <stations>.
+    """
+    async def slow_open(path: str) -> TextIO:
+        await asyncio.sleep(delay)
+        return await asyncio.to_thread(open, path, 'r')
+
+    with tempfile.TemporaryDirectory() as folder:
+        rows = write_country_folder(folder, stations, years)
+        print(f'{stations} stations, {rows} rows, {delay * 1000:.0f} ms '
+              f'per file read')
+        for count in readers:
+            start = time.perf_counter()
+            country = asyncio.run(weather.load_country_async(
+                folder, 'Synthetia', readers=count, open_file=slow_open))
+            elapsed = time.perf_counter() - start
+            del country
+            print(f'{count : >3} readers {elapsed : >8.2f}s '
+                  f'{rows / elapsed : >10.0f} rows/s')
+
+        # Tracing slows parsing down a lot, so memory is measured apart from
+        # the timings.
+        tracemalloc.start()
+        country = asyncio.run(weather.load_country_async(
+            folder, 'Synthetia', readers=max(readers), open_file=slow_open))
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del country
+        print(f'peak memory on top of the loaded Country with {max(readers)} '
+              f'readers: {(peak - current) / 2 ** 20:.1f} MiB')
+
+
+def bench_snapshot(stations: int, years: int) -> None:
+    """Compare the time to start up from a folder of <stations> synthetic
+    station csv files of <years> years each with load_country, and from a
+    snapshot of the same data with open_snapshot.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        csv_folder = os.path.join(folder, 'csv')
+        os.mkdir(csv_folder)
+        rows = write_country_folder(csv_folder, stations, years)
+        print(f'{stations} stations, {rows} rows')
+
+        start = time.perf_counter()
+        country = weather.load_country(csv_folder, 'Synthetia')
+        print(f'{"load_country" : <32} {time.perf_counter() - start : >8.3f}s')
+
+        path = os.path.join(folder, 'synthetia.snapshot')
+        start = time.perf_counter()
+        country.save_snapshot(path)
+        print(f'{"save_snapshot" : <32} {time.perf_counter() - start : >8.3f}s '
+              f'({os.path.getsize(path) / 2 ** 20:.1f} MiB)')
+        del country
+
+        start = time.perf_counter()
+        country = weather.open_snapshot(path)
+        print(f'{"open_snapshot" : <32} {time.perf_counter() - start : >8.3f}s')
+        start = time.perf_counter()
+        country.retrieve_history('STN00000')
+        print(f'{"first retrieve_history" : <32} '
+              f'{time.perf_counter() - start : >8.3f}s')
+        start = time.perf_counter()
+        for i in range(1, stations):
+            country.retrieve_history(f'STN{i:05}')
+        print(f'{"retrieve_history for the rest" : <32} '
+              f'{time.perf_counter() - start : >8.3f}s')
+
+
+def bench_lazy(stations: int, years: int, requests: int,
+               capacities: list[int]) -> None:
+    """Compare load_country with open_country on a folder of <stations>
+    synthetic station files of <years> years each: the time to open the
+    folder, then the time and memory taken to serve <requests> random
+    retrieve_history calls, with no cap and with each cap on the number of
+    histories kept loaded in <capacities>.
+    """
+    rng = random.Random(0)
+    names = [f'STN{rng.randrange(stations):05}' for _ in range(requests)]
+
+    def serve(country: weather.Country) -> weather.Country:
+        for name in names:
+            country.retrieve_history(name).record_high(12, 25)
+        return country
+
+    with tempfile.TemporaryDirectory() as folder:
+        rows = write_country_folder(folder, stations, years)
+        print(f'{stations} stations, {rows} rows, {requests} requests')
+        print(f'{"country" : <24} {"open" : >9} {"serve" : >9} '
+              f'{"memory" : >10}')
+        openers = [('load_country',
+                    lambda: weather.load_country(folder, 'Synthetia'))]
+        openers += [(f'open_country cap={capacity}',
+                     partial(weather.open_country, folder, 'Synthetia',
+                             capacity=capacity))
+                    for capacity in [None] + capacities]
+        for label, opener in openers:
+            start = time.perf_counter()
+            country = opener()
+            opened = time.perf_counter() - start
+            start = time.perf_counter()
+            serve(country)
+            served = time.perf_counter() - start
+            del country
+            allocated, _ = _measure_memory(lambda: serve(opener()))
+            print(f'{label : <24} {opened : >8.3f}s {served : >8.3f}s '
+                  f'{allocated / 2 ** 20 : >6.1f} MiB')
+
+
+def bench_registry(countries: int, stations: int, years: int,
+                   n: int) -> None:
+    """Compare the memory held by a WeatherRegistry of <countries> synthetic
+    countries, each a folder of <stations> station files of <years> years,
+    loaded with and without INTERN_DATES, and time a global top-<n>
+    snowiest query across them.
+
+    Load times are slowed down by measuring memory at the same time.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        folders = []
+        rows = 0
+        for i in range(countries):
+            folders.append(os.path.join(folder, f'country{i}'))
+            os.mkdir(folders[-1])
+            rows += write_country_folder(folders[-1], stations, years)
+        print(f'{countries} countries, {countries * stations} stations, '
+              f'{rows} rows')
+
+        built = []
+
+        def build() -> weather.WeatherRegistry:
+            registry = weather.WeatherRegistry()
+            for i, country_folder in enumerate(folders):
+                registry.add_country(weather.load_country(
+                    country_folder, f'Country {i}'))
+            built.append(registry)
+            return registry
+
+        answers = []
+        for intern in (False, True):
+            weather.INTERN_DATES = intern
+            try:
+                allocated, elapsed = _measure_memory(build)
+            finally:
+                weather.INTERN_DATES = False
+            registry = built.pop()
+            start = time.perf_counter()
+            answers.append(registry.snowiest_locations(n))
+            query = time.perf_counter() - start
+            del registry
+            print(f'{"interned" if intern else "fresh" : <9} dates '
+                  f'{allocated / 2 ** 20 : >8.1f} MiB '
+                  f'{allocated / rows : >6.1f} B/row, load {elapsed : .2f}s, '
+                  f'top {n} {query * 1000 : .1f} ms')
+        assert answers[0] == answers[1]
+
+
+def bench_bulk(rows: int, repeat: int) -> None:
+    """Compare recording <rows> days of synthetic weather, in date order,
+    one add_weather_values call per day with one add_weather_many call, for
+    each kind of history. Each time is the best of <repeat> runs.
+
+    Run with WEATHER_CHECK_CONTRACTS=1 (and far fewer rows) to see the
+    effect of checking representation invariants once per batch.
+    """
+    rng = random.Random(0)
+    first = FIRST_DAY.toordinal()
+    days = [(date.fromordinal(first + i),) + synthetic_statistics(rng)
+            for i in range(rows)]
+    print(f'{rows} rows, contracts '
+          f'{"on" if weather.CHECK_CONTRACTS else "off"}')
+
+    def per_row(history: HistoricalWeather) -> None:
+        for d, temperatures, precipitation in days:
+            history.add_weather_values(d, temperatures, precipitation)
+
+    def bulk(history: HistoricalWeather) -> None:
+        history.add_weather_many(days)
+
+    for history_type in (HistoricalWeather, weather.ColumnarWeather):
+        for label, record in (('per row', per_row), ('bulk', bulk)):
+            best = None
+            for _ in range(repeat):
+                history = history_type('STN', (0.0, 0.0))
+                start = time.perf_counter()
+                record(history)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            assert history.num_days() == rows
+            print(f'{history_type.__name__ : <18} {label : <8} '
+                  f'{best : >7.3f}s {rows / best : >10.0f} rows/s')
+
+
+def bench_parallel(stations: int, years: int, statistic: str,
+                   workers: list[int], repeat: int) -> None:
+    """Time running the HistoricalWeather method called <statistic> on every
+    location of a Country of <stations> synthetic histories of <years> years
+    each, with a StationExecutor of each kind, and with a process pool that
+    is sent the pickled histories instead, for each number of workers in
+    <workers>. Report the time to open each executor, the time of its first
+    run, and the best time of <repeat> runs after that.
+
+    <statistic> should not be memoized (see _memoized), or every serial or
+    thread run after the first only looks up the cached results.
+    """
+    country = weather.Country('Synthetia')
+    for i in range(stations):
+        country.add_history(synthetic_history(weather.ColumnarWeather,
+                                              f'STN{i:05}', years, i))
+    print(f'{stations} stations x {years} years, {statistic}, '
+          f'{os.cpu_count()} CPUs')
+    print(f'{"executor" : <20} {"open" : >8} {"first" : >8} {"best" : >8} '
+          f'{"speedup" : >8}')
+
+    def pickled(count: int) -> tuple[Callable[[], object],
+                                     Callable[[], object]]:
+        pool = ProcessPoolExecutor(max_workers=count)
+        return (lambda: list(pool.map(
+                    partial(weather._call_statistic, statistic, ()),
+                    country.histories(), chunksize=4)),
+                pool.shutdown)
+
+    def station_executor(kind: str, count: int) \
+            -> tuple[Callable[[], object], Callable[[], object]]:
+        executor = weather.StationExecutor(country, kind, count)
+        return partial(executor.map_statistic, statistic), executor.close
+
+    runs = [('serial', 1, partial(station_executor, 'serial'))]
+    for count in workers:
+        runs.append(('thread', count, partial(station_executor, 'thread')))
+    for count in workers:
+        runs.append(('process', count, partial(station_executor, 'process')))
+    for count in workers:
+        runs.append(('pickled', count, pickled))
+
+    serial = None
+    for label, count, open_executor in runs:
+        start = time.perf_counter()
+        run, close = open_executor(count)
+        opened = time.perf_counter() - start
+        times = []
+        for _ in range(repeat + 1):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        close()
+        best = min(times[1:])
+        serial = best if serial is None else serial
+        print(f'{label + " x" + str(count) : <20} {opened : >7.3f}s '
+              f'{times[0] : >7.3f}s {best : >7.3f}s {serial / best : >7.2f}x')
+
+
+def bench_streaming(stations: int, years: int, missing_rate: float) -> None:
+    """Compare writing the report for a folder of <stations> synthetic
+    station files of <years> years each, with <missing_rate> of the days
+    missing data, by loading the Country and calling generate_summary, and
+    by streaming the files through summarize_country: the time taken, the
+    peak memory used, and whether the reports are the same.
+
+    Memory is measured apart from the timings, since tracing slows parsing
+    down a lot.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        csv_folder = os.path.join(folder, 'csv')
+        os.mkdir(csv_folder)
+        rows = write_country_folder(csv_folder, stations, years,
+                                    missing_rate)
+        print(f'{stations} stations, {rows} rows')
+        reports = []
+        for label, write in (
+                ('load + generate', lambda path: weather.load_country(
+                    csv_folder, 'Synthetia').generate_summary(path)),
+                ('stream', lambda path: weather.summarize_country(
+                    csv_folder, path))):
+            reports.append(os.path.join(folder, f'report{len(reports)}.md'))
+            start = time.perf_counter()
+            write(reports[-1])
+            elapsed = time.perf_counter() - start
+            tracemalloc.start()
+            write(reports[-1])
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f'{label : <16} {elapsed : >8.3f}s '
+                  f'{rows / elapsed : >10.0f} rows/s '
+                  f'{peak / 2 ** 10 : >10.0f} KiB peak')
+        with open(reports[0]) as first, open(reports[1]) as second:
+            same = first.read() == second.read()
+        print('reports are ' + ('the same' if same else 'DIFFERENT'))
+
+
+def bench_runs(years: int, missing_rate: float, lookups: int,
+               repeat: int) -> None:
+    """Compare holding the records of one synthetic station of <years> years,
+    with <missing_rate> of the days missing data, in a dictionary, in a
+    WeatherColumns and in a RunColumns (with and without temperatures in
+    tenths): the bytes needed, the time taken by <lookups> random date
+    lookups and by contiguous_precipitation (best of <repeat>), and whether
+    every representation gives the same results.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'station.csv')
+        write_station_csv(path, 'STN', years, missing_rate=missing_rate)
+        with open(path) as f:
+            loaded = weather.load_data(f)
+    rows = [(d, (w.avg_temp, w.low_temp, w.high_temp),
+             (w.precipitation, w.rainfall, w.snowfall))
+            for d, w in loaded.iter_range()]
+
+    def fill(records: object) -> object:
+        for d, temperatures, precipitation in rows:
+            records[d] = DailyWeather(temperatures, precipitation)
+        return records
+
+    histories = []
+    for label, make_records, make_history in (
+            ('dict', dict, lambda: HistoricalWeather('STN', (0.0, 0.0))),
+            ('WeatherColumns', weather.WeatherColumns,
+             lambda: weather.ColumnarWeather('STN', (0.0, 0.0))),
+            ('RunColumns', weather.RunColumns,
+             lambda: weather.RunWeather('STN', (0.0, 0.0))),
+            ('RunColumns tenths', partial(weather.RunColumns, True),
+             lambda: weather.RunWeather('STN', (0.0, 0.0), True))):
+        allocated, _ = _measure_memory(lambda m=make_records: fill(m()))
+        history = make_history()
+        history.add_weather_many(rows)
+        histories.append((label, allocated, history))
+    print(f'{len(rows)} days, {len(rows) / 365.25:.0f} years')
+
+    rng = random.Random(0)
+    first, last = rows[0][0].toordinal(), rows[-1][0].toordinal()
+    dates = [date.fromordinal(rng.randint(first, last))
+             for _ in range(lookups)]
+    windows = [(date.fromordinal(first + k), None) for k in range(repeat)]
+    baseline = histories[0][1]
+    results = []
+    for label, allocated, history in histories:
+        start = time.perf_counter()
+        found = [history.retrieve_weather(d) for d in dates]
+        lookup = (time.perf_counter() - start) / lookups
+        scans = []
+        for window in windows:
+            start = time.perf_counter()
+            longest = history.contiguous_precipitation(*window)
+            scans.append(time.perf_counter() - start)
+        results.append(([None if w is None else str(w) for w in found],
+                        longest, str(history.summarize().report_row())))
+        print(f'{label : <18} {allocated / 2 ** 10 : >8.0f} KiB '
+              f'{baseline / allocated : >6.1f}x smaller '
+              f'{lookup * 1e9 : >8.0f} ns/lookup '
+              f'{min(scans) * 1e3 : >8.2f} ms contiguous_precipitation')
+    same = all(result == results[0] for result in results)
+    print('results are ' + ('the same' if same else 'DIFFERENT'))
+
+
+def random_columns(days: int, seed: int = 0) -> weather.WeatherColumns:
+    """Return a WeatherColumns of <days> consecutive days of random weather,
+    starting on FIRST_DAY, built directly from NumPy arrays.
+    """
+    np = weather.NUMPY
+    rng = np.random.default_rng(seed)
+    columns = weather.WeatherColumns()
+    columns.days.frombytes(
+        np.arange(FIRST_DAY.toordinal(), FIRST_DAY.toordinal() + days,
+                  dtype=np.int64).tobytes())
+    lows = rng.normal(5.0, 10.0, days).round(1)
+    for column, values in ((columns.low_temps, lows),
+                           (columns.avg_temps, lows + 5.0),
+                           (columns.high_temps, lows + 10.0)):
+        column.frombytes(values.tobytes())
+    rainfall = np.where(rng.random(days) < 0.6, 0.0,
+                        rng.exponential(4.0, days).round(1))
+    snowfall = np.where(rng.random(days) < 0.8, 0.0,
+                        rng.exponential(2.0, days).round(1))
+    trace = ((rng.random(days) < 0.05) * weather.PRECIP_TRACE
+             ).astype(np.uint8)
+    columns.rainfall.frombytes(rainfall.tobytes())
+    columns.snowfall.frombytes(snowfall.tobytes())
+    columns.precipitation.frombytes((rainfall + snowfall).tobytes())
+    columns.trace.frombytes(trace.tobytes())
+    return columns
+
+
+def bench_numpy(sizes: list[int]) -> None:
+    """Compare the pure Python and NumPy versions of the statistics computed
+    by scanning a WeatherColumns, on random columns of each number of days
+    in <sizes>, and check that both give the same results.
+    """
+    scans = [('record_high', lambda c, how: getattr(
+                 weather, '_record_high_' + how)(c, 2, 29)),
+             ('monthly_average', lambda c, how: getattr(
+                 weather, '_monthly_average_' + how)(c, 'low_temp')),
+             ('contiguous_precipitation', lambda c, how: getattr(
+                 weather, '_contiguous_precipitation_' + how)(c)),
+             ('percentage_snowfall', lambda c, how: getattr(
+                 weather, '_percentage_snowfall_' + how)(c))]
+
+    # A date can be at most date.max, so a single WeatherColumns can only hold
+    # so many days from FIRST_DAY; larger sizes are split into several
+    # columns, and the times for all of them are added up.
+    most_days = date.max.toordinal() - FIRST_DAY.toordinal() + 1
+
+    print(f'{"days" : >10} {"statistic" : <26} {"python" : >10} '
+          f'{"numpy" : >10} {"speedup" : >8}')
+    for size in sizes:
+        times = {label: [0.0, 0.0] for label, _ in scans}
+        for seed, start_day in enumerate(range(0, size, most_days)):
+            columns = random_columns(min(most_days, size - start_day), seed)
+            for label, scan in scans:
+                results = []
+                for i, how in enumerate(('py', 'np')):
+                    start = time.perf_counter()
+                    results.append(scan(columns, how))
+                    times[label][i] += time.perf_counter() - start
+                assert results[0] == results[1], (label, size, results)
+            del columns
+
+        for label, (python_time, numpy_time) in times.items():
+            print(f'{size : >10} {label : <26} {python_time : >9.4f}s '
+                  f'{numpy_time : >9.4f}s {python_time / numpy_time : >7.1f}x')
+
+
+def _brute_nearest(stations: list[tuple[str, tuple[float, float]]],
+                   lat: float, long: float, k: int) -> list[float]:
+    """Return the distances to the <k> stations nearest to (<lat>, <long>),
+    nearest first, by measuring the distance to every station.
+
+    Distances rather than names are returned, since either way of finding
+    the nearest stations may break ties differently.
+    """
+    return sorted(weather.great_circle_distance((lat, long), point)
+                  for _, point in stations)[:k]
+
+
+def _brute_within_radius(stations: list[tuple[str, tuple[float, float]]],
+                         lat: float, long: float, radius: float) -> list[str]:
+    """Return the names of the stations within <radius> km of
+    (<lat>, <long>), nearest first, by measuring the distance to every
+    station.
+    """
+    distances = sorted((weather.great_circle_distance((lat, long), point),
+                        name) for name, point in stations)
+    return [name for distance, name in distances if distance <= radius]
+
+
+def _brute_within_bbox(stations: list[tuple[str, tuple[float, float]]],
+                       south: float, west: float, north: float,
+                       east: float) -> list[str]:
+    """Return the sorted names of the stations in the given box, by checking
+    every station.
+    """
+    return sorted(name for name, (lat, long) in stations
+                  if south <= lat <= north and west <= long <= east)
+
+
+def bench_spatial(sizes: list[int], queries: int) -> None:
+    """Compare the nearest, within_radius and within_bbox queries of a
+    Country with a linear scan over every station, for each number of
+    randomly placed stations in <sizes>, averaged over <queries> random
+    queries, and check that both give the same answers.
+    """
+    rng = random.Random(0)
+    print(f'{"stations" : >8} {"query" : <14} {"index" : >10} '
+          f'{"brute force" : >12} {"speedup" : >8}')
+    for size in sizes:
+        # Spread the stations over roughly the area of Canada.
+        stations = [(f'STN{i}', (rng.uniform(42.0, 83.0),
+                                 rng.uniform(-141.0, -52.0)))
+                    for i in range(size)]
+        country = weather.Country('Synthetia')
+        start = time.perf_counter()
+        for name, point in stations:
+            country.add_pending(name, point, lambda: None)
+        print(f'{size : >8} {"build" : <14} '
+              f'{time.perf_counter() - start : >9.3f}s')
+
+        points = [(rng.uniform(42.0, 83.0), rng.uniform(-141.0, -52.0))
+                  for _ in range(queries)]
+        cases = [('nearest k=5',
+                  lambda lat, long: [distance for _, distance
+                                     in country.nearest(lat, long, 5)],
+                  lambda lat, long: _brute_nearest(stations, lat, long, 5)),
+                 ('radius 50 km',
+                  lambda lat, long: [name for name, _ in
+                                     country.within_radius(lat, long, 50.0)],
+                  lambda lat, long: _brute_within_radius(stations, lat, long,
+                                                         50.0)),
+                 ('bbox 1x2 deg',
+                  lambda lat, long: country.within_bbox(lat, long, lat + 1.0,
+                                                        long + 2.0),
+                  lambda lat, long: _brute_within_bbox(stations, lat, long,
+                                                       lat + 1.0,
+                                                       long + 2.0))]
+        for label, indexed, brute in cases:
+            results, times = [], []
+            for query in (indexed, brute):
+                start = time.perf_counter()
+                results.append([query(lat, long) for lat, long in points])
+                times.append((time.perf_counter() - start) / queries)
+            assert results[0] == results[1], label
+            print(f'{size : >8} {label : <14} {times[0] * 1e6 : >8.1f}us '
+                  f'{times[1] * 1e6 : >10.1f}us {times[1] / times[0] : >7.0f}x')
+
+
+# The setup and statement timed for each call by bench_contracts. Each
+# add_weather call records a new day, so the history grows by one day per
+# call, just as it does while loading a file.
+_CALLS = {
+    'DailyWeather.__init__': (
+        'from weather import DailyWeather',
+        'DailyWeather((13.0, 9.0, 20.0), (5.0, 0.0, 0.0))'),
+    'add_weather': (
+        'from datetime import date\n'
+        'from weather import DailyWeather, HistoricalWeather\n'
+        'w = DailyWeather((13.0, 9.0, 20.0), (5.0, 0.0, 0.0))\n'
+        'h = HistoricalWeather("STN", (43.6, -79.4))\n'
+        'days = iter([date.fromordinal(720000 + i) for i in range(10 ** 6)])',
+        'h.add_weather(next(days), w)'),
+    'retrieve_weather': (
+        'from datetime import date\n'
+        'from weather import DailyWeather, HistoricalWeather\n'
+        'w = DailyWeather((13.0, 9.0, 20.0), (5.0, 0.0, 0.0))\n'
+        'h = HistoricalWeather("STN", (43.6, -79.4))\n'
+        'for i in range(365):\n'
+        '    h.add_weather(date.fromordinal(720000 + i), w)\n'
+        'd = date.fromordinal(720100)',
+        'h.retrieve_weather(d)'),
+}
+
+
+def bench_contracts(number: int) -> None:
+    """Report the time per call of DailyWeather.__init__, add_weather and
+    retrieve_weather with contract checking on and off, averaged over
+    <number> calls.
+
+    Each measurement runs in a fresh Python process, since contract checking
+    can only be chosen when the weather module is imported.
+    """
+    print(f'{"call" : <22} {"checked" : >12} {"unchecked" : >12}')
+    for call, (setup, statement) in _CALLS.items():
+        times = []
+        for check in ('1', '0'):
+            out = subprocess.run(
+                [sys.executable, '-m', 'timeit', '-n', str(number), '-r', '3',
+                 '-u', 'usec', '-s', setup, statement],
+                env={**os.environ, 'WEATHER_CHECK_CONTRACTS': check},
+                capture_output=True, text=True, check=True).stdout
+            # timeit prints "<n> loops, best of 3: <time> usec per loop"
+            times.append(float(out.split(':')[1].split()[0]))
+        print(f'{call : <22} {times[0] : >9.2f} us {times[1] : >9.2f} us')
+
+
+def bench_profile(years: int, repeat: int, calls: int,
+                  max_overhead: float, output: Optional[str]) -> None:
+    """Check that the profiling instrumentation costs at most <max_overhead>
+    (a fraction) of the time of load_data and of a cached statistic while
+    weather.PROFILE is False, then profile loading and summarizing a
+    synthetic station file of <years> years of data.
+
+    Each time is the best of <repeat> runs, with <calls> calls of the cached
+    statistic per run. The profile is written as JSON to <output>, or
+    printed if it is not given. Exits with an error if the overhead is too
+    high.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'station.csv')
+        rows = write_station_csv(path, 'STN', years)
+        with open(path) as f:
+            history = weather.load_data(f)
+
+        record_high = type(history).record_high
+
+        def load(loader: Callable[[TextIO], object]) -> None:
+            with open(path) as f:
+                loader(f)
+
+        def statistic(method: Callable[..., object]) -> None:
+            # A window, so that the calls are answered from the cache.
+            for _ in range(calls):
+                method(history, 12, 25, date.min)
+
+        measurements = [
+            (f'load_data ({rows} rows)',
+             lambda: load(weather.load_data.__wrapped__),
+             lambda: load(weather.load_data)),
+            (f'record_high x {calls} (cached)',
+             lambda: statistic(record_high.__wrapped__),
+             lambda: statistic(record_high))]
+
+        weather.PROFILE = False
+        failed = False
+        print(f'{"call" : <32} {"bare" : >10} {"disabled" : >10} '
+              f'{"overhead" : >9}')
+        for label, bare, instrumented in measurements:
+            best = [float('inf'), float('inf')]
+            # Alternate between the two so that both see the same noise.
+            for _ in range(repeat):
+                for i, run in enumerate((bare, instrumented)):
+                    start = time.perf_counter()
+                    run()
+                    best[i] = min(best[i], time.perf_counter() - start)
+            overhead = best[1] / best[0] - 1
+            failed = failed or overhead > max_overhead
+            print(f'{label : <32} {best[0] * 1000 : >7.2f} ms '
+                  f'{best[1] * 1000 : >7.2f} ms {overhead : >8.1%}')
+
+        weather.PROFILE = True
+        weather.PROFILER.reset()
+        try:
+            for _ in range(repeat):
+                load(weather.load_data)
+                history.summarize()
+                statistic(record_high)
+        finally:
+            weather.PROFILE = False
+
+    if output is None:
+        print(weather.PROFILER.to_json())
+    else:
+        weather.PROFILER.dump(output)
+        print(f'profile written to {output}')
+
+    if failed:
+        sys.exit(f'instrumentation overhead is above {max_overhead:.0%} '
+                 f'while profiling is disabled')
+
+
+# The HistoricalWeather statistics timed by bench_suite, with the arguments
+# each is called with.
+_STATISTICS = [('record_high', (12, 25)), ('record_highs', ()),
+               ('record_lows', ()), ('monthly_average', ('low_temp',)),
+               ('monthly_statistics', ('low_temp',)),
+               ('contiguous_precipitation', ()),
+               ('percentage_snowfall', ()), ('summarize', ())]
+
+
+def bench_suite(scales: list[str], missing_rate: float, repeat: int,
+                columnar: bool, output: Optional[str],
+                compare: Optional[str]) -> None:
+    """Time load_country, each HistoricalWeather statistic over every
+    location, and Country.generate_summary, on synthetic countries of each
+    size in <scales>, written as "<stations>x<years>" and generated with
+    <missing_rate> (see write_station_csv).
+
+    Each time is the best of <repeat> runs, each of which loads the country
+    again, so that no statistic is answered from a cache. The results are
+    written as JSON to <output>, if it is given, and compared with those in
+    the JSON file <compare>, if it is given, so that runs can be diffed.
+    """
+    results = {'check_contracts': weather.CHECK_CONTRACTS,
+               'use_numpy': weather.USE_NUMPY,
+               'missing_rate': missing_rate,
+               'columnar': columnar,
+               'seconds': {}}
+    for scale in scales:
+        stations, years = (int(part) for part in scale.split('x'))
+        best = {}
+        with tempfile.TemporaryDirectory() as folder:
+            rows = write_country_folder(folder, stations, years,
+                                        missing_rate)
+            print(f'{scale}: {stations} stations, {rows} rows')
+            names = [f'STN{i:05}' for i in range(stations)]
+            for _ in range(repeat):
+                times = _time_suite(folder, names, columnar)
+                for label, seconds in times.items():
+                    best[label] = min(best.get(label, seconds), seconds)
+        results['seconds'][scale] = best
+
+    previous = {}
+    if compare is not None:
+        with open(compare) as f:
+            previous = json.load(f)
+        for setting, value in results.items():
+            if setting != 'seconds' and previous.get(setting) != value:
+                print(f'note: {compare} was run with {setting} = '
+                      f'{previous.get(setting)}, not {value}')
+        previous = previous['seconds']
+
+    print(f'{"scale" : <10} {"operation" : <26} {"seconds" : >10} '
+          f'{"previous" : >10} {"change" : >8}')
+    for scale, best in results['seconds'].items():
+        for label, seconds in best.items():
+            line = f'{scale : <10} {label : <26} {seconds : >10.4f}'
+            if label in previous.get(scale, {}):
+                old = previous[scale][label]
+                line += f' {old : >10.4f} {seconds / old - 1 : >+8.1%}'
+            print(line)
+
+    if output is not None:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'results written to {output}')
+
+
+def _time_suite(folder: str, names: list[str],
+                columnar: bool) -> dict[str, float]:
+    """Return the time taken to load the country in <folder>, to compute
+    each of _STATISTICS for each of its locations called <names>, and to
+    write its summary, keyed by what was timed.
+    """
+    times = {}
+    start = time.perf_counter()
+    country = weather.load_country(folder, 'Synthetia', columnar)
+    times['load_country'] = time.perf_counter() - start
+
+    histories = [country.retrieve_history(name) for name in names]
+    for statistic, args in _STATISTICS:
+        start = time.perf_counter()
+        for history in histories:
+            getattr(history, statistic)(*args)
+        times[statistic] = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as report_folder:
+        start = time.perf_counter()
+        country.generate_summary(os.path.join(report_folder, 'report.md'))
+        times['generate_summary'] = time.perf_counter() - start
+    return times
+
+
+def main() -> None:
+    """Run the benchmark named on the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    benchmarks = parser.add_subparsers(dest='benchmark', required=True)
+
+    memory = benchmarks.add_parser('memory', help=bench_memory.__doc__)
+    memory.add_argument('--stations', type=int, default=100)
+    memory.add_argument('--years', type=int, default=50)
+
+    daily_weather = benchmarks.add_parser('daily_weather',
+                                          help=bench_daily_weather.__doc__)
+    daily_weather.add_argument('--stations', type=int, default=20)
+    daily_weather.add_argument('--years', type=int, default=50)
+
+    load = benchmarks.add_parser('load', help=bench_load.__doc__)
+    load.add_argument('--years', type=int, default=100)
+    load.add_argument('--repeat', type=int, default=3)
+
+    load_country = benchmarks.add_parser('load_country',
+                                         help=bench_load_country.__doc__)
+    load_country.add_argument('--stations', type=int, default=64)
+    load_country.add_argument('--years', type=int, default=20)
+    load_country.add_argument('--workers', type=int, nargs='+',
+                              default=[1, 2, 4, 8])
+
+    contracts = benchmarks.add_parser('contracts',
+                                      help=bench_contracts.__doc__)
+    contracts.add_argument('--number', type=int, default=1000)
+
+    async_load = benchmarks.add_parser('async_load',
+                                       help=bench_async_load.__doc__)
+    async_load.add_argument('--stations', type=int, default=64)
+    async_load.add_argument('--years', type=int, default=5)
+    async_load.add_argument('--delay', type=float, default=0.1)
+    async_load.add_argument('--readers', type=int, nargs='+',
+                            default=[1, 4, 16])
+
+    snapshot = benchmarks.add_parser('snapshot', help=bench_snapshot.__doc__)
+    snapshot.add_argument('--stations', type=int, default=100)
+    snapshot.add_argument('--years', type=int, default=20)
+
+    numpy = benchmarks.add_parser('numpy', help=bench_numpy.__doc__)
+    numpy.add_argument('--sizes', type=int, nargs='+',
+                       default=[1000, 100000, 10000000])
+
+    spatial = benchmarks.add_parser('spatial', help=bench_spatial.__doc__)
+    spatial.add_argument('--sizes', type=int, nargs='+',
+                         default=[10000, 100000])
+    spatial.add_argument('--queries', type=int, default=100)
+
+    profile = benchmarks.add_parser('profile', help=bench_profile.__doc__)
+    profile.add_argument('--years', type=int, default=50)
+    profile.add_argument('--repeat', type=int, default=5)
+    profile.add_argument('--calls', type=int, default=10000)
+    profile.add_argument('--max-overhead', type=float, default=0.05)
+    profile.add_argument('--output')
+
+    suite = benchmarks.add_parser('suite', help=bench_suite.__doc__)
+    suite.add_argument('--scales', nargs='+',
+                       default=['10x10', '50x20', '100x50'])
+    suite.add_argument('--missing-rate', type=float, default=0.05)
+    suite.add_argument('--repeat', type=int, default=3)
+    suite.add_argument('--columnar', action='store_true')
+    suite.add_argument('--output')
+    suite.add_argument('--compare')
+
+    lazy = benchmarks.add_parser('lazy', help=bench_lazy.__doc__)
+    lazy.add_argument('--stations', type=int, default=100)
+    lazy.add_argument('--years', type=int, default=10)
+    lazy.add_argument('--requests', type=int, default=200)
+    lazy.add_argument('--capacities', type=int, nargs='+', default=[4, 32])
+
+    registry = benchmarks.add_parser('registry', help=bench_registry.__doc__)
+    registry.add_argument('--countries', type=int, default=3)
+    registry.add_argument('--stations', type=int, default=30)
+    registry.add_argument('--years', type=int, default=30)
+    registry.add_argument('-n', type=int, default=10)
+
+    bulk = benchmarks.add_parser('bulk', help=bench_bulk.__doc__)
+    bulk.add_argument('--rows', type=int, default=1000000)
+    bulk.add_argument('--repeat', type=int, default=3)
+
+    parallel = benchmarks.add_parser('parallel', help=bench_parallel.__doc__)
+    parallel.add_argument('--stations', type=int, default=64)
+    parallel.add_argument('--years', type=int, default=20)
+    parallel.add_argument('--statistic', default='summarize')
+    parallel.add_argument('--workers', type=int, nargs='+',
+                          default=[1, 2, 4, 8])
+    parallel.add_argument('--repeat', type=int, default=3)
+
+    streaming = benchmarks.add_parser('streaming',
+                                      help=bench_streaming.__doc__)
+    streaming.add_argument('--stations', type=int, default=50)
+    streaming.add_argument('--years', type=int, default=20)
+    streaming.add_argument('--missing-rate', type=float, default=0.05)
+
+    runs = benchmarks.add_parser('runs', help=bench_runs.__doc__)
+    runs.add_argument('--years', type=int, default=30)
+    runs.add_argument('--missing-rate', type=float, default=0.02)
+    runs.add_argument('--lookups', type=int, default=100000)
+    runs.add_argument('--repeat', type=int, default=5)
+
+    args = vars(parser.parse_args())
+    globals()['bench_' + args.pop('benchmark')](**args)
+
+
+if __name__ == '__main__':
+    main()
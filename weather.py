@@ -15,11 +15,63 @@ All of the files in this directory and all subdirectories are:
 Copyright (c) 2024 Diane Horton, Ian Berlott-Atwell, Jonathan Calver,
 Sophia Huynh, Maryam Majedi, and Jaisie Sin.
 """
+from array import array
+import asyncio
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict, deque
+from concurrent.futures import Executor, ProcessPoolExecutor, \
+    ThreadPoolExecutor
+from contextvars import ContextVar
+import copy
+import heapq
 from datetime import date, timedelta
-from typing import Optional, TextIO, Union
+from functools import partial, wraps
+import importlib
+import inspect
+from itertools import islice
+import json
+import math
+import mmap
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Awaitable, BinaryIO, Callable, Iterable, Iterator, \
+    Optional, TextIO, Union
 import os
-import python_ta
-from python_ta.contracts import check_contracts
+import random
+import struct
+import sys
+import time
+from types import ModuleType
+
+
+def _optional_module(name: str) -> Optional[ModuleType]:
+    """Return the module called <name>, or None if it is not installed.
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+# NumPy, if it is installed, or None.
+NUMPY = _optional_module('numpy')
+
+# Contract checking re-validates the type annotations and representation
+# invariants of an object on every method call, which is invaluable while
+# developing but far too slow for large amounts of data. Set the environment
+# variable WEATHER_CHECK_CONTRACTS to 0 before importing this module to turn
+# it off; python_ta is then not imported at all. Do this for any large load:
+# it is also the only mode in which DailyWeather objects go without a
+# __dict__, so the memory saved by their __slots__ is only saved then.
+CHECK_CONTRACTS = os.environ.get('WEATHER_CHECK_CONTRACTS', '1') != '0'
+
+
+def check_contracts(obj: type) -> type:
+    """Return <obj> with python_ta's contract checking added to it if
+    CHECK_CONTRACTS is True, or else return <obj> unchanged.
+    """
+    if not CHECK_CONTRACTS:
+        return obj
+    return importlib.import_module('python_ta.contracts').check_contracts(obj)
 
 
 # This program reads weather data from csv files. These are the column
@@ -41,6 +93,78 @@ SNOW_ON_GRND, SNOW_ON_GRND_FLAG = 25, 26
 DIR_MAX_GUST, DIR_MAX_GUST_FLAG = 27, 28
 SPD_MAX_GUST, SPD_MAX_GUST_FLAG = 29, 30
 
+# The rightmost column that load_data needs to read.
+LAST_COLUMN_USED = max(LONG, LAT, STN_NAME, YEAR, MONTH, DAY, MAX_TEMP,
+                       MIN_TEMP, MEAN_TEMP, TOTAL_RAIN_FLAG, TOTAL_SNOW_FLAG,
+                       TOTAL_PRECIP_FLAG)
+
+# The three-character names of the months, in calendar order.
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug',
+               'Sep', 'Oct', 'Nov', 'Dec']
+
+# The attributes of DailyWeather that HistoricalWeather keeps monthly
+# statistics for.
+TEMPERATURES = ('avg_temp', 'low_temp', 'high_temp')
+
+# Whether statistics computed by scanning a WeatherColumns use NumPy. This is
+# True whenever NumPy is installed; both ways give identical results.
+USE_NUMPY = NUMPY is not None
+
+# The calendar day, as a (month, day) pair, whose record high temperature
+# Country.generate_summary reports. The report also gives the average
+# minimum temperature for the month of this day.
+REPORT_DAY = (12, 25)
+
+# The layout of a snapshot file written by Country.save_snapshot: a header,
+# the country's name, then one index entry per location.
+_SNAPSHOT_MAGIC = b'WXSNAP01'
+_SNAPSHOT_HEADER = struct.Struct('<8sII')
+_SNAPSHOT_ENTRY = struct.Struct('<QQddQQ')
+# The number of bytes each recorded day takes in a snapshot: an 8-byte
+# ordinal, six 8-byte measurements and a 1-byte trace mask.
+_SNAPSHOT_ROW_SIZE = 8 + 6 * 8 + 1
+
+# Every finite float is a whole multiple of 2 ** -1074, so a sum of floats
+# counted in these units is an integer, and can be kept exactly (see
+# _exact_units).
+_EXACT_SCALE = 2 ** 1074
+
+# The mean radius of the Earth, in km, used for distances between locations.
+EARTH_RADIUS = 6371.0
+
+# The height and width, in degrees, of each cell of the grid that a
+# StationIndex divides the surface of the Earth into.
+GRID_DEGREES = 1.0
+
+# Whether HistoricalWeather.add_weather_values shares a single DailyWeather
+# between all the days with the same temperatures and no precipitation at
+# all, which are the most common kind of day (see interned_weather).
+INTERN_DRY_DAYS = False
+
+# The most DailyWeathers interned_weather keeps for sharing at once.
+INTERNED_DRY_DAYS_LIMIT = 2 ** 16
+
+# Whether load_data shares a single date object between all the rows for the
+# same day, across every file it loads (see interned_date). This saves memory
+# when many locations, or several Countries, cover the same days.
+INTERN_DATES = False
+
+# The number of statistics results each HistoricalWeather keeps cached.
+STATISTICS_CACHE_SIZE = 128
+
+# Whether the phases of loading weather data and computing statistics from it
+# record their timings in PROFILER. Checking this is all they cost while it
+# is False.
+PROFILE = False
+
+# The most timings of each phase that PROFILER keeps for working out its
+# percentiles. Beyond that, a random sample of this many is kept.
+PROFILE_SAMPLES = 1024
+
+# Bits of the trace mask kept by WeatherColumns. A set bit means that the
+# corresponding measurement was a trace amount on that day.
+PRECIP_TRACE, RAIN_TRACE, SNOW_TRACE = 1, 2, 4
+
 
 @check_contracts
 class DailyWeather:
@@ -74,6 +198,13 @@ class DailyWeather:
     >>> print(weather.precipitation)
     5
     """
+    # A DailyWeather is made for every day of every location, so its
+    # attributes are kept in slots rather than in a per-instance __dict__.
+    # Contract checking needs a __dict__ for its own bookkeeping, so one is
+    # only left out when CHECK_CONTRACTS is False.
+    __slots__: tuple[str, ...] = (
+        ('avg_temp', 'low_temp', 'high_temp', 'precipitation', 'snowfall',
+         'rainfall') + (('__dict__',) if CHECK_CONTRACTS else ()))
     avg_temp: float
     low_temp: float
     high_temp: float
@@ -126,493 +257,4919 @@ Rain: 0.00
 
 
 @check_contracts
-class HistoricalWeather:
-    """A record of historical weather information for a fixed place on Earth.
+class WeatherColumns:
+    """The daily weather for one place, stored one column per measurement.
 
-    === Instance Attributes ===
-    name: The name of the place for which the weather is being recorded.
-    coordinates: The latitude and longitude of this place.
+    Instead of one DailyWeather object per day, each measurement is kept in
+    its own contiguous array of floats, and the dates are kept as a sorted
+    array of ordinals (see date.toordinal). Index i of every column describes
+    the date whose ordinal is days[i].
 
-    === Private Attributes ===
-    _records: The daily weather records for this place. Each key is a
-        date and its value is the location's weather on that day. There may
-        be gaps in the data. For example, there could be data for Jan 1, 2024
-        and Jan 5, 2024, but not for the days in between.
+    A WeatherColumns can be used like a dictionary mapping each recorded date
+    to its DailyWeather, in date order. The DailyWeather objects are built on
+    demand and are not kept.
+
+    === Instance Attributes ===
+    days: The ordinal of each date with recorded weather, in increasing
+        order.
+    avg_temps: The average temperature on each recorded date.
+    low_temps: The minimum temperature on each recorded date.
+    high_temps: The maximum temperature on each recorded date.
+    precipitation: The total precipitation on each recorded date, with
+        trace amounts stored as 0.
+    rainfall: The total rainfall on each recorded date, with trace amounts
+        stored as 0.
+    snowfall: The total snowfall on each recorded date, with trace amounts
+        stored as 0.
+    trace: For each recorded date, a bit mask made of PRECIP_TRACE,
+        RAIN_TRACE and SNOW_TRACE saying which measurements were trace
+        amounts on that date.
 
     === Representation Invariants ===
-    - -90 <= self.coordinates[0] <= 90
-    - -180 <= self.coordinates[1] <= 180
+    - len(self.avg_temps) == len(self.days)
+    - len(self.low_temps) == len(self.days)
+    - len(self.high_temps) == len(self.days)
+    - len(self.precipitation) == len(self.days)
+    - len(self.rainfall) == len(self.days)
+    - len(self.snowfall) == len(self.days)
+    - len(self.trace) == len(self.days)
+    - self.days is in strictly increasing order
 
     === Sample Usage ===
-    >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
-    >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
-    >>> toronto_weather.add_weather(date.today(), weather)
-    >>> print(toronto_weather.name)
-    Toronto
-    >>> print(toronto_weather.coordinates)
-    (43.6529, -79.3849)
-    >>> print(toronto_weather.retrieve_weather(date.today()).avg_temp)
-    13
+    >>> columns = WeatherColumns()
+    >>> columns[date(2024, 7, 13)] = DailyWeather((13, 9, 20), (-1, 0, 0))
+    >>> date(2024, 7, 13) in columns
+    True
+    >>> print(columns[date(2024, 7, 13)])
+    Average: 13.00 Low: 9.00 High: 20.00 Precipitation: -1.00 Snow: 0.00 \
+Rain: 0.00
     """
-    name: str
-    coordinates: tuple[float, float]
-    _records: dict[date, DailyWeather]
+    days: array
+    avg_temps: array
+    low_temps: array
+    high_temps: array
+    precipitation: array
+    rainfall: array
+    snowfall: array
+    trace: array
 
-    def __init__(self, name: str, coordinates: tuple[float, float]) -> None:
-        """Initialize this historical weather record with the coordinates
-        <coordinates>, place name <name>, and no recorded weather so far.
+    def __init__(self) -> None:
+        """Initialize these columns with no recorded weather.
 
-        Preconditions:
-        - -90 <= coordinates[0] <= 90
-        - -180 <= coordinates[1] <= 180
+        >>> len(WeatherColumns())
+        0
+        """
+        self.days = array('q')
+        self.avg_temps = array('d')
+        self.low_temps = array('d')
+        self.high_temps = array('d')
+        self.precipitation = array('d')
+        self.rainfall = array('d')
+        self.snowfall = array('d')
+        self.trace = array('B')
 
-        >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
-        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
-        >>> toronto_weather.add_weather(date.today(), weather)
-        >>> print(toronto_weather.name)
-        Toronto
+    def __len__(self) -> int:
+        """Return the number of days recorded in these columns.
+
+        >>> columns = WeatherColumns()
+        >>> columns[date(2024, 7, 13)] = DailyWeather((0, 0, 0), (0, 0, 0))
+        >>> len(columns)
+        1
         """
-        self.name = name
-        self.coordinates = (coordinates[0], coordinates[1])
-        self._records = {}
+        return len(self.days)
 
-    def __str__(self) -> str:
-        """Return a str representing this HistoricalWeather.
+    def __contains__(self, d: date) -> bool:
+        """Return whether weather has been recorded on the date <d>.
 
-        >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
-        >>> loc = HistoricalWeather('Toronto', (43.6, -79.63))
-        >>> loc.add_weather(date(2024,7,13), weather)
-        >>> print(loc)
-        Toronto (43.60, -79.63):
-        2024-07-13: Average: 13.00 Low: 9.00 High: 20.00 Precipitation: 5.00 \
-Snow: 0.00 Rain: 0.00
+        >>> columns = WeatherColumns()
+        >>> columns[date(2024, 7, 13)] = DailyWeather((0, 0, 0), (0, 0, 0))
+        >>> date(2024, 7, 14) in columns
+        False
         """
-        lat, long = self.coordinates
-        res = f"{self.name} ({lat:.2f}, {long:.2f}):\n"
-        res += "\n".join([f"{k}: {str(v)}" for k, v in self._records.items()])
-        return res
+        return self.find(d.toordinal()) != -1
 
-    def add_weather(self, d: date, w: DailyWeather) -> None:
+    def __getitem__(self, d: date) -> DailyWeather:
+        """Return a new DailyWeather holding the weather recorded on <d>.
+
+        Raise a KeyError if no weather has been recorded on <d>.
+
+        >>> columns = WeatherColumns()
+        >>> columns[date(2024, 7, 13)] = DailyWeather((1, 0, 2), (0, 0, 0))
+        >>> columns[date(2024, 7, 13)].high_temp
+        2.0
+        """
+        i = self.find(d.toordinal())
+        if i == -1:
+            raise KeyError(d)
+        return self.weather_at(i)
+
+    def __setitem__(self, d: date, w: DailyWeather) -> None:
         """Record that <w> was the weather on the date <d>.
 
-        If a record for date <d> already exists, then do nothing (i.e. do not
-        change the information that is already recorded).
+        Preconditions:
+        - d not in self
 
-        >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
-        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
-        >>> toronto_weather.add_weather(date.today(), weather)
-        >>> print(toronto_weather.retrieve_weather(date.today()).avg_temp)
-        13
+        >>> columns = WeatherColumns()
+        >>> columns[date(2024, 7, 13)] = DailyWeather((1, 0, 2), (0, 0, 0))
+        >>> len(columns)
+        1
         """
-        if d in self._records:
-            pass
-        else:
-            self._records[d] = w
+        self.insert(d.toordinal(), w)
 
-    def retrieve_weather(self, d: date) -> Optional[DailyWeather]:
-        """Return the weather on day <d> if available, otherwise return None.
+    def __iter__(self) -> Iterator[date]:
+        """Return an iterator over the recorded dates, in date order.
 
-        >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
-        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
-        >>> toronto_weather.add_weather(date.today(), weather)
-        >>> toronto_weather.retrieve_weather(date.today()).avg_temp == 13
-        True
+        >>> columns = WeatherColumns()
+        >>> columns[date(2024, 7, 14)] = DailyWeather((0, 0, 0), (0, 0, 0))
+        >>> columns[date(2024, 7, 13)] = DailyWeather((0, 0, 0), (0, 0, 0))
+        >>> [str(d) for d in columns]
+        ['2024-07-13', '2024-07-14']
         """
-        if d in self._records:
-            return self._records[d]
-        else:
-            return None
+        return map(date.fromordinal, self.days)
 
-    def record_high(self, m: int, d: int) -> float:
-        """Return the highest temperature recorded at this location on month <m>
-        and day <d> in any year.
-        Note that months are represented by numbers 1-12.
+    def items(self) -> Iterator[tuple[date, DailyWeather]]:
+        """Return an iterator over each recorded date and its weather, in date
+        order.
+
+        >>> columns = WeatherColumns()
+        >>> columns[date(2024, 7, 13)] = DailyWeather((0, 0, 0), (0, 0, 0))
+        >>> [(str(d), w.avg_temp) for d, w in columns.items()]
+        [('2024-07-13', 0.0)]
+        """
+        for i in range(len(self.days)):
+            yield date.fromordinal(self.days[i]), self.weather_at(i)
+
+    def column(self, attribute: str) -> array:
+        """Return the column holding the DailyWeather attribute called
+        <attribute>.
 
         Preconditions:
-        - 1 <= m <= 12
-        - 1 <= d <= 31 and d is possible day for the month m. For example,
-          if m is 9 (for September), m will not be 31, since September has
-          30 days.
-        - The weather on month m and day d has been recorded for this
-          location in at least one year.
+        - attribute is one of 'avg_temp', 'low_temp', 'high_temp',
+          'precipitation', 'rainfall' and 'snowfall'
 
-        >>> weather1 = DailyWeather((13.0, 10.0, 40.0), (0.0, 0.0, 0.0))
-        >>> weather2 = DailyWeather((13.0, 10.0, 30.0), (0.0, 0.0, 0.0))
-        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
-        >>> day1 = date(2024, 6, 8)
-        >>> day2 = date(2023, 6, 8)
-        >>> toronto_weather.add_weather(day1, weather1)
-        >>> toronto_weather.add_weather(day2, weather2)
-        >>> toronto_weather.record_high(6, 8)
-        40.0
+        >>> columns = WeatherColumns()
+        >>> columns[date(2024, 7, 13)] = DailyWeather((1, 0, 2), (0, 0, 0))
+        >>> list(columns.column('high_temp'))
+        [2.0]
         """
-        max_temp = 0.0
+        if attribute in TEMPERATURES:
+            return getattr(self, attribute.replace('_temp', '_temps'))
+        else:
+            return getattr(self, attribute)
 
-        for dates in self._records:
-            if dates.month == m and dates.day == d:
-                if self._records[dates].high_temp > max_temp:
-                    max_temp = self._records[dates].high_temp
+    def find(self, ordinal: int) -> int:
+        """Return the index of the date with ordinal <ordinal> in these
+        columns, or -1 if that date has not been recorded.
 
-        return max_temp
+        >>> columns = WeatherColumns()
+        >>> _ = columns.insert(5, DailyWeather((0, 0, 0), (0, 0, 0)))
+        >>> columns.find(5)
+        0
+        >>> columns.find(6)
+        -1
+        """
+        i = bisect_left(self.days, ordinal)
+        if i < len(self.days) and self.days[i] == ordinal:
+            return i
+        else:
+            return -1
 
-    def monthly_average(self) -> dict[str, Optional[float]]:
-        """For each of the 12 months, return the average of the minimum
-        temperatures for all dates in that month (in any year) that have
-        weather recorded.
+    def insert(self, ordinal: int, w: DailyWeather) -> bool:
+        """Record that <w> was the weather on the date with ordinal <ordinal>,
+        and return whether it was recorded.
 
-        Return the result in a dictionary mapping month name to average,
-        and using these three-character names for the months:
-            Jan, Feb, Mar, Apr, May, Jun, Jul, Aug, Sep, Oct, Nov, Dec.
-        If a month has no weather recorded in any year, map that month name
-        to the value None.
+        If that date has already been recorded, then do nothing and return
+        False.
 
-        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
-        >>> jan1_weather = DailyWeather((13, 11, 30), (0, 0, 0))
-        >>> toronto_weather.add_weather(date(2023, 1, 1), jan1_weather)
-        >>> jan2_weather = DailyWeather((13, 10, 30), (0, 0, 0))
-        >>> toronto_weather.add_weather(date(2023, 1, 2), jan2_weather)
-        >>> jan2024_weather = DailyWeather((13, 0, 30), (0, 0, 0))
-        >>> toronto_weather.add_weather(date(2024, 1, 18), jan2024_weather)
-        >>> feb_weather = DailyWeather((13, 11, 30), (0, 0, 0))
-        >>> toronto_weather.add_weather(date(2023, 2, 1), feb_weather)
-        >>> d = toronto_weather.monthly_average()
-        >>> len(d)
-        12
-        >>> d['Jan'] == 7.0
-        True
-        >>> d['Feb'] == 11.0
+        >>> columns = WeatherColumns()
+        >>> columns.insert(7, DailyWeather((0, 0, 0), (0, 0, 0)))
         True
-        >>> d['Mar'] is None
+        >>> columns.insert(5, DailyWeather((1, 1, 1), (0, 0, 0)))
         True
+        >>> columns.insert(7, DailyWeather((2, 2, 2), (0, 0, 0)))
+        False
+        >>> list(columns.days)
+        [5, 7]
         """
-        monthly_avg = {}
-        month_lst = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug',
-                     'Sep', 'Oct', 'Nov', 'Dec']
+        # Data usually arrives in date order, so try appending first.
+        if not self.days or ordinal > self.days[-1]:
+            i = len(self.days)
+        else:
+            i = bisect_left(self.days, ordinal)
+            if self.days[i] == ordinal:
+                return False
 
-        for month_num in range(12):
-            month_name = month_lst[month_num]
-            total_min_temp = 0.0
-            count = 0
+        self.days.insert(i, ordinal)
+        self.avg_temps.insert(i, w.avg_temp)
+        self.low_temps.insert(i, w.low_temp)
+        self.high_temps.insert(i, w.high_temp)
+        self.precipitation.insert(i, max(w.precipitation, 0))
+        self.rainfall.insert(i, max(w.rainfall, 0))
+        self.snowfall.insert(i, max(w.snowfall, 0))
+        self.trace.insert(i, _trace_mask(w.precipitation, w.rainfall,
+                                         w.snowfall))
+        return True
 
-            for dates in self._records:
-                if dates.month == month_num + 1:
-                    total_min_temp += self._records[dates].low_temp
-                    count += 1
+    def append(self, ordinal: int,
+               temperature_statistics: tuple[float, float, float],
+               precipitation_statistics: tuple[float, float, float]) -> None:
+        """Record the weather on the date with ordinal <ordinal>, which is
+        later than every date recorded so far.
 
-            if count > 0:
-                monthly_avg[month_name] = total_min_temp / count
-            else:
-                monthly_avg[month_name] = None
+        The statistics are in the same order, and follow the same
+        conventions, as the arguments to DailyWeather.__init__.
 
-        return monthly_avg
+        Preconditions:
+        - len(self.days) == 0 or ordinal > self.days[-1]
 
-    def contiguous_precipitation(self) -> tuple[date, int]:
-        """Return the start date and length of the longest sequence of
-        consecutive days that had precipitation.
+        >>> columns = WeatherColumns()
+        >>> columns.append(5, (1, 0, 2), (3, -1, 0))
+        >>> columns.append(6, (2, 1, 3), (0, 0, 0))
+        >>> columns.weather_at(0).rainfall
+        -1.0
+        >>> list(columns.days)
+        [5, 6]
+        """
+        precip, rain, snow = precipitation_statistics
+        self.days.append(ordinal)
+        self.avg_temps.append(temperature_statistics[0])
+        self.low_temps.append(temperature_statistics[1])
+        self.high_temps.append(temperature_statistics[2])
+        self.precipitation.append(max(precip, 0))
+        self.rainfall.append(max(rain, 0))
+        self.snowfall.append(max(snow, 0))
+        self.trace.append(_trace_mask(precip, rain, snow))
 
-        A day is considered to have had precipitation if its precipitation
-        value is either above 0 or is -1 (indicating that there were trace
-        amounts of precipitation). The days in a sequence must have been
-        consecutive, that is, there can be no day between them. For example.
-        if we have recorded weather for July 3rd, 5th, and 6th, that is not
-        a sequence of consecutive days.
+    def weather_at(self, i: int) -> DailyWeather:
+        """Return a new DailyWeather holding the weather recorded at index <i>
+        of these columns.
 
-        In the case of a tie for the longest sequence, any one of the tied
-        start dates can be returned.
+        Preconditions:
+        - 0 <= i < len(self.days)
 
-        In the case when there are no contigious days with percipitation
-        (there were no days with percipitation at all),
-        return a tuple with any date in self._records and 1.
+        >>> columns = WeatherColumns()
+        >>> _ = columns.insert(5, DailyWeather((1, 0, 2), (3, -1, 0)))
+        >>> columns.weather_at(0).rainfall
+        -1.0
+        """
+        trace = self.trace[i]
+        return DailyWeather(
+            (self.avg_temps[i], self.low_temps[i], self.high_temps[i]),
+            (-1.0 if trace & PRECIP_TRACE else self.precipitation[i],
+             -1.0 if trace & RAIN_TRACE else self.rainfall[i],
+             -1.0 if trace & SNOW_TRACE else self.snowfall[i]))
 
-        NOTE: You may not assume the addition order of data into this
-            HistoricalWeather object.
 
-        Preconditions:
-        - At least one day's weather has been recorded.
+@check_contracts
+class RunColumns:
+    """The daily weather for one place, stored one column per measurement,
+    with the dates stored as runs of consecutive days.
 
-        >>> weather1 = DailyWeather((0, 0, 0), (1, 0, 0))
-        >>> weather2 = DailyWeather((0, 0, 0), (2, 0, 0))
-        >>> weather3 = DailyWeather((0, 0, 0), (1, 0, 0))
-        >>> weather4 = DailyWeather((0, 0, 0), (1, 0, 0))
-        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
-        >>> delta = timedelta(days=1)
-        >>> toronto_weather.add_weather(date.today(), weather1)
-        >>> toronto_weather.add_weather(date.today() + delta, weather2)
-        >>> toronto_weather.add_weather(date.today() + 2 * delta, weather3)
-        >>> toronto_weather.add_weather(date.today() + 3 * delta, weather4)
-        >>> result = toronto_weather.contiguous_precipitation()
-        >>> result[0] == date.today()
-        True
-        >>> result[1]
-        4
-        >>> weather1 = DailyWeather((0, 0, 0), (1, 0, 0))
-        >>> weather2 = DailyWeather((0, 0, 0), (2, 0, 0))
-        >>> weather3 = DailyWeather((0, 0, 0), (1, 0, 0))
-        >>> montreal_weather = HistoricalWeather('Montreal', (45.47, -73.74))
-        >>> montreal_weather.add_weather(date(2024, 4, 3), weather1)
-        >>> montreal_weather.add_weather(date(2024, 4, 5), weather2)
-        >>> montreal_weather.add_weather(date(2024, 4, 7), weather3)
-        >>> # No consecutive days
-        >>> result = montreal_weather.contiguous_precipitation()
-        >>> result[1]
-        1
-        """
-        dates_lst = []
+    Station histories are mostly long runs of consecutive days with a few
+    gaps, so instead of the ordinal of every date, as in a WeatherColumns,
+    only the first ordinal of each run and the position of its first day in
+    the columns are kept. Position i of every column describes the i-th
+    recorded date, in date order. Finding a date takes a binary search over
+    the runs, and then no more than a subtraction within its run.
 
-        for dates in self._records:
-            if self._records[dates].precipitation != 0:
-                dates_lst.append(dates)
+    If made with tenths=True, the temperature columns hold whole numbers of
+    tenths of a degree in 2-byte integers, which store the one-decimal
+    temperatures in the station files exactly in a quarter of the space. A
+    temperature column switches to 8-byte floats the first time it is given
+    a temperature that cannot be stored exactly that way.
 
-        dates_lst.sort()
+    Like a WeatherColumns, a RunColumns can be used like a dictionary
+    mapping each recorded date to its DailyWeather, in date order.
 
-        max_length = 0
-        max_start = dates_lst[0]
-        current_length = 0
-        current_start = dates_lst[0]
+    === Instance Attributes ===
+    run_starts: The ordinal of the first date of each run of consecutive
+        recorded dates, in increasing order.
+    run_positions: The position in the columns of the first date of each
+        run, in the same order as run_starts.
+    avg_temps: The average temperature on each recorded date, in tenths of a
+        degree if its typecode is 'h', with -2 ** 15 standing for -0.0.
+    low_temps: The minimum temperature on each recorded date, stored in the
+        same way as avg_temps.
+    high_temps: The maximum temperature on each recorded date, stored in the
+        same way as avg_temps.
+    precipitation: As in WeatherColumns.
+    rainfall: As in WeatherColumns.
+    snowfall: As in WeatherColumns.
+    trace: As in WeatherColumns.
 
-        for i in range(len(dates_lst) - 1):
-            current_day = dates_lst[i]
-            next_day = dates_lst[i + 1]
+    === Representation Invariants ===
+    - len(self.run_starts) == len(self.run_positions)
+    - len(self.run_positions) == 0 or self.run_positions[0] == 0
+    - len(self.avg_temps) == len(self.precipitation)
+    - len(self.low_temps) == len(self.precipitation)
+    - len(self.high_temps) == len(self.precipitation)
+    - len(self.rainfall) == len(self.precipitation)
+    - len(self.snowfall) == len(self.precipitation)
+    - len(self.trace) == len(self.precipitation)
+    - Each run ends at least one day before the next run starts, and has at
+      least one day.
 
-            if next_day == current_day + timedelta(days=1):
-                current_length += 1
-            else:
-                if current_length > max_length:
-                    max_length = current_length
-                    max_start = current_start
+    === Sample Usage ===
+    >>> columns = RunColumns(tenths=True)
+    >>> for day in [1, 2, 3, 5]:
+    ...     columns.append(date(2024, 7, day).toordinal(), (13.1, 9, 20.5),
+    ...                    (0, 0, 0))
+    >>> len(columns), len(columns.run_starts)
+    (4, 2)
+    >>> columns[date(2024, 7, 5)].avg_temp
+    13.1
+    >>> date(2024, 7, 4) in columns
+    False
+    >>> columns.high_temps.typecode
+    'h'
+    """
+    run_starts: array
+    run_positions: array
+    avg_temps: array
+    low_temps: array
+    high_temps: array
+    precipitation: array
+    rainfall: array
+    snowfall: array
+    trace: array
 
-                current_length = 1
-                current_start = next_day
+    def __init__(self, tenths: bool = False) -> None:
+        """Initialize these columns with no recorded weather, storing
+        temperatures in tenths of a degree if <tenths> is True.
 
-        if current_length > max_length:
-            max_length = current_length
-            max_start = current_start
+        >>> len(RunColumns())
+        0
+        """
+        self.run_starts = array('q')
+        self.run_positions = array('q')
+        temperature_type = 'h' if tenths else 'd'
+        self.avg_temps = array(temperature_type)
+        self.low_temps = array(temperature_type)
+        self.high_temps = array(temperature_type)
+        self.precipitation = array('d')
+        self.rainfall = array('d')
+        self.snowfall = array('d')
+        self.trace = array('B')
 
-        return max_start, max_length + 1
+    def __len__(self) -> int:
+        """Return the number of days recorded in these columns.
 
-    def percentage_snowfall(self) -> float:
-        """Return the fraction of the snowfall and rainfall at this location
-        that was snowfall, across all dates when weather was recorded there.
+        >>> columns = RunColumns()
+        >>> columns[date(2024, 7, 13)] = DailyWeather((0, 0, 0), (0, 0, 0))
+        >>> len(columns)
+        1
+        """
+        return len(self.precipitation)
 
-        The answer returned should be calculated as:
-            total snowfall / (total snowfall + total rainfall)
+    def __contains__(self, d: date) -> bool:
+        """Return whether weather has been recorded on the date <d>.
 
-        Do not count trace amounts in this calculation. Ignore the units in
-        the calculation.  (This is equivalent to assuming that 1 mm of
-        rain is equivalent to 1 cm of snow.)
+        >>> columns = RunColumns()
+        >>> columns[date(2024, 7, 13)] = DailyWeather((0, 0, 0), (0, 0, 0))
+        >>> date(2024, 7, 14) in columns
+        False
+        """
+        return self.find(d.toordinal()) != -1
 
-        Precondition:
-        - At least one day's weather has been recorded where
-          snowfall > 0 or rainfall > 0 or both.
+    def __getitem__(self, d: date) -> DailyWeather:
+        """Return a new DailyWeather holding the weather recorded on <d>.
 
-        >>> weather1 = DailyWeather((0, 0, 0), (1, 0, 1))
-        >>> weather2 = DailyWeather((0, 0, 0), (3, 3, 0))
-        >>> today = date(2024, 5, 1)
-        >>> delta = timedelta(days=1)
-        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
-        >>> toronto_weather.add_weather(today, weather1)
-        >>> toronto_weather.add_weather(today + delta, weather2)
-        >>> toronto_weather.percentage_snowfall()
-        0.25
+        Raise a KeyError if no weather has been recorded on <d>.
+
+        >>> columns = RunColumns()
+        >>> columns[date(2024, 7, 13)] = DailyWeather((1, 0, 2), (0, 0, 0))
+        >>> columns[date(2024, 7, 13)].high_temp
+        2.0
         """
-        total_rainfall = 0.0
-        total_snowfall = 0.0
+        i = self.find(d.toordinal())
+        if i == -1:
+            raise KeyError(d)
+        return self.weather_at(i)
 
-        for dates in self._records:
-            if self._records[dates].rainfall != -1.0:
-                total_rainfall += self._records[dates].rainfall
+    def __setitem__(self, d: date, w: DailyWeather) -> None:
+        """Record that <w> was the weather on the date <d>.
 
-            if self._records[dates].snowfall != -1.0:
-                total_snowfall += self._records[dates].snowfall
+        Preconditions:
+        - d not in self
 
-        return total_snowfall / (total_snowfall + total_rainfall)
+        >>> columns = RunColumns()
+        >>> columns[date(2024, 7, 13)] = DailyWeather((1, 0, 2), (0, 0, 0))
+        >>> len(columns)
+        1
+        """
+        self.insert(d.toordinal(), w)
 
+    def __iter__(self) -> Iterator[date]:
+        """Return an iterator over the recorded dates, in date order.
 
-@check_contracts
-class Country:
-    """ The weather records for various locations in a country.
+        >>> columns = RunColumns()
+        >>> columns[date(2024, 7, 14)] = DailyWeather((0, 0, 0), (0, 0, 0))
+        >>> columns[date(2024, 7, 13)] = DailyWeather((0, 0, 0), (0, 0, 0))
+        >>> [str(d) for d in columns]
+        ['2024-07-13', '2024-07-14']
+        """
+        return map(date.fromordinal, self.ordinals())
 
-    === Instance Attributes ===
-    name: Name of the country.
+    def items(self) -> Iterator[tuple[date, DailyWeather]]:
+        """Return an iterator over each recorded date and its weather, in date
+        order.
 
-    === Private Attributes ===
-    _histories:
-        The weather records for this country. Each key is a location's name,
-        and its value is that location's weather history
+        >>> columns = RunColumns()
+        >>> columns[date(2024, 7, 13)] = DailyWeather((0, 0, 0), (0, 0, 0))
+        >>> [(str(d), w.avg_temp) for d, w in columns.items()]
+        [('2024-07-13', 0.0)]
+        """
+        for i, ordinal in enumerate(self.ordinals()):
+            yield date.fromordinal(ordinal), self.weather_at(i)
 
-    === Representation Invariants ===
-    - For each key, k, of _histories, k == _histories[k].name
+    def last(self) -> Optional[int]:
+        """Return the ordinal of the latest recorded date, or None if no
+        weather has been recorded.
 
-    === Sample Usage ===
-    >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
-    >>> toronto_weather = HistoricalWeather('YYZ', (43.6529, -79.3849))
-    >>> toronto_weather.add_weather(date.today(), weather)
-    >>> canada = Country('Canada')
-    >>> canada.add_history(toronto_weather)
-    >>> yyz = canada.retrieve_history('YYZ')
-    >>> yyz.retrieve_weather(date.today()).avg_temp == 13
-    True
+        >>> columns = RunColumns()
+        >>> columns.last() is None
+        True
+        >>> columns.append(7, (0, 0, 0), (0, 0, 0))
+        >>> columns.last()
+        7
+        """
+        if len(self.run_starts) == 0:
+            return None
+        return (self.run_starts[-1] + len(self.precipitation) - 1
+                - self.run_positions[-1])
+
+    def runs(self, lo: int = 0, hi: Optional[int] = None
+             ) -> Iterator[tuple[int, int, int]]:
+        """Yield (ordinal, start, stop) for each run of consecutive recorded
+        dates at positions <lo> up to but not including <hi>, in date order:
+        the run covers positions start up to but not including stop, and
+        ordinal is the ordinal of its date at position start. If <hi> is
+        None, every position from <lo> on is covered.
+
+        Runs that only partly lie between <lo> and <hi> are cut short.
+
+        >>> columns = RunColumns()
+        >>> for ordinal in [1, 2, 3, 5, 6]:
+        ...     columns.append(ordinal, (0, 0, 0), (0, 0, 0))
+        >>> list(columns.runs())
+        [(1, 0, 3), (5, 3, 5)]
+        >>> list(columns.runs(1, 4))
+        [(2, 1, 3), (5, 3, 4)]
+        """
+        hi = len(self.precipitation) if hi is None else hi
+        r = bisect_right(self.run_positions, lo) - 1
+        while lo < hi and r < len(self.run_starts) \
+                and self.run_positions[r] < hi:
+            start = max(self.run_positions[r], lo)
+            stop = (len(self.precipitation) if r + 1 == len(self.run_starts)
+                    else self.run_positions[r + 1])
+            yield (self.run_starts[r] + start - self.run_positions[r], start,
+                   min(stop, hi))
+            r += 1
+
+    def ordinals(self, lo: int = 0,
+                 hi: Optional[int] = None) -> Iterator[int]:
+        """Yield the ordinal of each recorded date at positions <lo> up to but
+        not including <hi>, in date order. If <hi> is None, every position
+        from <lo> on is covered.
+
+        >>> columns = RunColumns()
+        >>> for ordinal in [1, 2, 5]:
+        ...     columns.append(ordinal, (0, 0, 0), (0, 0, 0))
+        >>> list(columns.ordinals(1))
+        [2, 5]
+        """
+        for ordinal, start, stop in self.runs(lo, hi):
+            yield from range(ordinal, ordinal + stop - start)
+
+    def find(self, ordinal: int) -> int:
+        """Return the position of the date with ordinal <ordinal> in these
+        columns, or -1 if that date has not been recorded.
+
+        >>> columns = RunColumns()
+        >>> columns.append(5, (0, 0, 0), (0, 0, 0))
+        >>> columns.append(6, (0, 0, 0), (0, 0, 0))
+        >>> columns.find(6), columns.find(7)
+        (1, -1)
+        """
+        r = bisect_right(self.run_starts, ordinal) - 1
+        if r == -1:
+            return -1
+        i = self.run_positions[r] + ordinal - self.run_starts[r]
+        stop = (len(self.precipitation) if r + 1 == len(self.run_starts)
+                else self.run_positions[r + 1])
+        return i if i < stop else -1
+
+    def position(self, ordinal: int) -> int:
+        """Return the number of recorded dates whose ordinal is less than
+        <ordinal>, which is the position that date has or would have in
+        these columns.
+
+        >>> columns = RunColumns()
+        >>> for ordinal in [1, 2, 5]:
+        ...     columns.append(ordinal, (0, 0, 0), (0, 0, 0))
+        >>> [columns.position(ordinal) for ordinal in range(7)]
+        [0, 0, 1, 2, 2, 2, 3]
+        """
+        r = bisect_right(self.run_starts, ordinal) - 1
+        if r == -1:
+            return 0
+        stop = (len(self.precipitation) if r + 1 == len(self.run_starts)
+                else self.run_positions[r + 1])
+        return min(self.run_positions[r] + ordinal - self.run_starts[r], stop)
+
+    def insert(self, ordinal: int, w: DailyWeather) -> bool:
+        """Record that <w> was the weather on the date with ordinal <ordinal>,
+        and return whether it was recorded.
+
+        If that date has already been recorded, then do nothing and return
+        False. A date that fills the gap between two runs joins them into
+        one.
+
+        >>> columns = RunColumns()
+        >>> for ordinal in [7, 5, 6, 5]:
+        ...     _ = columns.insert(ordinal, DailyWeather((0, 0, 0), (0, 0, 0)))
+        >>> list(columns.run_starts), list(columns.ordinals())
+        ([5], [5, 6, 7])
+        """
+        if len(self) == 0 or ordinal > self.last():
+            self.append(ordinal, (w.avg_temp, w.low_temp, w.high_temp),
+                        (w.precipitation, w.rainfall, w.snowfall))
+            return True
+        if self.find(ordinal) != -1:
+            return False
+
+        i = self.position(ordinal)
+        r = bisect_right(self.run_starts, ordinal) - 1
+        joins_previous = r >= 0 and \
+            self.run_starts[r] + i - self.run_positions[r] == ordinal
+        joins_next = (r + 1 < len(self.run_starts)
+                      and self.run_starts[r + 1] == ordinal + 1)
+        self._insert_values(i, (w.avg_temp, w.low_temp, w.high_temp),
+                            (w.precipitation, w.rainfall, w.snowfall))
+        for k in range(r + 1, len(self.run_positions)):
+            self.run_positions[k] += 1
+        if joins_previous and joins_next:
+            del self.run_starts[r + 1]
+            del self.run_positions[r + 1]
+        elif joins_next:
+            self.run_starts[r + 1] = ordinal
+            self.run_positions[r + 1] = i
+        elif not joins_previous:
+            self.run_starts.insert(r + 1, ordinal)
+            self.run_positions.insert(r + 1, i)
+        return True
+
+    def append(self, ordinal: int,
+               temperature_statistics: tuple[float, float, float],
+               precipitation_statistics: tuple[float, float, float]) -> None:
+        """Record the weather on the date with ordinal <ordinal>, which is
+        later than every date recorded so far.
+
+        The statistics are in the same order, and follow the same
+        conventions, as the arguments to DailyWeather.__init__.
+
+        Preconditions:
+        - len(self) == 0 or ordinal > self.last()
+
+        >>> columns = RunColumns()
+        >>> columns.append(5, (1, 0, 2), (3, -1, 0))
+        >>> columns.append(6, (2, 1, 3), (0, 0, 0))
+        >>> columns.weather_at(0).rainfall
+        -1.0
+        >>> list(columns.run_starts)
+        [5]
+        """
+        if len(self.run_starts) == 0 or ordinal != self.last() + 1:
+            self.run_starts.append(ordinal)
+            self.run_positions.append(len(self.precipitation))
+        self._insert_values(len(self.precipitation), temperature_statistics,
+                            precipitation_statistics)
+
+    def _insert_values(self, i: int,
+                       temperature_statistics: tuple[float, float, float],
+                       precipitation_statistics: tuple[float, float, float]
+                       ) -> None:
+        """Insert the given statistics at position <i> of every column,
+        without updating the runs.
+        """
+        for attribute, value in zip(('avg_temps', 'low_temps', 'high_temps'),
+                                    temperature_statistics):
+            column = getattr(self, attribute)
+            if column.typecode == 'h':
+                tenths = _tenths(value)
+                if tenths is not None:
+                    column.insert(i, tenths)
+                    continue
+                column = array('d', map(_from_tenths, column))
+                setattr(self, attribute, column)
+            column.insert(i, value)
+
+        precip, rain, snow = precipitation_statistics
+        self.precipitation.insert(i, max(precip, 0))
+        self.rainfall.insert(i, max(rain, 0))
+        self.snowfall.insert(i, max(snow, 0))
+        self.trace.insert(i, _trace_mask(precip, rain, snow))
+
+    def statistics_at(self, i: int) -> tuple[tuple[float, float, float],
+                                             tuple[float, float, float]]:
+        """Return the temperature and precipitation statistics recorded at
+        position <i> of these columns, in the same order, and following the
+        same conventions, as the arguments to DailyWeather.__init__.
+
+        Preconditions:
+        - 0 <= i < len(self)
+
+        >>> columns = RunColumns(tenths=True)
+        >>> columns.append(5, (1.5, 0, 2), (3, -1, 0))
+        >>> columns.statistics_at(0)
+        ((1.5, 0.0, 2.0), (3.0, -1.0, 0.0))
+        """
+        avg, low, high = self.avg_temps, self.low_temps, self.high_temps
+        trace = self.trace[i]
+        return ((_from_tenths(avg[i]) if avg.typecode == 'h' else avg[i],
+                 _from_tenths(low[i]) if low.typecode == 'h' else low[i],
+                 _from_tenths(high[i]) if high.typecode == 'h' else high[i]),
+                (-1.0 if trace & PRECIP_TRACE else self.precipitation[i],
+                 -1.0 if trace & RAIN_TRACE else self.rainfall[i],
+                 -1.0 if trace & SNOW_TRACE else self.snowfall[i]))
+
+    def weather_at(self, i: int) -> DailyWeather:
+        """Return a new DailyWeather holding the weather recorded at position
+        <i> of these columns.
+
+        Preconditions:
+        - 0 <= i < len(self)
+
+        >>> columns = RunColumns()
+        >>> columns.append(5, (1, 0, 2), (3, -1, 0))
+        >>> columns.weather_at(0).rainfall
+        -1.0
+        """
+        return DailyWeather(*self.statistics_at(i))
+
+    def expand(self, lo: int = 0, hi: Optional[int] = None) -> WeatherColumns:
+        """Return a new WeatherColumns holding the weather recorded at
+        positions <lo> up to but not including <hi> of these columns. If
+        <hi> is None, every position from <lo> on is included.
+
+        >>> columns = RunColumns(tenths=True)
+        >>> for ordinal in [1, 2, 5]:
+        ...     columns.append(ordinal, (0.5, 0, 0), (0, 0, 0))
+        >>> expanded = columns.expand(1)
+        >>> list(expanded.days), list(expanded.avg_temps)
+        ([2, 5], [0.5, 0.5])
+        """
+        hi = len(self) if hi is None else hi
+        expanded = WeatherColumns()
+        for ordinal, start, stop in self.runs(lo, hi):
+            expanded.days.extend(range(ordinal, ordinal + stop - start))
+        for column, source in ((expanded.avg_temps, self.avg_temps),
+                               (expanded.low_temps, self.low_temps),
+                               (expanded.high_temps, self.high_temps)):
+            if source.typecode == 'h':
+                column.extend(map(_from_tenths, source[lo:hi]))
+            else:
+                column.extend(source[lo:hi])
+        expanded.precipitation.extend(self.precipitation[lo:hi])
+        expanded.rainfall.extend(self.rainfall[lo:hi])
+        expanded.snowfall.extend(self.snowfall[lo:hi])
+        expanded.trace.extend(self.trace[lo:hi])
+        return expanded
+
+
+@check_contracts
+class RunningStats:
+    """Summary statistics of a sequence of numbers that is seen one number at
+    a time.
+
+    Adding a number takes constant time, and every statistic can be read in
+    constant time. The variance is kept up to date with Welford's method,
+    which avoids the loss of precision of the sum-of-squares formula.
+
+    === Instance Attributes ===
+    count: How many numbers have been added.
+    total: The sum of the numbers added.
+    minimum: The smallest number added, or math.inf if there are none.
+    maximum: The largest number added, or -math.inf if there are none.
+    mean: The mean of the numbers added, or 0.0 if there are none.
+
+    === Private Attributes ===
+    _sq_diffs: The sum of the squared differences between each number added
+        and mean.
+
+    === Representation Invariants ===
+    - self.count >= 0
+    - self._sq_diffs >= 0
+
+    === Sample Usage ===
+    >>> stats = RunningStats()
+    >>> for x in [2.0, 4.0, 4.0, 4.0, 5.0, 5.0, 7.0, 9.0]:
+    ...     stats.add(x)
+    >>> stats.count, stats.minimum, stats.maximum, stats.average()
+    (8, 2.0, 9.0, 5.0)
+    >>> stats.variance()
+    4.0
+    """
+    count: int
+    total: float
+    minimum: float
+    maximum: float
+    mean: float
+    _sq_diffs: float
+
+    def __init__(self) -> None:
+        """Initialize these statistics for an empty sequence.
+
+        >>> RunningStats().average() is None
+        True
+        """
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.mean = 0.0
+        self._sq_diffs = 0.0
+
+    def add(self, x: float) -> None:
+        """Add <x> to the sequence these statistics describe.
+
+        >>> stats = RunningStats()
+        >>> stats.add(3.5)
+        >>> stats.count, stats.total, stats.minimum, stats.maximum
+        (1, 3.5, 3.5, 3.5)
+        """
+        self.count += 1
+        self.total += x
+        if x < self.minimum:
+            self.minimum = x
+        if x > self.maximum:
+            self.maximum = x
+
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._sq_diffs += delta * (x - self.mean)
+
+    def average(self) -> Optional[float]:
+        """Return the average of the numbers added, or None if there are
+        none.
+
+        Unlike mean, this is computed as total / count, so it is exactly what
+        summing the numbers and dividing would give.
+
+        >>> stats = RunningStats()
+        >>> stats.add(11.0)
+        >>> stats.add(10.0)
+        >>> stats.add(0.0)
+        >>> stats.average()
+        7.0
+        """
+        if self.count == 0:
+            return None
+        return self.total / self.count
+
+    def variance(self) -> Optional[float]:
+        """Return the population variance of the numbers added, or None if
+        there are none.
+
+        >>> stats = RunningStats()
+        >>> stats.add(1.0)
+        >>> stats.variance()
+        0.0
+        >>> stats.add(3.0)
+        >>> stats.variance()
+        1.0
+        """
+        if self.count == 0:
+            return None
+        return self._sq_diffs / self.count
+
+
+@check_contracts
+class PrecipitationRuns:
+    """The longest sequence of consecutive days with precipitation among days
+    that are seen one at a time, in date order.
+
+    This is the one place where that sequence is found by looking at each
+    day in turn; see _longest_wet_run_np for the NumPy version.
+
+    === Private Attributes ===
+    _longest_start: The ordinal of the first day of the longest sequence of
+        consecutive days with precipitation added so far, or of the first
+        day added if no day had precipitation. If there is a tie, this is
+        the earliest of the tied sequences.
+    _longest_length: The length of that sequence, or 0 if no day had
+        precipitation.
+    _run_start: The ordinal of the first day of the sequence of consecutive
+        days with precipitation that ends with the last day added.
+    _run_length: The length of that sequence, or 0 if the last day added
+        had no precipitation.
+    _last_day: The ordinal of the last day added, or 0 if none has been
+        added.
+
+    === Representation Invariants ===
+    - self._longest_length >= self._run_length >= 0
+
+    === Sample Usage ===
+    >>> runs = PrecipitationRuns()
+    >>> runs.add_many([(date(2024, 4, 3).toordinal(), True),
+    ...                (date(2024, 4, 5).toordinal(), True),
+    ...                (date(2024, 4, 6).toordinal(), True),
+    ...                (date(2024, 4, 7).toordinal(), False)])
+    4
+    >>> runs.longest()
+    (datetime.date(2024, 4, 5), 2)
+    """
+    _longest_start: int
+    _longest_length: int
+    _run_start: int
+    _run_length: int
+    _last_day: int
+
+    def __init__(self) -> None:
+        """Initialize these runs with no days added yet.
+        """
+        self._longest_start = 0
+        self._longest_length = 0
+        self._run_start = 0
+        self._run_length = 0
+        self._last_day = 0
+
+    def add_many(self, days: Iterable[tuple[int, bool]]) -> int:
+        """Add each of <days>, given as (ordinal, wet) pairs, where wet is
+        whether the day had precipitation, including trace amounts, and
+        return the number of days added.
+
+        Preconditions:
+        - The ordinals in days are in increasing order, and each is greater
+          than the ordinal of every day already added.
+        """
+        # The state is kept in local variables while adding, which is
+        # quicker than updating the attributes once per day.
+        longest_start, longest_length = self._longest_start, \
+            self._longest_length
+        run_start, run_length = self._run_start, self._run_length
+        last_day = self._last_day
+        added = 0
+        for ordinal, wet in days:
+            if last_day == 0:
+                longest_start = ordinal
+            if not wet:
+                run_length = 0
+            elif run_length > 0 and ordinal == last_day + 1:
+                run_length += 1
+            else:
+                run_start = ordinal
+                run_length = 1
+            if run_length > longest_length:
+                longest_start = run_start
+                longest_length = run_length
+            last_day = ordinal
+            added += 1
+
+        self._longest_start, self._longest_length = longest_start, \
+            longest_length
+        self._run_start, self._run_length = run_start, run_length
+        self._last_day = last_day
+        return added
+
+    def longest(self) -> tuple[date, int]:
+        """Return the start date and length of the longest sequence of
+        consecutive days added that had precipitation, as
+        HistoricalWeather.contiguous_precipitation does. If there is a tie,
+        return the earliest of the tied sequences.
+
+        If no day had precipitation, return the first day added and 1.
+
+        Preconditions:
+        - At least one day has been added.
+        """
+        return (date.fromordinal(self._longest_start),
+                max(self._longest_length, 1))
+
+
+@check_contracts
+class StationSummary:
+    """The statistics about one location that Country.generate_summary
+    reports, computed in a single pass over the location's weather records.
+
+    The records must be added in date order, from oldest to most recent.
+    Each statistic matches what the HistoricalWeather method of the same
+    name would return for the records added.
+
+    === Instance Attributes ===
+    name: The name of the location.
+    december_lows: Statistics of the minimum temperatures on every December
+        day added.
+
+    === Private Attributes ===
+    _record_high: The highest temperature on any REPORT_DAY added, or
+        -math.inf if none has been added.
+    _snowfall_units: The total snowfall on the days added, not counting
+        trace amounts, as a whole number of 1 / _EXACT_SCALE units, so that
+        it is exact (see _exact_units).
+    _rainfall_units: The total rainfall on the days added, not counting
+        trace amounts, in the same units.
+    _precipitation_runs: The sequences of consecutive days with
+        precipitation among the days added.
+    _last_day: The ordinal of the last day added, or 0 if none has been
+        added.
+
+    === Sample Usage ===
+    >>> summary = StationSummary('Toronto')
+    >>> summary.add(date(2023, 12, 24), (0, -5, 3), (1, 0, 1))
+    >>> summary.add(date(2023, 12, 25), (0, -3, 2), (2, 1, 1))
+    >>> summary.record_high()
+    2.0
+    >>> summary.december_lows.average()
+    -4.0
+    >>> summary.contiguous_precipitation()
+    (datetime.date(2023, 12, 24), 2)
+    >>> summary.percentage_snowfall()
+    0.6666666666666666
     """
     name: str
-    _histories: dict[str, HistoricalWeather]
+    december_lows: RunningStats
+    _record_high: float
+    _snowfall_units: int
+    _rainfall_units: int
+    _precipitation_runs: PrecipitationRuns
+    _last_day: int
 
-    def __init__(self, n: str) -> None:
-        """ Initialize this Country with name <n> and no weather history so far.
+    def __init__(self, name: str) -> None:
+        """Initialize a summary of the location called <name>, with no
+        records added yet.
 
-        >>> canada = Country('Canada')
-        >>> print(canada.name)
-        Canada
+        >>> StationSummary('Toronto').name
+        'Toronto'
         """
-        self.name = n
-        self._histories = {}
+        self.name = name
+        self.december_lows = RunningStats()
+        self._record_high = -math.inf
+        self._snowfall_units = 0
+        self._rainfall_units = 0
+        self._precipitation_runs = PrecipitationRuns()
+        self._last_day = 0
 
-    def __str__(self) -> str:
-        """Return a str representing this Country.
+    def add(self, d: date, temperature_statistics: tuple[float, float, float],
+            precipitation_statistics: tuple[float, float, float]) -> None:
+        """Add the weather on the date <d> to this summary.
 
-        >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
-        >>> weather_2 = DailyWeather((14, 10, 21), (5, 0, 2.0))
-        >>> canada = Country('Canada')
-        >>> the_date = date(2024,7,13)
-        >>> loc1_data = HistoricalWeather('Toronto', (43.6, -79.63))
-        >>> loc1_data.add_weather(the_date, weather)
-        >>> loc2_data = HistoricalWeather('YYZ', (43.6529, -79.3849))
-        >>> loc2_data.add_weather(the_date - timedelta(1), weather)
-        >>> loc2_data.add_weather(the_date + timedelta(1), weather_2)
-        >>> canada.add_history(loc1_data)
-        >>> canada.add_history(loc2_data)
-        >>> print(canada)
-        Canada:
-        Toronto (43.60, -79.63):
-        2024-07-13: Average: 13.00 Low: 9.00 High: 20.00 Precipitation: 5.00 \
-Snow: 0.00 Rain: 0.00
-        YYZ (43.65, -79.38):
-        2024-07-12: Average: 13.00 Low: 9.00 High: 20.00 Precipitation: 5.00 \
-Snow: 0.00 Rain: 0.00
-        2024-07-14: Average: 14.00 Low: 10.00 High: 21.00 Precipitation: 5.00 \
-Snow: 2.00 Rain: 0.00
+        The statistics are in the same order, and follow the same
+        conventions, as the arguments to DailyWeather.__init__.
+
+        Preconditions:
+        - d is later than every date already added
         """
-        result = f'{self.name}:\n'
+        self.add_many(((d, temperature_statistics, precipitation_statistics),))
+
+    def add_many(self, days: Iterable[tuple[date, tuple[float, float, float],
+                                            tuple[float, float, float]]]
+                 ) -> int:
+        """Add the weather on each of <days>, given as (date, temperature
+        statistics, precipitation statistics) triples in date order, to this
+        summary, and return the number of days added.
+
+        A day that is not later than the last day added is skipped, so a date
+        given more than once keeps its first weather, as in
+        HistoricalWeather.add_weather_many.
+
+        >>> summary = StationSummary('Toronto')
+        >>> summary.add_many([(date(2023, 12, 24), (0, -5, 3), (1, 0, 1)),
+        ...                   (date(2023, 12, 25), (0, -3, 2), (2, 1, 1)),
+        ...                   (date(2023, 12, 25), (0, -3, 9), (0, 0, 0))])
+        2
+        >>> summary.record_high(), summary.contiguous_precipitation()[1]
+        (2.0, 2)
+        """
+        return self._precipitation_runs.add_many(self._add_days(days))
+
+    def _add_days(self, days: Iterable[tuple[date, tuple[float, float, float],
+                                             tuple[float, float, float]]]
+                  ) -> Iterator[tuple[int, bool]]:
+        """Add the weather on each of <days> that is later than the last day
+        added to every statistic but the sequences of days with
+        precipitation, and yield an (ordinal, wet) pair for it to add to
+        those, as add_many does.
+        """
+        for d, temperature_statistics, precipitation_statistics in days:
+            ordinal = d.toordinal()
+            if ordinal <= self._last_day:
+                continue
+            precipitation, rainfall, snowfall = precipitation_statistics
+
+            if (d.month, d.day) == REPORT_DAY:
+                self._record_high = max(self._record_high,
+                                        float(temperature_statistics[2]))
+            if d.month == REPORT_DAY[0]:
+                self.december_lows.add(float(temperature_statistics[1]))
+
+            if rainfall not in (0, -1):
+                self._rainfall_units += _exact_units(rainfall)
+            if snowfall not in (0, -1):
+                self._snowfall_units += _exact_units(snowfall)
+            self._last_day = ordinal
+            yield ordinal, precipitation != 0
+
+    def record_high(self) -> Optional[float]:
+        """Return the highest temperature on any REPORT_DAY added, or None if
+        no REPORT_DAY has been added.
+
+        >>> StationSummary('Toronto').record_high() is None
+        True
+        """
+        if self._record_high == -math.inf:
+            return None
+        return self._record_high
+
+    def contiguous_precipitation(self) -> tuple[date, int]:
+        """Return the start date and length of the longest sequence of
+        consecutive days added that had precipitation.
+
+        If no day had precipitation, return the first day added and 1.
+
+        Preconditions:
+        - At least one day has been added.
+        """
+        return self._precipitation_runs.longest()
+
+    def percentage_snowfall(self) -> float:
+        """Return the fraction of the snowfall and rainfall added that was
+        snowfall, not counting trace amounts.
+
+        Preconditions:
+        - At least one day has been added where snowfall > 0 or
+          rainfall > 0 or both.
+        """
+        return _snowfall_fraction(self._snowfall_units, self._rainfall_units)
+
+    def report_row(self) -> str:
+        """Return the row of the report written by Country.generate_summary
+        for this location, including the final newline.
+
+        Preconditions:
+        - At least one REPORT_DAY and one December day have been added.
+        - The preconditions of percentage_snowfall hold.
+
+        >>> summary = StationSummary('Toronto')
+        >>> summary.add(date(2023, 12, 25), (0, -3, 2), (2, 1, 1))
+        >>> summary.report_row()
+        'Toronto              | 2.0        | -3.0 | 1                        \
+| 0.5               \\n'
+        """
+        return (f"{self.name : <20} | {self.record_high() : <10.4} | "
+                f"{self.december_lows.average()} | "
+                f"{self.contiguous_precipitation()[1] : <24} | "
+                f"{self.percentage_snowfall() : <18.2}\n")
+
+
+@check_contracts
+class StatisticsCache:
+    """A cache of the results of statistics computed from a
+    HistoricalWeather, holding at most a fixed number of results.
+
+    Each result is stored under a key naming the statistic and its
+    arguments, along with the version of the history it was computed from.
+    When the history's version changes, because weather was recorded in it,
+    every cached result is thrown away. When the cache is full, the least
+    recently used result is thrown away to make room for a new one.
+
+    === Instance Attributes ===
+    capacity: The most results this cache can hold.
+    hits: The number of lookups answered from this cache.
+    misses: The number of lookups that had to compute their result.
+
+    === Private Attributes ===
+    _results: The cached results. Each key is a key passed to lookup, and
+        its value is the result computed for it. The least recently used
+        result comes first.
+    _version: The version of the history that the cached results were
+        computed from.
+    _computing: The keys whose results are being computed right now.
+
+    === Representation Invariants ===
+    - self.capacity >= 1
+    - len(self._results) <= self.capacity
+
+    === Sample Usage ===
+    >>> cache = StatisticsCache(2)
+    >>> cache.lookup(('answer',), 0, lambda: 42)
+    42
+    >>> cache.lookup(('answer',), 0, lambda: 0)
+    42
+    >>> cache.lookup(('answer',), 1, lambda: 43)
+    43
+    >>> cache.hits, cache.misses
+    (1, 2)
+    """
+    capacity: int
+    hits: int
+    misses: int
+    _results: OrderedDict
+    _version: int
+    _computing: set
+
+    def __init__(self, capacity: int) -> None:
+        """Initialize this cache to hold at most <capacity> results, and none
+        so far.
+
+        Preconditions:
+        - capacity >= 1
+
+        >>> len(StatisticsCache(10))
+        0
+        """
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._version = 0
+        self._computing = set()
+
+    def __len__(self) -> int:
+        """Return the number of results in this cache.
+
+        >>> cache = StatisticsCache(10)
+        >>> cache.lookup(('answer',), 0, lambda: 42)
+        42
+        >>> len(cache)
+        1
+        """
+        return len(self._results)
+
+    def lookup(self, key: tuple, version: int,
+               compute: Callable[[], object]) -> object:
+        """Return the result stored under <key> for version <version> of the
+        history, calling <compute> to compute it if it is not in this cache.
+
+        A lookup of a key whose result is already being computed, such as a
+        method of a subclass calling the method it overrides, just calls
+        <compute>, and is not counted as a hit or a miss.
+
+        >>> cache = StatisticsCache(1)
+        >>> cache.lookup(('a',), 0, lambda: 1)
+        1
+        >>> cache.lookup(('b',), 0, lambda: 2)
+        2
+        >>> cache.lookup(('a',), 0, lambda: 3)
+        3
+        """
+        if version != self._version:
+            self._results.clear()
+            self._version = version
+
+        if key in self._computing:
+            return compute()
+        elif key in self._results:
+            self.hits += 1
+            self._results.move_to_end(key)
+            return self._results[key]
+
+        self.misses += 1
+        self._computing.add(key)
+        try:
+            result = compute()
+        finally:
+            self._computing.discard(key)
+
+        self._results[key] = result
+        if len(self._results) > self.capacity:
+            self._results.popitem(last=False)
+        return result
+
+
+@check_contracts
+class ProfileRegistry:
+    """Timings of the phases of loading weather data and computing
+    statistics from it, recorded while PROFILE is True.
+
+    Each phase is named by the function it times, such as 'load_data' or
+    'HistoricalWeather.record_high'. The steps of loading the rows of a csv
+    file are also timed, and recorded once per file, as 'load_data.split'
+    (reading the lines and splitting them into columns), 'load_data.parse'
+    (converting the measurements to floats and making the dates) and
+    'load_data.record' (HistoricalWeather.add_weather_many, including its
+    contract checks when CHECK_CONTRACTS is True).
+
+    The number of calls, the rows and the total and longest time of each
+    phase are kept exactly, but only up to PROFILE_SAMPLES of the times of
+    its calls are kept, chosen at random once there are more, so that the
+    memory needed does not grow the longer a program runs. The percentiles
+    are worked out from those.
+
+    === Private Attributes ===
+    _calls: The number of timed calls of each phase, keyed by the phase's
+        name.
+    _rows: The total number of rows processed by the timed calls of each
+        phase, keyed by the phase's name.
+    _totals: The total time, in seconds, taken by the timed calls of each
+        phase, keyed by the phase's name.
+    _maxima: The longest time, in seconds, taken by a timed call of each
+        phase, keyed by the phase's name.
+    _samples: A sample of the times, in seconds, taken by the timed calls of
+        each phase, keyed by the phase's name: every time, until there are
+        more than PROFILE_SAMPLES of them.
+    _random: The source of the random choices of which times to sample.
+
+    === Representation Invariants ===
+    - self._calls.keys() == self._rows.keys() == self._totals.keys()
+    - self._calls.keys() == self._maxima.keys() == self._samples.keys()
+
+    === Sample Usage ===
+    >>> registry = ProfileRegistry()
+    >>> registry.record('load_data', 0.5, 100)
+    >>> registry.record('load_data', 1.5, 300)
+    >>> registry.stats()['load_data']
+    {'calls': 2, 'rows': 400, 'total': 2.0, 'max': 1.5, 'p50': 0.5, \
+'p99': 1.5}
+    """
+    _calls: dict[str, int]
+    _rows: dict[str, int]
+    _totals: dict[str, float]
+    _maxima: dict[str, float]
+    _samples: dict[str, list[float]]
+    _random: random.Random
+
+    def __init__(self) -> None:
+        """Initialize this registry with no phases recorded so far.
+
+        >>> ProfileRegistry().stats()
+        {}
+        """
+        self._random = random.Random(0)
+        self.reset()
+
+    def record(self, phase: str, seconds: float, rows: int) -> None:
+        """Record that one call of the phase called <phase> took <seconds>
+        seconds and processed <rows> rows.
+
+        Preconditions:
+        - seconds >= 0
+        - rows >= 0
+
+        >>> registry = ProfileRegistry()
+        >>> for i in range(10 * PROFILE_SAMPLES):
+        ...     registry.record('load_data', i / PROFILE_SAMPLES, 1)
+        >>> stats = registry.stats()['load_data']
+        >>> stats['calls'], stats['max']
+        (10240, 9.9990234375)
+        """
+        if phase not in self._calls:
+            self._calls[phase] = 0
+            self._rows[phase] = 0
+            self._totals[phase] = 0.0
+            self._maxima[phase] = seconds
+            self._samples[phase] = []
+        self._calls[phase] += 1
+        self._rows[phase] += rows
+        self._totals[phase] += seconds
+        self._maxima[phase] = max(self._maxima[phase], seconds)
+
+        # Keep each of the calls so far in the sample with the same chance.
+        samples = self._samples[phase]
+        if len(samples) < PROFILE_SAMPLES:
+            samples.append(seconds)
+        else:
+            i = self._random.randrange(self._calls[phase])
+            if i < len(samples):
+                samples[i] = seconds
+
+    def reset(self) -> None:
+        """Forget every phase recorded in this registry.
+
+        >>> registry = ProfileRegistry()
+        >>> registry.record('load_data', 0.5, 100)
+        >>> registry.reset()
+        >>> registry.stats()
+        {}
+        """
+        self._calls = {}
+        self._rows = {}
+        self._totals = {}
+        self._maxima = {}
+        self._samples = {}
+
+    def stats(self) -> dict[str, dict[str, Union[int, float]]]:
+        """Return the statistics of each phase recorded in this registry.
+
+        Each key is a phase's name, and its value gives the number of timed
+        calls, the number of rows they processed, and their total, longest
+        (max), median (p50) and 99th percentile (p99) time in seconds. The
+        percentiles are of the sampled times.
+        """
+        result = {}
+        for phase, samples in self._samples.items():
+            ordered = sorted(samples)
+            result[phase] = {'calls': self._calls[phase],
+                             'rows': self._rows[phase],
+                             'total': self._totals[phase],
+                             'max': self._maxima[phase],
+                             'p50': _percentile(ordered, 50),
+                             'p99': _percentile(ordered, 99)}
+        return result
+
+    def to_json(self) -> str:
+        """Return the statistics of each phase recorded in this registry
+        (see stats) as a JSON document, along with whether contracts were
+        being checked and NumPy used.
+
+        >>> registry = ProfileRegistry()
+        >>> registry.record('load_data', 0.5, 100)
+        >>> json.loads(registry.to_json())['phases']['load_data']['rows']
+        100
+        """
+        return json.dumps({'check_contracts': CHECK_CONTRACTS,
+                           'use_numpy': USE_NUMPY,
+                           'phases': self.stats()}, indent=2)
+
+    def dump(self, path: str) -> None:
+        """Write the statistics of each phase recorded in this registry to a
+        JSON file at <path> (see to_json).
+        """
+        with open(path, 'w') as f:
+            f.write(self.to_json())
+
+
+# The registry that phases are recorded in while PROFILE is True.
+PROFILER = ProfileRegistry()
+
+# The names of the phases being timed right now, so that a method that calls
+# the method it overrides is only timed once. Each thread, and each asyncio
+# task, has its own value, so phases timed at the same time in different
+# threads do not see each other.
+_ACTIVE_PHASES = ContextVar('_ACTIVE_PHASES', default=frozenset())
+
+
+def _percentile(ordered: list[float], p: int) -> float:
+    """Return the <p>th percentile of <ordered>, by the nearest rank method.
+
+    Preconditions:
+    - ordered is sorted in non-decreasing order, and is not empty
+    - 0 < p <= 100
+
+    >>> _percentile([1.0, 2.0, 3.0, 4.0], 50)
+    2.0
+    >>> _percentile([1.0, 2.0, 3.0, 4.0], 99)
+    4.0
+    """
+    return ordered[math.ceil(p * len(ordered) / 100) - 1]
+
+
+def _profiled(phase: str, rows: Callable[[tuple, object], int]) \
+        -> Callable[[Callable], Callable]:
+    """Return a decorator that records the time taken by each call of the
+    function it decorates in PROFILER, as the phase called <phase>, while
+    PROFILE is True.
+
+    <rows> is called with the arguments and result of each timed call, and
+    returns the number of rows it processed. While PROFILE is False, the
+    only cost of the decorator is checking it.
+    """
+    def decorator(function: Callable) -> Callable:
+        @wraps(function)
+        def profiled_function(*args: object, **kwargs: object) -> object:
+            if not PROFILE:
+                return function(*args, **kwargs)
+            active = _ACTIVE_PHASES.get()
+            if phase in active:
+                return function(*args, **kwargs)
+
+            token = _ACTIVE_PHASES.set(active | {phase})
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                _ACTIVE_PHASES.reset(token)
+            PROFILER.record(phase, time.perf_counter() - start,
+                            rows(args, result))
+            return result
+
+        return profiled_function
+
+    return decorator
+
+
+def _history_days(args: tuple, _result: object) -> int:
+    """Return the number of days recorded in the HistoricalWeather that a
+    method was called on with <args>.
+    """
+    return args[0].num_days()
+
+
+def _loaded_days(_args: tuple, result: object) -> int:
+    """Return the number of days recorded in <result>, a HistoricalWeather
+    or None.
+    """
+    return 0 if result is None else result.num_days()
+
+
+def _country_locations(args: tuple, result: object) -> int:
+    """Return the number of locations in the Country that is <result>, or
+    that a method was called on with <args> otherwise.
+    """
+    country = result if isinstance(result, Country) else args[0]
+    return country.num_locations()
+
+
+def _memoized(method: Callable) -> Callable:
+    """Return a version of the HistoricalWeather method <method> that keeps
+    its results in the history's StatisticsCache.
+
+    Calls that pass the same arguments, whether by position, by keyword or
+    by leaving out a default, share one cached result. A copy of the cached
+    result is returned, so that callers cannot change what is cached.
+    """
+    return _memoize(method, False)
+
+
+def _memoized_window(method: Callable) -> Callable:
+    """Return a version of the HistoricalWeather method <method> that keeps
+    its results in the history's StatisticsCache, as _memoized does, but only
+    for calls given a start or an end.
+
+    This is for methods whose last two parameters are start and end, and
+    that answer calls given neither straight from the history's indexes,
+    which is quicker than looking the result up in the cache.
+    """
+    return _memoize(method, True)
+
+
+def _memoize(method: Callable, window_only: bool) -> Callable:
+    """Return the version of <method> returned by _memoized, or by
+    _memoized_window if <window_only> is True.
+    """
+    parameters = list(inspect.signature(method).parameters.values())[1:]
+    # Worked out once, so that a call only has to fill in the defaults of the
+    # parameters it leaves out to make its key.
+    defaults = tuple(parameter.default for parameter in parameters)
+    positions = {parameter.name: i for i, parameter in enumerate(parameters)}
+
+    @wraps(method)
+    def cached_method(self: 'HistoricalWeather', *args: object,
+                      **kwargs: object) -> object:
+        if kwargs:
+            values = list(args + defaults[len(args):])
+            for name, value in kwargs.items():
+                if name not in positions:
+                    # Let the method raise the usual TypeError.
+                    return method(self, *args, **kwargs)
+                values[positions[name]] = value
+            key = (method.__name__,) + tuple(values)
+        else:
+            key = (method.__name__,) + args + defaults[len(args):]
+        if window_only and key[-2] is None and key[-1] is None:
+            return method(self, *args, **kwargs)
+        return copy.copy(self._cache.lookup(
+            key, self._version, lambda: method(self, *args, **kwargs)))
+
+    return cached_method
+
+
+@check_contracts
+class HistoricalWeather:
+    """A record of historical weather information for a fixed place on Earth.
+
+    === Instance Attributes ===
+    name: The name of the place for which the weather is being recorded.
+    coordinates: The latitude and longitude of this place.
+
+    === Private Attributes ===
+    _records: The daily weather records for this place. Each key is a
+        date and its value is the location's weather on that day. There may
+        be gaps in the data. For example, there could be data for Jan 1, 2024
+        and Jan 5, 2024, but not for the days in between. This is a dict,
+        except in a ColumnarWeather, where it is a WeatherColumns, and in a
+        RunWeather, where it is a RunColumns.
+    _dates: The dates in _records, in increasing order. This is empty in a
+        ColumnarWeather or a RunWeather, whose records already keep their
+        dates in order.
+    _record_highs: The record high temperature in _records on each calendar
+        day. Each key is a (month, day) pair that has weather recorded on it
+        in some year, and its value is the highest maximum temperature on
+        that month and day in any year.
+    _record_lows: The record low temperature in _records on each calendar
+        day, keyed in the same way as _record_highs.
+    _monthly: Running statistics of the temperatures in _records, for each
+        month. Each key is one of the attribute names in TEMPERATURES, and
+        its value holds 12 RunningStats, one per month in calendar order,
+        describing that attribute over every recorded day in that month.
+    _rainfall_units: The total rainfall in _records, not counting trace
+        amounts, as a whole number of 1 / _EXACT_SCALE units, so that it is
+        exact (see _exact_units).
+    _snowfall_units: The total snowfall in _records, not counting trace
+        amounts, in the same units.
+    _version: The number of days of weather recorded so far. This changes
+        whenever new weather is recorded, so results computed from an
+        earlier version are out of date.
+    _cache: The cached results of statistics computed from _records.
+
+    === Representation Invariants ===
+    - -90 <= self.coordinates[0] <= 90
+    - -180 <= self.coordinates[1] <= 180
+    - isinstance(self._records, (WeatherColumns, RunColumns)) or \
+      len(self._dates) == len(self._records)
+
+    === Sample Usage ===
+    >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
+    >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+    >>> toronto_weather.add_weather(date.today(), weather)
+    >>> print(toronto_weather.name)
+    Toronto
+    >>> print(toronto_weather.coordinates)
+    (43.6529, -79.3849)
+    >>> print(toronto_weather.retrieve_weather(date.today()).avg_temp)
+    13
+    """
+    name: str
+    coordinates: tuple[float, float]
+    _records: Union[dict[date, DailyWeather], WeatherColumns, RunColumns]
+    _dates: list[date]
+    _record_highs: dict[tuple[int, int], float]
+    _record_lows: dict[tuple[int, int], float]
+    _monthly: dict[str, list[RunningStats]]
+    _rainfall_units: int
+    _snowfall_units: int
+    _version: int
+    _cache: StatisticsCache
+
+    def __init__(self, name: str, coordinates: tuple[float, float]) -> None:
+        """Initialize this historical weather record with the coordinates
+        <coordinates>, place name <name>, and no recorded weather so far.
+
+        Preconditions:
+        - -90 <= coordinates[0] <= 90
+        - -180 <= coordinates[1] <= 180
+
+        >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date.today(), weather)
+        >>> print(toronto_weather.name)
+        Toronto
+        """
+        self.name = name
+        self.coordinates = (coordinates[0], coordinates[1])
+        self._records = {}
+        self._dates = []
+        self._record_highs = {}
+        self._record_lows = {}
+        self._monthly = {attribute: [RunningStats() for _ in range(12)]
+                         for attribute in TEMPERATURES}
+        self._rainfall_units = 0
+        self._snowfall_units = 0
+        self._version = 0
+        self._cache = StatisticsCache(STATISTICS_CACHE_SIZE)
+
+    def __str__(self) -> str:
+        """Return a str representing this HistoricalWeather.
+
+        >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
+        >>> loc = HistoricalWeather('Toronto', (43.6, -79.63))
+        >>> loc.add_weather(date(2024,7,13), weather)
+        >>> print(loc)
+        Toronto (43.60, -79.63):
+        2024-07-13: Average: 13.00 Low: 9.00 High: 20.00 Precipitation: 5.00 \
+Snow: 0.00 Rain: 0.00
+        """
+        lat, long = self.coordinates
+        res = f"{self.name} ({lat:.2f}, {long:.2f}):\n"
+        res += "\n".join([f"{k}: {str(v)}" for k, v in self._records.items()])
+        return res
+
+    def add_weather(self, d: date, w: DailyWeather) -> None:
+        """Record that <w> was the weather on the date <d>.
+
+        If a record for date <d> already exists, then do nothing (i.e. do not
+        change the information that is already recorded).
+
+        >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date.today(), weather)
+        >>> print(toronto_weather.retrieve_weather(date.today()).avg_temp)
+        13
+        """
+        if d in self._records:
+            pass
+        else:
+            self._records[d] = w
+            self._insert_date(d)
+            self._index_days(((d, (w.avg_temp, w.low_temp, w.high_temp),
+                               (w.precipitation, w.rainfall, w.snowfall)),))
+
+    def add_weather_values(self, d: date,
+                           temperature_statistics: tuple[float, float, float],
+                           precipitation_statistics: tuple[float, float, float]
+                           ) -> None:
+        """Record that the weather on the date <d> had the given temperature
+        and precipitation statistics.
+
+        This has the same effect as
+            self.add_weather(d, DailyWeather(temperature_statistics,
+                                             precipitation_statistics))
+        but a subclass may record the statistics without building the
+        DailyWeather, and if INTERN_DRY_DAYS is True, a day with no
+        precipitation may share its DailyWeather with other such days (see
+        interned_weather).
+
+        Preconditions:
+        - temperature_statistics and precipitation_statistics satisfy the
+          preconditions of DailyWeather.__init__
+
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather_values(date(2024, 7, 13), (13, 9, 20),
+        ...                                    (5, 0, 0))
+        >>> print(toronto_weather.retrieve_weather(date(2024, 7, 13)).avg_temp)
+        13
+        """
+        if d not in self._records:
+            if INTERN_DRY_DAYS:
+                w = interned_weather(temperature_statistics,
+                                     precipitation_statistics)
+            else:
+                w = DailyWeather(temperature_statistics,
+                                 precipitation_statistics)
+            self.add_weather(d, w)
+
+    def add_weather_many(self, days: Iterable[tuple[date,
+                                                    tuple[float, float, float],
+                                                    tuple[float, float, float]]]
+                         ) -> int:
+        """Record the weather on each of <days>, given as (date, temperature
+        statistics, precipitation statistics) triples, and return the number
+        of days recorded.
+
+        This has the same effect as calling add_weather_values for each of
+        <days> in turn, so a date that is already recorded, including one
+        that comes earlier in <days>, keeps its first weather. It is meant
+        for batches in date order, such as the rows of a csv file: while
+        each date is later than every date recorded so far, it is appended
+        without checking whether it is already recorded. Being one call,
+        representation invariants are checked once per batch rather than
+        once per day when contracts are checked.
+
+        Preconditions:
+        - Each of <days> satisfies the preconditions of add_weather_values.
+
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather_many([
+        ...     (date(2024, 7, 13), (13, 9, 20), (5, 0, 0)),
+        ...     (date(2024, 7, 14), (14, 9, 20), (5, 0, 0)),
+        ...     (date(2024, 7, 13), (99, 9, 20), (5, 0, 0)),
+        ...     (date(2024, 7, 12), (12, 9, 20), (5, 0, 0))])
+        3
+        >>> [w.avg_temp for _, w in toronto_weather.iter_range()]
+        [12, 13, 14]
+        """
+        before = self.num_days()
+        self._index_days(self._append_latest(days))
+        return self.num_days() - before
+
+    def _append_latest(self, days: Iterable[tuple[date,
+                                                  tuple[float, float, float],
+                                                  tuple[float, float, float]]]
+                       ) -> Iterator[tuple[date, tuple[float, float, float],
+                                           tuple[float, float, float]]]:
+        """Record the weather on each of <days>, as add_weather_many does,
+        and yield each day that is later than every date recorded before it,
+        whose weather still has to be indexed (see _index_days).
+
+        Those days are recorded here directly rather than through
+        add_weather_values, so that no method is called for them and
+        contracts are not checked once per day. The other days are recorded
+        with add_weather_values.
+        """
+        latest = self._dates[-1] if len(self._dates) > 0 else None
+        for day in days:
+            d, temperature_statistics, precipitation_statistics = day
+            if latest is None or d > latest:
+                if INTERN_DRY_DAYS:
+                    self._records[d] = interned_weather(
+                        temperature_statistics, precipitation_statistics)
+                else:
+                    self._records[d] = DailyWeather(temperature_statistics,
+                                                    precipitation_statistics)
+                self._dates.append(d)
+                latest = d
+                yield day
+            else:
+                self.add_weather_values(d, temperature_statistics,
+                                        precipitation_statistics)
+
+    @_profiled('HistoricalWeather.summarize', _history_days)
+    def summarize(self) -> StationSummary:
+        """Return a StationSummary of every record in this history, computed
+        in a single pass over the records.
+
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2023, 12, 25),
+        ...                             DailyWeather((0, -3, 2), (2, 1, 1)))
+        >>> toronto_weather.add_weather(date(2023, 12, 24),
+        ...                             DailyWeather((0, -5, 3), (1, 0, 1)))
+        >>> summary = toronto_weather.summarize()
+        >>> summary.contiguous_precipitation()[1]
+        2
+        >>> summary.record_high() == toronto_weather.record_high(12, 25)
+        True
+        """
+        summary = StationSummary(self.name)
+        records = self._records
+        summary.add_many((d, (w.avg_temp, w.low_temp, w.high_temp),
+                          (w.precipitation, w.rainfall, w.snowfall))
+                         for d, w in ((d, records[d]) for d in self._dates))
+        return summary
+
+    def columns(self) -> WeatherColumns:
+        """Return a WeatherColumns holding the same records as this history.
+
+        The result must not be modified, since it may be this history's own
+        storage.
+
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2024, 7, 14),
+        ...                             DailyWeather((1, 0, 2), (0, 0, 0)))
+        >>> toronto_weather.add_weather(date(2024, 7, 13),
+        ...                             DailyWeather((3, 2, 4), (0, 0, 0)))
+        >>> list(toronto_weather.columns().avg_temps)
+        [3.0, 1.0]
+        """
+        columns = WeatherColumns()
+        for d in self._dates:
+            columns.insert(d.toordinal(), self._records[d])
+        return columns
+
+    def _insert_date(self, d: date) -> None:
+        """Insert the newly recorded date <d> into the sorted date index.
+
+        Weather is usually recorded in date order, so <d> is checked against
+        the latest date first, before falling back to a binary search.
+        """
+        if len(self._dates) == 0 or d > self._dates[-1]:
+            self._dates.append(d)
+        else:
+            insort(self._dates, d)
+
+    def _window(self, start: Optional[date],
+                end: Optional[date]) -> tuple[int, int]:
+        """Return the positions (lo, hi) in date order of the weather
+        recorded from <start> to <end>, inclusive: the records on those dates
+        are the ones at positions lo up to but not including hi.
+
+        If <start> is None, the window begins with the earliest record, and
+        if <end> is None, it ends with the latest one.
+        """
+        lo = 0 if start is None else bisect_left(self._dates, start)
+        hi = (len(self._dates) if end is None
+              else bisect_right(self._dates, end))
+        return lo, max(lo, hi)
+
+    def _index_days(self, days: Iterable[tuple[date,
+                                               tuple[float, float, float],
+                                               tuple[float, float, float]]]
+                    ) -> None:
+        """Update the record highs and lows of each calendar day, the monthly
+        statistics, the precipitation totals and the version for newly
+        recorded weather on each of <days>.
+
+        Each of <days> is a date, the average, minimum and maximum
+        temperature on it, in that order, and its precipitation, rainfall
+        and snowfall, where -1 means trace amounts.
+        """
+        for d, temperature_statistics, precipitation_statistics in days:
+            low_temp, high_temp = (float(temperature_statistics[1]),
+                                   float(temperature_statistics[2]))
+            calendar_day = (d.month, d.day)
+            if high_temp > self._record_highs.get(calendar_day, -math.inf):
+                self._record_highs[calendar_day] = high_temp
+            if low_temp < self._record_lows.get(calendar_day, math.inf):
+                self._record_lows[calendar_day] = low_temp
+
+            self._monthly['avg_temp'][d.month - 1].add(
+                float(temperature_statistics[0]))
+            self._monthly['low_temp'][d.month - 1].add(low_temp)
+            self._monthly['high_temp'][d.month - 1].add(high_temp)
+
+            if precipitation_statistics[1] not in (0, -1):
+                self._rainfall_units += _exact_units(
+                    precipitation_statistics[1])
+            if precipitation_statistics[2] not in (0, -1):
+                self._snowfall_units += _exact_units(
+                    precipitation_statistics[2])
+
+            self._version += 1
+
+    def retrieve_weather(self, d: date) -> Optional[DailyWeather]:
+        """Return the weather on day <d> if available, otherwise return None.
+
+        >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date.today(), weather)
+        >>> toronto_weather.retrieve_weather(date.today()).avg_temp == 13
+        True
+        """
+        if d in self._records:
+            return self._records[d]
+        else:
+            return None
+
+    def num_days(self) -> int:
+        """Return the number of days that have weather recorded at this
+        location.
+
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2024, 7, 13),
+        ...                             DailyWeather((13, 9, 20), (5, 0, 0)))
+        >>> toronto_weather.num_days()
+        1
+        """
+        return len(self._records)
+
+    def version(self) -> int:
+        """Return the version of the weather recorded at this location, which
+        changes whenever new weather is recorded.
+
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> before = toronto_weather.version()
+        >>> toronto_weather.add_weather(date(2024, 7, 13),
+        ...                             DailyWeather((13, 9, 20), (5, 0, 0)))
+        >>> toronto_weather.version() == before
+        False
+        """
+        return self._version
+
+    def cache_info(self) -> dict[str, int]:
+        """Return how well the cache of statistics results of this history
+        is working, as a dictionary with these keys:
+            hits: the number of statistics answered from the cache
+            misses: the number of statistics that had to be computed
+            size: the number of results cached now
+            capacity: the most results that can be cached
+
+        record_highs, record_lows and contiguous_precipitation are cached,
+        for each combination of arguments, and so are record_high,
+        monthly_average and percentage_snowfall when given a start or an end;
+        without one, those three are answered from this history's indexes.
+        Recording new weather empties the cache.
+
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2024, 7, 13),
+        ...                             DailyWeather((13, 9, 20), (5, 2, 0)))
+        >>> toronto_weather.percentage_snowfall(date(2024, 1, 1))
+        0.0
+        >>> toronto_weather.percentage_snowfall(start=date(2024, 1, 1))
+        0.0
+        >>> toronto_weather.record_highs() == toronto_weather.record_highs(
+        ...     None)
+        True
+        >>> toronto_weather.record_high(7, 13)
+        20.0
+        >>> info = toronto_weather.cache_info()
+        >>> info['hits'], info['misses'], info['size']
+        (2, 2, 2)
+        >>> toronto_weather.add_weather(date(2024, 7, 14),
+        ...                             DailyWeather((13, 9, 22), (5, 2, 0)))
+        >>> toronto_weather.record_high(7, 14, end=date(2024, 12, 31))
+        22.0
+        >>> toronto_weather.cache_info()['size']
+        1
+        """
+        return {'hits': self._cache.hits, 'misses': self._cache.misses,
+                'size': len(self._cache), 'capacity': self._cache.capacity}
+
+    def precipitation_totals(self) -> tuple[float, float]:
+        """Return the total snowfall and the total rainfall at this
+        location, in that order, across all dates when weather was recorded
+        there, not counting trace amounts.
+
+        These are kept up to date, exactly, as weather is recorded, so this
+        takes constant time, and each total is the float nearest to the
+        exact sum, as math.fsum gives.
+
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2024, 5, 1),
+        ...                             DailyWeather((0, 0, 0), (1, -1, 1)))
+        >>> toronto_weather.add_weather(date(2024, 5, 2),
+        ...                             DailyWeather((0, 0, 0), (3, 3, 0)))
+        >>> toronto_weather.precipitation_totals()
+        (1.0, 3.0)
+        """
+        return (self._snowfall_units / _EXACT_SCALE,
+                self._rainfall_units / _EXACT_SCALE)
+
+    def iter_range(self, start: Optional[date] = None,
+                   end: Optional[date] = None
+                   ) -> Iterator[tuple[date, DailyWeather]]:
+        """Yield a (date, weather) pair for each day from <start> to <end>,
+        inclusive, that has weather recorded, in date order.
+
+        If <start> is None, begin with the earliest recorded day, and if
+        <end> is None, finish with the latest one. Finding the first day takes
+        a binary search, so this takes O(log n + k) time to yield k days of
+        a history of n days.
+
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> for day in [5, 1, 3]:
+        ...     weather = DailyWeather((day, 0, 9), (0, 0, 0))
+        ...     toronto_weather.add_weather(date(2024, 7, day), weather)
+        >>> [(str(d), w.avg_temp) for d, w in
+        ...  toronto_weather.iter_range(date(2024, 7, 2))]
+        [('2024-07-03', 3), ('2024-07-05', 5)]
+        """
+        lo, hi = self._window(start, end)
+        for i in range(lo, hi):
+            d = self._dates[i]
+            yield d, self._records[d]
+
+    def weather_between(self, start: date,
+                        end: date) -> list[tuple[date, DailyWeather]]:
+        """Return a list of (date, weather) pairs, one for each day from
+        <start> to <end>, inclusive, that has weather recorded, in date order.
+
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> for day in [5, 1, 3]:
+        ...     weather = DailyWeather((day, 0, 9), (0, 0, 0))
+        ...     toronto_weather.add_weather(date(2024, 7, day), weather)
+        >>> [str(d) for d, _ in toronto_weather.weather_between(
+        ...     date(2024, 7, 1), date(2024, 7, 3))]
+        ['2024-07-01', '2024-07-03']
+        >>> toronto_weather.weather_between(date(2024, 7, 6), date(2024, 8, 1))
+        []
+        """
+        return list(self.iter_range(start, end))
+
+    def rolling(self, attribute: str, days: int, statistic: str = 'mean',
+                start: Optional[date] = None,
+                end: Optional[date] = None) -> Iterator[tuple[date, float]]:
+        """Yield a (date, value) pair for each day from <start> to <end>,
+        inclusive, that has weather recorded, in date order, where value is
+        the <statistic> of <attribute> over the window of <days> days ending
+        with that day.
+
+        <statistic> is one of 'mean', 'sum', 'min' and 'max'. Days in the
+        window with no weather recorded are gaps, and are left out rather
+        than counted as zero, so a mean is over the recorded days only.
+        Trace amounts of precipitation count as zero. The window of a day
+        near <start> also includes the recorded days before <start>.
+
+        Each recorded day enters and leaves the window once: sums are kept
+        as an exact running total (see _exact_units), and minimums and
+        maximums with a monotonic deque, so this takes O(log n + k + days)
+        time to yield k days of a history of n days, however wide the window
+        is. Since the total is exact, rounding error does not build up over
+        a long history, and a window of dry days sums to exactly 0.0.
+
+        Preconditions:
+        - attribute is one of 'avg_temp', 'low_temp', 'high_temp',
+          'precipitation', 'rainfall' and 'snowfall'
+        - days >= 1
+        - statistic in ('mean', 'sum', 'min', 'max')
+
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> for day, temp in [(1, 10), (2, 20), (3, 30), (6, 0)]:
+        ...     toronto_weather.add_weather(
+        ...         date(2024, 7, day), DailyWeather((temp, 0, 40), (0, 0, 0)))
+        >>> [(d.day, mean) for d, mean
+        ...  in toronto_weather.rolling('avg_temp', 3)]
+        [(1, 10.0), (2, 15.0), (3, 20.0), (6, 0.0)]
+        >>> [(d.day, high) for d, high in toronto_weather.rolling(
+        ...     'avg_temp', 5, 'max', start=date(2024, 7, 3))]
+        [(3, 30.0), (6, 30.0)]
+        >>> long_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> _ = long_weather.add_weather_many(
+        ...     (date(1970, 1, 1) + timedelta(days=i), (0, 0, 0),
+        ...      ((i % 7) / 10 if i < 19000 else 0, 0, 0))
+        ...     for i in range(20000))
+        >>> list(long_weather.rolling('precipitation', 30, 'sum'))[-1][1]
+        0.0
+        """
+        first = start
+        if start is not None:
+            first = date.fromordinal(max(start.toordinal() - (days - 1), 1))
+
+        # The (ordinal, value) pairs of the days in the window, oldest first.
+        # For 'min' and 'max', only the days whose value could still be the
+        # answer for a later window are kept, so the values are in
+        # increasing order for 'min' and decreasing order for 'max'.
+        window = deque()
+        total = 0
+        for d, value in self._rolling_values(attribute, first, end):
+            ordinal = d.toordinal()
+            if statistic == 'min':
+                while window and window[-1][1] >= value:
+                    window.pop()
+            elif statistic == 'max':
+                while window and window[-1][1] <= value:
+                    window.pop()
+            else:
+                total += _exact_units(value)
+            window.append((ordinal, value))
+
+            while window[0][0] <= ordinal - days:
+                expired = window.popleft()[1]
+                if statistic in ('mean', 'sum'):
+                    total -= _exact_units(expired)
+
+            if start is None or d >= start:
+                if statistic == 'mean':
+                    yield d, total / (_EXACT_SCALE * len(window))
+                elif statistic == 'sum':
+                    yield d, total / _EXACT_SCALE
+                else:
+                    yield d, window[0][1]
+
+    def _rolling_values(self, attribute: str, start: Optional[date],
+                        end: Optional[date]) -> Iterator[tuple[date, float]]:
+        """Yield a (date, value) pair for each day from <start> to <end>,
+        inclusive, that has weather recorded, in date order, where value is
+        its <attribute>, with trace amounts of precipitation as zero.
+        """
+        for d, w in self.iter_range(start, end):
+            value = float(getattr(w, attribute))
+            if value == -1 and attribute not in TEMPERATURES:
+                value = 0.0
+            yield d, value
+
+    @_profiled('HistoricalWeather.record_high', _history_days)
+    @_memoized_window
+    def record_high(self, m: int, d: int, start: Optional[date] = None,
+                    end: Optional[date] = None) -> float:
+        """Return the highest temperature recorded at this location on month <m>
+        and day <d> in any year.
+        Note that months are represented by numbers 1-12.
+
+        If <start> or <end> is given, only consider the weather recorded from
+        <start> to <end>, inclusive; see iter_range.
+
+        Preconditions:
+        - 1 <= m <= 12
+        - 1 <= d <= 31 and d is possible day for the month m. For example,
+          if m is 9 (for September), m will not be 31, since September has
+          30 days.
+        - The weather on month m and day d has been recorded for this
+          location in at least one year (from start to end, if given).
+
+        >>> weather1 = DailyWeather((13.0, 10.0, 40.0), (0.0, 0.0, 0.0))
+        >>> weather2 = DailyWeather((13.0, 10.0, 30.0), (0.0, 0.0, 0.0))
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> day1 = date(2024, 6, 8)
+        >>> day2 = date(2023, 6, 8)
+        >>> toronto_weather.add_weather(day1, weather1)
+        >>> toronto_weather.add_weather(day2, weather2)
+        >>> toronto_weather.record_high(6, 8)
+        40.0
+        >>> toronto_weather.record_high(6, 8, end=date(2023, 12, 31))
+        30.0
+        """
+        if start is None and end is None:
+            return self._record_highs[(m, d)]
+        else:
+            return max(float(w.high_temp) for day, w
+                       in self.iter_range(start, end)
+                       if day.month == m and day.day == d)
+
+    @_profiled('HistoricalWeather.record_highs', _history_days)
+    @_memoized
+    def record_highs(self, start: Optional[date] = None,
+                     end: Optional[date] = None
+                     ) -> dict[tuple[int, int], float]:
+        """Return the highest temperature recorded at this location on each
+        calendar day, in any year.
+
+        Each key of the result is a (month, day) pair, and its value is the
+        highest temperature recorded on that month and day. Calendar days
+        with no weather recorded in any year are left out.
+
+        If <start> or <end> is given, only consider the weather recorded from
+        <start> to <end>, inclusive; see iter_range.
+
+        >>> weather1 = DailyWeather((13.0, 10.0, 40.0), (0.0, 0.0, 0.0))
+        >>> weather2 = DailyWeather((13.0, 10.0, 30.0), (0.0, 0.0, 0.0))
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2024, 6, 8), weather1)
+        >>> toronto_weather.add_weather(date(2023, 6, 8), weather2)
+        >>> toronto_weather.add_weather(date(2023, 6, 9), weather2)
+        >>> toronto_weather.record_highs()
+        {(6, 8): 40.0, (6, 9): 30.0}
+        >>> toronto_weather.record_highs(date(2023, 6, 8), date(2023, 6, 8))
+        {(6, 8): 30.0}
+        """
+        if start is None and end is None:
+            return dict(self._record_highs)
+
+        highs = {}
+        for day, w in self.iter_range(start, end):
+            calendar_day = (day.month, day.day)
+            if calendar_day not in highs or w.high_temp > highs[calendar_day]:
+                highs[calendar_day] = float(w.high_temp)
+        return highs
+
+    @_profiled('HistoricalWeather.record_lows', _history_days)
+    @_memoized
+    def record_lows(self, start: Optional[date] = None,
+                    end: Optional[date] = None
+                    ) -> dict[tuple[int, int], float]:
+        """Return the lowest temperature recorded at this location on each
+        calendar day, in any year.
+
+        The result has the same form as the result of record_highs, and
+        <start> and <end> have the same meaning.
+
+        >>> weather1 = DailyWeather((13.0, -10.0, 40.0), (0.0, 0.0, 0.0))
+        >>> weather2 = DailyWeather((13.0, 10.0, 30.0), (0.0, 0.0, 0.0))
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2024, 6, 8), weather1)
+        >>> toronto_weather.add_weather(date(2023, 6, 8), weather2)
+        >>> toronto_weather.record_lows()
+        {(6, 8): -10.0}
+        >>> toronto_weather.record_lows(start=date(2024, 1, 1))
+        {(6, 8): -10.0}
+        """
+        if start is None and end is None:
+            return dict(self._record_lows)
+
+        lows = {}
+        for day, w in self.iter_range(start, end):
+            calendar_day = (day.month, day.day)
+            if calendar_day not in lows or w.low_temp < lows[calendar_day]:
+                lows[calendar_day] = float(w.low_temp)
+        return lows
+
+    @_profiled('HistoricalWeather.monthly_average', _history_days)
+    @_memoized_window
+    def monthly_average(self, attribute: str = 'low_temp',
+                        start: Optional[date] = None,
+                        end: Optional[date] = None
+                        ) -> dict[str, Optional[float]]:
+        """For each of the 12 months, return the average of the minimum
+        temperatures for all dates in that month (in any year) that have
+        weather recorded.
+
+        Return the result in a dictionary mapping month name to average,
+        and using these three-character names for the months:
+            Jan, Feb, Mar, Apr, May, Jun, Jul, Aug, Sep, Oct, Nov, Dec.
+        If a month has no weather recorded in any year, map that month name
+        to the value None.
+
+        To average the average or maximum temperatures instead, pass
+        'avg_temp' or 'high_temp' as <attribute>. If <start> or <end> is
+        given, only average the weather recorded from <start> to <end>,
+        inclusive; see iter_range.
+
+        Preconditions:
+        - attribute in TEMPERATURES
+
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> jan1_weather = DailyWeather((13, 11, 30), (0, 0, 0))
+        >>> toronto_weather.add_weather(date(2023, 1, 1), jan1_weather)
+        >>> jan2_weather = DailyWeather((13, 10, 30), (0, 0, 0))
+        >>> toronto_weather.add_weather(date(2023, 1, 2), jan2_weather)
+        >>> jan2024_weather = DailyWeather((13, 0, 30), (0, 0, 0))
+        >>> toronto_weather.add_weather(date(2024, 1, 18), jan2024_weather)
+        >>> feb_weather = DailyWeather((13, 11, 30), (0, 0, 0))
+        >>> toronto_weather.add_weather(date(2023, 2, 1), feb_weather)
+        >>> d = toronto_weather.monthly_average()
+        >>> len(d)
+        12
+        >>> d['Jan'] == 7.0
+        True
+        >>> d['Feb'] == 11.0
+        True
+        >>> d['Mar'] is None
+        True
+        >>> toronto_weather.monthly_average('high_temp')['Jan'] == 30.0
+        True
+        >>> toronto_weather.monthly_average(start=date(2024, 1, 1))['Jan']
+        0.0
+        """
+        monthly = self._monthly_stats(attribute, start, end)
+        monthly_avg = {}
+
+        for month_num in range(12):
+            monthly_avg[MONTH_NAMES[month_num]] = monthly[month_num].average()
+
+        return monthly_avg
+
+    @_profiled('HistoricalWeather.monthly_statistics', _history_days)
+    def monthly_statistics(self, attribute: str = 'low_temp',
+                           start: Optional[date] = None,
+                           end: Optional[date] = None
+                           ) -> dict[str, RunningStats]:
+        """For each of the 12 months, return statistics of the <attribute>
+        temperatures for all dates in that month (in any year) that have
+        weather recorded.
+
+        If <start> or <end> is given, only consider the weather recorded from
+        <start> to <end>, inclusive; see iter_range.
+
+        The result maps the three-character name of each month to a copy of
+        the RunningStats for that month, so it can be kept and read without
+        being affected by weather added later.
+
+        Preconditions:
+        - attribute in TEMPERATURES
+
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2023, 1, 1),
+        ...                             DailyWeather((13, 11, 30), (0, 0, 0)))
+        >>> toronto_weather.add_weather(date(2023, 1, 2),
+        ...                             DailyWeather((13, 7, 30), (0, 0, 0)))
+        >>> stats = toronto_weather.monthly_statistics()
+        >>> stats['Jan'].minimum, stats['Jan'].maximum, stats['Jan'].variance()
+        (7.0, 11.0, 4.0)
+        >>> stats['Feb'].count
+        0
+        >>> stats = toronto_weather.monthly_statistics(end=date(2023, 1, 1))
+        >>> stats['Jan'].count
+        1
+        """
+        monthly = self._monthly_stats(attribute, start, end)
+        return {MONTH_NAMES[month_num]: copy.copy(monthly[month_num])
+                for month_num in range(12)}
+
+    def _monthly_stats(self, attribute: str, start: Optional[date],
+                       end: Optional[date]) -> list[RunningStats]:
+        """Return 12 RunningStats, one per month in calendar order, of the
+        <attribute> temperatures recorded from <start> to <end>, inclusive.
+
+        Without a window, these are this history's own monthly statistics,
+        and must not be modified.
+        """
+        if start is None and end is None:
+            return self._monthly[attribute]
+
+        monthly = [RunningStats() for _ in range(12)]
+        for day, w in self.iter_range(start, end):
+            monthly[day.month - 1].add(float(getattr(w, attribute)))
+        return monthly
+
+    @_profiled('HistoricalWeather.contiguous_precipitation', _history_days)
+    @_memoized
+    def contiguous_precipitation(self, start: Optional[date] = None,
+                                 end: Optional[date] = None
+                                 ) -> tuple[date, int]:
+        """Return the start date and length of the longest sequence of
+        consecutive days that had precipitation.
+
+        A day is considered to have had precipitation if its precipitation
+        value is either above 0 or is -1 (indicating that there were trace
+        amounts of precipitation). The days in a sequence must have been
+        consecutive, that is, there can be no day between them. For example.
+        if we have recorded weather for July 3rd, 5th, and 6th, that is not
+        a sequence of consecutive days.
+
+        In the case of a tie for the longest sequence, any one of the tied
+        start dates can be returned.
+
+        In the case when there are no contigious days with percipitation
+        (there were no days with percipitation at all),
+        return a tuple with any date in self._records and 1.
+
+        If <start> or <end> is given, only consider the weather recorded from
+        <start> to <end>, inclusive; see iter_range.
+
+        NOTE: You may not assume the addition order of data into this
+            HistoricalWeather object.
+
+        Preconditions:
+        - At least one day's weather has been recorded (from start to end,
+          if given).
+
+        >>> weather1 = DailyWeather((0, 0, 0), (1, 0, 0))
+        >>> weather2 = DailyWeather((0, 0, 0), (2, 0, 0))
+        >>> weather3 = DailyWeather((0, 0, 0), (1, 0, 0))
+        >>> weather4 = DailyWeather((0, 0, 0), (1, 0, 0))
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> delta = timedelta(days=1)
+        >>> toronto_weather.add_weather(date.today(), weather1)
+        >>> toronto_weather.add_weather(date.today() + delta, weather2)
+        >>> toronto_weather.add_weather(date.today() + 2 * delta, weather3)
+        >>> toronto_weather.add_weather(date.today() + 3 * delta, weather4)
+        >>> result = toronto_weather.contiguous_precipitation()
+        >>> result[0] == date.today()
+        True
+        >>> result[1]
+        4
+        >>> weather1 = DailyWeather((0, 0, 0), (1, 0, 0))
+        >>> weather2 = DailyWeather((0, 0, 0), (2, 0, 0))
+        >>> weather3 = DailyWeather((0, 0, 0), (1, 0, 0))
+        >>> montreal_weather = HistoricalWeather('Montreal', (45.47, -73.74))
+        >>> montreal_weather.add_weather(date(2024, 4, 3), weather1)
+        >>> montreal_weather.add_weather(date(2024, 4, 5), weather2)
+        >>> montreal_weather.add_weather(date(2024, 4, 7), weather3)
+        >>> # No consecutive days
+        >>> result = montreal_weather.contiguous_precipitation()
+        >>> result[1]
+        1
+        >>> toronto_weather.contiguous_precipitation(
+        ...     start=date.today() + 2 * delta)[1]
+        2
+        """
+        runs = PrecipitationRuns()
+        runs.add_many((d.toordinal(), w.precipitation != 0)
+                      for d, w in self.iter_range(start, end))
+        return runs.longest()
+
+    @_profiled('HistoricalWeather.percentage_snowfall', _history_days)
+    @_memoized_window
+    def percentage_snowfall(self, start: Optional[date] = None,
+                            end: Optional[date] = None) -> float:
+        """Return the fraction of the snowfall and rainfall at this location
+        that was snowfall, across all dates when weather was recorded there.
+
+        If <start> or <end> is given, only count the weather recorded from
+        <start> to <end>, inclusive; see iter_range.
+
+        The answer returned should be calculated as:
+            total snowfall / (total snowfall + total rainfall)
+
+        Do not count trace amounts in this calculation. Ignore the units in
+        the calculation.  (This is equivalent to assuming that 1 mm of
+        rain is equivalent to 1 cm of snow.)
+
+        Without a window, this is computed from the precipitation totals
+        (see precipitation_totals) in constant time. Either way, the totals
+        are added up exactly, so every kind of history, with or without a
+        window covering all of its days, gives the same result.
+
+        Preconditions:
+        - At least one day's weather has been recorded (from start to end,
+          if given) where snowfall > 0 or rainfall > 0 or both.
+
+        >>> weather1 = DailyWeather((0, 0, 0), (1, 0, 1))
+        >>> weather2 = DailyWeather((0, 0, 0), (3, 3, 0))
+        >>> today = date(2024, 5, 1)
+        >>> delta = timedelta(days=1)
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(today, weather1)
+        >>> toronto_weather.add_weather(today + delta, weather2)
+        >>> toronto_weather.percentage_snowfall()
+        0.25
+        >>> toronto_weather.percentage_snowfall(today + delta, today + delta)
+        0.0
+        """
+        if start is None and end is None:
+            return _snowfall_fraction(self._snowfall_units,
+                                      self._rainfall_units)
+
+        snowfall = math.fsum(w.snowfall for _, w in self.iter_range(start, end)
+                             if w.snowfall != -1.0)
+        rainfall = math.fsum(w.rainfall for _, w in self.iter_range(start, end)
+                             if w.rainfall != -1.0)
+        return snowfall / (snowfall + rainfall)
+
+
+@check_contracts
+class ColumnarWeather(HistoricalWeather):
+    """A HistoricalWeather whose records are stored column by column.
+
+    This behaves exactly like a HistoricalWeather, but needs far less memory
+    for long histories: its records are kept in a WeatherColumns rather than
+    in a dictionary of DailyWeather objects, so a DailyWeather is only built
+    when a caller asks for one. Its statistics are computed directly from the
+    columns.
+
+    === Representation Invariants ===
+    - -90 <= self.coordinates[0] <= 90
+    - -180 <= self.coordinates[1] <= 180
+    - isinstance(self._records, WeatherColumns)
+    - self._dates == []
+
+    === Sample Usage ===
+    >>> weather = DailyWeather((13, 9, 20), (5, 0, -1))
+    >>> toronto_weather = ColumnarWeather('Toronto', (43.6529, -79.3849))
+    >>> toronto_weather.add_weather(date(2024, 7, 13), weather)
+    >>> print(toronto_weather)
+    Toronto (43.65, -79.38):
+    2024-07-13: Average: 13.00 Low: 9.00 High: 20.00 Precipitation: 5.00 \
+Snow: -1.00 Rain: 0.00
+    >>> toronto_weather.retrieve_weather(date(2024, 7, 13)).avg_temp
+    13.0
+    """
+
+    def __init__(self, name: str, coordinates: tuple[float, float]) -> None:
+        """Initialize this historical weather record with the coordinates
+        <coordinates>, place name <name>, and no recorded weather so far.
+
+        Preconditions:
+        - -90 <= coordinates[0] <= 90
+        - -180 <= coordinates[1] <= 180
+
+        >>> toronto_weather = ColumnarWeather('Toronto', (43.6529, -79.3849))
+        >>> print(toronto_weather.name)
+        Toronto
+        """
+        super().__init__(name, coordinates)
+        self._records = WeatherColumns()
+
+    def set_columns(self, columns: WeatherColumns) -> None:
+        """Make <columns> the records of this history, which has no weather
+        recorded yet.
+
+        <columns> becomes this history's storage, so it must not be used
+        elsewhere afterwards.
+
+        Preconditions:
+        - No weather has been recorded in this history.
+
+        >>> columns = WeatherColumns()
+        >>> columns.append(date(2024, 6, 8).toordinal(), (1, 0, 40), (0, 0, 0))
+        >>> toronto_weather = ColumnarWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.set_columns(columns)
+        >>> toronto_weather.record_high(6, 8)
+        40.0
+        """
+        self._records = columns
+        self._index_days((date.fromordinal(columns.days[i]),
+                          (columns.avg_temps[i], columns.low_temps[i],
+                           columns.high_temps[i]),
+                          (columns.precipitation[i], columns.rainfall[i],
+                           columns.snowfall[i]))
+                         for i in range(len(columns)))
+
+    @_profiled('HistoricalWeather.summarize', _history_days)
+    def summarize(self) -> StationSummary:
+        """Return a StationSummary of every record in this history, computed
+        in a single pass over the columns.
+
+        >>> toronto_weather = ColumnarWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2023, 12, 24),
+        ...                             DailyWeather((0, -5, 3), (-1, 0, 1)))
+        >>> toronto_weather.add_weather(date(2023, 12, 25),
+        ...                             DailyWeather((0, -3, 2), (2, 1, -1)))
+        >>> summary = toronto_weather.summarize()
+        >>> summary.contiguous_precipitation()[1], summary.percentage_snowfall()
+        (2, 0.5)
+        """
+        columns = self._records
+        summary = StationSummary(self.name)
+        summary.add_many(
+            (date.fromordinal(columns.days[i]),
+             (columns.avg_temps[i], columns.low_temps[i],
+              columns.high_temps[i]),
+             (-1.0 if columns.trace[i] & PRECIP_TRACE
+              else columns.precipitation[i],
+              -1.0 if columns.trace[i] & RAIN_TRACE else columns.rainfall[i],
+              -1.0 if columns.trace[i] & SNOW_TRACE else columns.snowfall[i]))
+            for i in range(len(columns)))
+        return summary
+
+    def columns(self) -> WeatherColumns:
+        """Return a WeatherColumns holding the same records as this history.
+
+        The result must not be modified, since it is this history's own
+        storage.
+
+        >>> toronto_weather = ColumnarWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2024, 7, 13),
+        ...                             DailyWeather((1, 0, 2), (0, 0, 0)))
+        >>> toronto_weather.columns() is toronto_weather.columns()
+        True
+        """
+        return self._records
+
+    def iter_range(self, start: Optional[date] = None,
+                   end: Optional[date] = None
+                   ) -> Iterator[tuple[date, DailyWeather]]:
+        """Yield a (date, weather) pair for each day from <start> to <end>,
+        inclusive, that has weather recorded, in date order.
+
+        See HistoricalWeather.iter_range for the details.
+
+        >>> toronto_weather = ColumnarWeather('Toronto', (43.6529, -79.3849))
+        >>> for day in [5, 1, 3]:
+        ...     weather = DailyWeather((day, 0, 9), (0, 0, 0))
+        ...     toronto_weather.add_weather(date(2024, 7, day), weather)
+        >>> [(str(d), w.avg_temp) for d, w in
+        ...  toronto_weather.iter_range(end=date(2024, 7, 4))]
+        [('2024-07-01', 1.0), ('2024-07-03', 3.0)]
+        """
+        lo, hi = self._window(start, end)
+        for i in range(lo, hi):
+            yield date.fromordinal(self._records.days[i]), \
+                self._records.weather_at(i)
+
+    def _rolling_values(self, attribute: str, start: Optional[date],
+                        end: Optional[date]) -> Iterator[tuple[date, float]]:
+        """Yield a (date, value) pair for each day from <start> to <end>,
+        inclusive, that has weather recorded, in date order, where value is
+        its <attribute>, with trace amounts of precipitation as zero.
+
+        The values are read straight from the columns, which already hold
+        trace amounts as zero.
+        """
+        lo, hi = self._window(start, end)
+        days = self._records.days
+        column = self._records.column(attribute)
+        for i in range(lo, hi):
+            yield date.fromordinal(days[i]), column[i]
+
+    def _insert_date(self, d: date) -> None:
+        """Do nothing, since the columns already keep their dates in order.
+        """
+
+    def _window(self, start: Optional[date],
+                end: Optional[date]) -> tuple[int, int]:
+        """Return the positions (lo, hi) in the columns of the weather
+        recorded from <start> to <end>, inclusive.
+
+        See HistoricalWeather._window for the details.
+        """
+        days = self._records.days
+        lo = 0 if start is None else bisect_left(days, start.toordinal())
+        hi = len(days) if end is None else bisect_right(days, end.toordinal())
+        return lo, max(lo, hi)
+
+    def add_weather_values(self, d: date,
+                           temperature_statistics: tuple[float, float, float],
+                           precipitation_statistics: tuple[float, float, float]
+                           ) -> None:
+        """Record that the weather on the date <d> had the given temperature
+        and precipitation statistics.
+
+        If <d> is later than every date recorded so far, the statistics are
+        appended straight onto the columns without building a DailyWeather.
+
+        Preconditions:
+        - temperature_statistics and precipitation_statistics satisfy the
+          preconditions of DailyWeather.__init__
+
+        >>> toronto_weather = ColumnarWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather_values(date(2024, 7, 13), (13, 9, 20),
+        ...                                    (5, 0, -1))
+        >>> print(toronto_weather.retrieve_weather(date(2024, 7, 13)))
+        Average: 13.00 Low: 9.00 High: 20.00 Precipitation: 5.00 Snow: -1.00 \
+Rain: 0.00
+        """
+        ordinal = d.toordinal()
+        if len(self._records) == 0 or ordinal > self._records.days[-1]:
+            self._records.append(ordinal, temperature_statistics,
+                                 precipitation_statistics)
+            self._index_days(((d, temperature_statistics,
+                               precipitation_statistics),))
+        else:
+            super().add_weather_values(d, temperature_statistics,
+                                       precipitation_statistics)
+
+    def _append_latest(self, days: Iterable[tuple[date,
+                                                  tuple[float, float, float],
+                                                  tuple[float, float, float]]]
+                       ) -> Iterator[tuple[date, tuple[float, float, float],
+                                           tuple[float, float, float]]]:
+        """Record the weather on each of <days>, as add_weather_many does,
+        and yield each day that is later than every date recorded before it,
+        whose weather still has to be indexed (see _index_days).
+
+        Those days are appended straight onto the columns. The other days
+        are recorded with add_weather_values.
+        """
+        columns = self._records
+        latest = columns.days[-1] if len(columns) > 0 else None
+        for day in days:
+            d, temperature_statistics, precipitation_statistics = day
+            ordinal = d.toordinal()
+            if latest is None or ordinal > latest:
+                columns.append(ordinal, temperature_statistics,
+                               precipitation_statistics)
+                latest = ordinal
+                yield day
+            else:
+                self.add_weather_values(d, temperature_statistics,
+                                        precipitation_statistics)
+
+    @_profiled('HistoricalWeather.record_high', _history_days)
+    @_memoized_window
+    def record_high(self, m: int, d: int, start: Optional[date] = None,
+                    end: Optional[date] = None) -> float:
+        """Return the highest temperature recorded at this location on month <m>
+        and day <d> in any year.
+
+        See HistoricalWeather.record_high for the details.
+
+        Preconditions:
+        - 1 <= m <= 12
+        - 1 <= d <= 31 and d is possible day for the month m.
+        - The weather on month m and day d has been recorded for this
+          location in at least one year (from start to end, if given).
+
+        >>> toronto_weather = ColumnarWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2023, 6, 8),
+        ...                             DailyWeather((1, 0, 30), (0, 0, 0)))
+        >>> toronto_weather.add_weather(date(2024, 6, 8),
+        ...                             DailyWeather((1, 0, 40), (0, 0, 0)))
+        >>> toronto_weather.record_high(6, 8, start=date(2023, 1, 1),
+        ...                             end=date(2023, 12, 31))
+        30.0
+        """
+        if start is None and end is None:
+            return super().record_high(m, d)
+
+        lo, hi = self._window(start, end)
+        if USE_NUMPY:
+            return _record_high_np(self._records, m, d, lo, hi)
+        else:
+            return _record_high_py(self._records, m, d, lo, hi)
+
+    @_profiled('HistoricalWeather.monthly_average', _history_days)
+    @_memoized_window
+    def monthly_average(self, attribute: str = 'low_temp',
+                        start: Optional[date] = None,
+                        end: Optional[date] = None
+                        ) -> dict[str, Optional[float]]:
+        """For each of the 12 months, return the average of the <attribute>
+        temperatures for all dates in that month (in any year) that have
+        weather recorded.
+
+        See HistoricalWeather.monthly_average for the details.
+
+        Preconditions:
+        - attribute in TEMPERATURES
+
+        >>> toronto_weather = ColumnarWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2023, 1, 1),
+        ...                             DailyWeather((1, 11, 30), (0, 0, 0)))
+        >>> toronto_weather.add_weather(date(2024, 1, 18),
+        ...                             DailyWeather((1, 0, 30), (0, 0, 0)))
+        >>> toronto_weather.monthly_average()['Jan']
+        5.5
+        >>> toronto_weather.monthly_average(end=date(2023, 12, 31))['Jan']
+        11.0
+        """
+        if start is None and end is None:
+            return super().monthly_average(attribute)
+
+        lo, hi = self._window(start, end)
+        if USE_NUMPY:
+            return _monthly_average_np(self._records, attribute, lo, hi)
+        else:
+            return _monthly_average_py(self._records, attribute, lo, hi)
+
+    @_profiled('HistoricalWeather.contiguous_precipitation', _history_days)
+    @_memoized
+    def contiguous_precipitation(self, start: Optional[date] = None,
+                                 end: Optional[date] = None
+                                 ) -> tuple[date, int]:
+        """Return the start date and length of the longest sequence of
+        consecutive days that had precipitation.
+
+        See HistoricalWeather.contiguous_precipitation for the details. If
+        a tie, the earliest of the tied sequences is returned.
+
+        Preconditions:
+        - At least one day's weather has been recorded (from start to end,
+          if given).
+
+        >>> rainy = DailyWeather((0, 0, 0), (1, 0, 0))
+        >>> trace = DailyWeather((0, 0, 0), (-1, 0, 0))
+        >>> dry = DailyWeather((0, 0, 0), (0, 0, 0))
+        >>> montreal_weather = ColumnarWeather('Montreal', (45.47, -73.74))
+        >>> montreal_weather.add_weather(date(2024, 4, 3), rainy)
+        >>> montreal_weather.add_weather(date(2024, 4, 5), rainy)
+        >>> montreal_weather.add_weather(date(2024, 4, 6), trace)
+        >>> montreal_weather.add_weather(date(2024, 4, 7), dry)
+        >>> result = montreal_weather.contiguous_precipitation()
+        >>> result[0] == date(2024, 4, 5)
+        True
+        >>> result[1]
+        2
+        >>> montreal_weather.contiguous_precipitation(end=date(2024, 4, 5))
+        (datetime.date(2024, 4, 3), 1)
+        """
+        lo, hi = self._window(start, end)
+        if USE_NUMPY:
+            return _contiguous_precipitation_np(self._records, lo, hi)
+        else:
+            return _contiguous_precipitation_py(self._records, lo, hi)
+
+    @_profiled('HistoricalWeather.percentage_snowfall', _history_days)
+    @_memoized_window
+    def percentage_snowfall(self, start: Optional[date] = None,
+                            end: Optional[date] = None) -> float:
+        """Return the fraction of the snowfall and rainfall at this location
+        that was snowfall, across all dates when weather was recorded there.
+
+        Trace amounts are not counted. See
+        HistoricalWeather.percentage_snowfall for the details.
+
+        Preconditions:
+        - At least one day's weather has been recorded (from start to end,
+          if given) where snowfall > 0 or rainfall > 0 or both.
+
+        >>> weather1 = DailyWeather((0, 0, 0), (1, -1, 1))
+        >>> weather2 = DailyWeather((0, 0, 0), (3, 3, 0))
+        >>> toronto_weather = ColumnarWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2024, 5, 1), weather1)
+        >>> toronto_weather.add_weather(date(2024, 5, 2), weather2)
+        >>> toronto_weather.percentage_snowfall()
+        0.25
+        >>> toronto_weather.percentage_snowfall(start=date(2024, 5, 2))
+        0.0
+        """
+        if start is None and end is None:
+            return super().percentage_snowfall()
+
+        lo, hi = self._window(start, end)
+        if USE_NUMPY:
+            return _percentage_snowfall_np(self._records, lo, hi)
+        else:
+            return _percentage_snowfall_py(self._records, lo, hi)
+
+
+@check_contracts
+class RunWeather(HistoricalWeather):
+    """A HistoricalWeather whose records are stored as runs of consecutive
+    days.
+
+    This behaves exactly like a HistoricalWeather, but its records are kept
+    in a RunColumns, which stores one ordinal per run of consecutive days
+    rather than one per day, and, if made with tenths=True, stores
+    temperatures in a quarter of the space of a ColumnarWeather. Looking up
+    a date takes a binary search over the runs rather than over the days,
+    and the longest sequence of days with precipitation is found by
+    scanning each run on its own.
+
+    === Representation Invariants ===
+    - -90 <= self.coordinates[0] <= 90
+    - -180 <= self.coordinates[1] <= 180
+    - isinstance(self._records, RunColumns)
+    - self._dates == []
+
+    === Sample Usage ===
+    >>> weather = DailyWeather((13, 9, 20), (5, 0, -1))
+    >>> toronto_weather = RunWeather('Toronto', (43.6529, -79.3849), True)
+    >>> toronto_weather.add_weather(date(2024, 7, 13), weather)
+    >>> print(toronto_weather)
+    Toronto (43.65, -79.38):
+    2024-07-13: Average: 13.00 Low: 9.00 High: 20.00 Precipitation: 5.00 \
+Snow: -1.00 Rain: 0.00
+    >>> toronto_weather.retrieve_weather(date(2024, 7, 13)).avg_temp
+    13.0
+    """
+
+    def __init__(self, name: str, coordinates: tuple[float, float],
+                 tenths: bool = False) -> None:
+        """Initialize this historical weather record with the coordinates
+        <coordinates>, place name <name>, and no recorded weather so far,
+        storing temperatures in tenths of a degree if <tenths> is True (see
+        RunColumns).
+
+        Preconditions:
+        - -90 <= coordinates[0] <= 90
+        - -180 <= coordinates[1] <= 180
+
+        >>> toronto_weather = RunWeather('Toronto', (43.6529, -79.3849))
+        >>> print(toronto_weather.name)
+        Toronto
+        """
+        super().__init__(name, coordinates)
+        self._records = RunColumns(tenths)
+
+    def set_columns(self, columns: WeatherColumns) -> None:
+        """Record the weather held in <columns> in this history, which has no
+        weather recorded yet.
+
+        Unlike ColumnarWeather.set_columns, the weather is copied into runs,
+        so <columns> may still be used afterwards.
+
+        Preconditions:
+        - No weather has been recorded in this history.
+
+        >>> columns = WeatherColumns()
+        >>> columns.append(date(2024, 6, 8).toordinal(), (1, 0, 40), (0, 0, 0))
+        >>> toronto_weather = RunWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.set_columns(columns)
+        >>> toronto_weather.record_high(6, 8)
+        40.0
+        """
+        self.add_weather_many(
+            (date.fromordinal(columns.days[i]),
+             (columns.avg_temps[i], columns.low_temps[i],
+              columns.high_temps[i]),
+             (-1.0 if columns.trace[i] & PRECIP_TRACE
+              else columns.precipitation[i],
+              -1.0 if columns.trace[i] & RAIN_TRACE else columns.rainfall[i],
+              -1.0 if columns.trace[i] & SNOW_TRACE else columns.snowfall[i]))
+            for i in range(len(columns)))
+
+    @_profiled('HistoricalWeather.summarize', _history_days)
+    def summarize(self) -> StationSummary:
+        """Return a StationSummary of every record in this history, computed
+        in a single pass over the runs.
+
+        >>> toronto_weather = RunWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2023, 12, 24),
+        ...                             DailyWeather((0, -5, 3), (-1, 0, 1)))
+        >>> toronto_weather.add_weather(date(2023, 12, 25),
+        ...                             DailyWeather((0, -3, 2), (2, 1, -1)))
+        >>> summary = toronto_weather.summarize()
+        >>> summary.contiguous_precipitation()[1], summary.percentage_snowfall()
+        (2, 0.5)
+        """
+        columns = self._records
+        summary = StationSummary(self.name)
+        summary.add_many(
+            (date.fromordinal(ordinal), *columns.statistics_at(i))
+            for i, ordinal in enumerate(columns.ordinals()))
+        return summary
+
+    def columns(self) -> WeatherColumns:
+        """Return a new WeatherColumns holding the same records as this
+        history.
+
+        >>> toronto_weather = RunWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2024, 7, 13),
+        ...                             DailyWeather((1, 0, 2), (0, 0, 0)))
+        >>> list(toronto_weather.columns().avg_temps)
+        [1.0]
+        """
+        return self._records.expand()
+
+    def iter_range(self, start: Optional[date] = None,
+                   end: Optional[date] = None
+                   ) -> Iterator[tuple[date, DailyWeather]]:
+        """Yield a (date, weather) pair for each day from <start> to <end>,
+        inclusive, that has weather recorded, in date order.
+
+        See HistoricalWeather.iter_range for the details.
+
+        >>> toronto_weather = RunWeather('Toronto', (43.6529, -79.3849))
+        >>> for day in [5, 1, 3]:
+        ...     weather = DailyWeather((day, 0, 9), (0, 0, 0))
+        ...     toronto_weather.add_weather(date(2024, 7, day), weather)
+        >>> [(str(d), w.avg_temp) for d, w in
+        ...  toronto_weather.iter_range(end=date(2024, 7, 4))]
+        [('2024-07-01', 1.0), ('2024-07-03', 3.0)]
+        """
+        lo, hi = self._window(start, end)
+        for i, ordinal in enumerate(self._records.ordinals(lo, hi), lo):
+            yield date.fromordinal(ordinal), self._records.weather_at(i)
+
+    def _insert_date(self, d: date) -> None:
+        """Do nothing, since the runs already keep their dates in order.
+        """
+
+    def _window(self, start: Optional[date],
+                end: Optional[date]) -> tuple[int, int]:
+        """Return the positions (lo, hi) in the runs of the weather recorded
+        from <start> to <end>, inclusive.
+
+        See HistoricalWeather._window for the details.
+        """
+        records = self._records
+        lo = 0 if start is None else records.position(start.toordinal())
+        hi = (len(records) if end is None
+              else records.position(end.toordinal() + 1))
+        return lo, max(lo, hi)
+
+    def add_weather_values(self, d: date,
+                           temperature_statistics: tuple[float, float, float],
+                           precipitation_statistics: tuple[float, float, float]
+                           ) -> None:
+        """Record that the weather on the date <d> had the given temperature
+        and precipitation statistics.
+
+        If <d> is later than every date recorded so far, the statistics are
+        appended straight onto the runs without building a DailyWeather.
+
+        Preconditions:
+        - temperature_statistics and precipitation_statistics satisfy the
+          preconditions of DailyWeather.__init__
+
+        >>> toronto_weather = RunWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather_values(date(2024, 7, 13), (13, 9, 20),
+        ...                                    (5, 0, -1))
+        >>> print(toronto_weather.retrieve_weather(date(2024, 7, 13)))
+        Average: 13.00 Low: 9.00 High: 20.00 Precipitation: 5.00 Snow: -1.00 \
+Rain: 0.00
+        """
+        latest = self._records.last()
+        if latest is None or d.toordinal() > latest:
+            self._records.append(d.toordinal(), temperature_statistics,
+                                 precipitation_statistics)
+            self._index_days(((d, temperature_statistics,
+                               precipitation_statistics),))
+        else:
+            super().add_weather_values(d, temperature_statistics,
+                                       precipitation_statistics)
+
+    def _append_latest(self, days: Iterable[tuple[date,
+                                                  tuple[float, float, float],
+                                                  tuple[float, float, float]]]
+                       ) -> Iterator[tuple[date, tuple[float, float, float],
+                                           tuple[float, float, float]]]:
+        """Record the weather on each of <days>, as add_weather_many does,
+        and yield each day that is later than every date recorded before it,
+        whose weather still has to be indexed (see _index_days).
+
+        Those days are appended straight onto the runs. The other days are
+        recorded with add_weather_values.
+        """
+        records = self._records
+        latest = records.last()
+        for day in days:
+            d, temperature_statistics, precipitation_statistics = day
+            ordinal = d.toordinal()
+            if latest is None or ordinal > latest:
+                records.append(ordinal, temperature_statistics,
+                               precipitation_statistics)
+                latest = ordinal
+                yield day
+            else:
+                self.add_weather_values(d, temperature_statistics,
+                                        precipitation_statistics)
+
+    @_profiled('HistoricalWeather.contiguous_precipitation', _history_days)
+    @_memoized
+    def contiguous_precipitation(self, start: Optional[date] = None,
+                                 end: Optional[date] = None
+                                 ) -> tuple[date, int]:
+        """Return the start date and length of the longest sequence of
+        consecutive days that had precipitation.
+
+        See HistoricalWeather.contiguous_precipitation for the details. If
+        a tie, the earliest of the tied sequences is returned.
+
+        Preconditions:
+        - At least one day's weather has been recorded (from start to end,
+          if given).
+
+        >>> rainy = DailyWeather((0, 0, 0), (1, 0, 0))
+        >>> trace = DailyWeather((0, 0, 0), (-1, 0, 0))
+        >>> dry = DailyWeather((0, 0, 0), (0, 0, 0))
+        >>> montreal_weather = RunWeather('Montreal', (45.47, -73.74))
+        >>> montreal_weather.add_weather(date(2024, 4, 3), rainy)
+        >>> montreal_weather.add_weather(date(2024, 4, 5), rainy)
+        >>> montreal_weather.add_weather(date(2024, 4, 6), trace)
+        >>> montreal_weather.add_weather(date(2024, 4, 7), dry)
+        >>> result = montreal_weather.contiguous_precipitation()
+        >>> result[0] == date(2024, 4, 5)
+        True
+        >>> result[1]
+        2
+        >>> montreal_weather.contiguous_precipitation(end=date(2024, 4, 5))
+        (datetime.date(2024, 4, 3), 1)
+        """
+        lo, hi = self._window(start, end)
+        if USE_NUMPY:
+            return _run_precipitation_np(self._records, lo, hi)
+        else:
+            return _run_precipitation_py(self._records, lo, hi)
+
+
+@check_contracts
+class StationIndex:
+    """A spatial index of the locations of weather stations, for finding the
+    stations near a point on Earth.
+
+    The surface of the Earth is divided into a grid of cells, each
+    GRID_DEGREES of latitude high and GRID_DEGREES of longitude wide, and
+    each station is filed under the cell that contains it. A query only
+    looks at the stations in the cells that could hold an answer, rather
+    than at every station.
+
+    All distances are in km, along the surface of the Earth (see
+    great_circle_distance).
+
+    === Private Attributes ===
+    _cells: The stations in each cell that has any. Each key is the
+        (row, column) of a cell, counting rows north from the South Pole and
+        columns east from longitude -180, and its value is a list with the
+        (name, latitude, longitude) of each station in that cell.
+    _size: The number of stations in this index.
+
+    === Representation Invariants ===
+    - self._size >= len(self._cells)
+
+    === Sample Usage ===
+    >>> index = StationIndex()
+    >>> index.add('Toronto', (43.6529, -79.3849))
+    >>> index.add('Montreal', (45.47, -73.74))
+    >>> index.add('Vancouver', (49.28, -123.12))
+    >>> [name for name, _ in index.nearest(44.0, -78.0, 2)]
+    ['Toronto', 'Montreal']
+    >>> [name for name, _ in index.within_radius(43.7, -79.4, 600.0)]
+    ['Toronto', 'Montreal']
+    >>> index.within_bbox(40.0, -125.0, 50.0, -100.0)
+    ['Vancouver']
+    """
+    _cells: dict[tuple[int, int], list[tuple[str, float, float]]]
+    _size: int
+
+    def __init__(self) -> None:
+        """Initialize this index with no stations in it.
+
+        >>> len(StationIndex())
+        0
+        """
+        self._cells = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of stations in this index.
+
+        >>> index = StationIndex()
+        >>> index.add('Toronto', (43.6529, -79.3849))
+        >>> len(index)
+        1
+        """
+        return self._size
+
+    def add(self, name: str, coordinates: tuple[float, float]) -> None:
+        """Add the station called <name> at <coordinates>, a (latitude,
+        longitude) pair, to this index.
+
+        Preconditions:
+        - No station called <name> is in this index.
+        - -90 <= coordinates[0] <= 90
+        - -180 <= coordinates[1] <= 180
+
+        >>> index = StationIndex()
+        >>> index.add('Toronto', (43.6529, -79.3849))
+        >>> index.nearest(0.0, 0.0, 1)[0][0]
+        'Toronto'
+        """
+        lat, long = coordinates
+        cell = _grid_cell(lat, long)
+        if cell not in self._cells:
+            self._cells[cell] = []
+        self._cells[cell].append((name, lat, long))
+        self._size += 1
+
+    def nearest(self, lat: float, long: float,
+                k: int = 1) -> list[tuple[str, float]]:
+        """Return the <k> stations in this index nearest to latitude <lat>
+        and longitude <long>, as (name, distance) pairs in order of
+        distance. If there are fewer than <k> stations, return them all. In
+        the case of a tie for the last place, any of the tied stations can be
+        returned.
+
+        The search starts at the cell containing the point and works
+        outwards one ring of cells at a time, stopping as soon as no station
+        outside the cells searched so far could be nearer than the k nearest
+        found.
+
+        Preconditions:
+        - -90 <= lat <= 90
+        - -180 <= long <= 180
+        - k >= 1
+
+        >>> index = StationIndex()
+        >>> index.add('Toronto', (43.6529, -79.3849))
+        >>> index.add('Montreal', (45.47, -73.74))
+        >>> [(name, round(distance)) for name, distance
+        ...  in index.nearest(45.5, -73.6, 5)]
+        [('Montreal', 11), ('Toronto', 502)]
+        """
+        row, column = _grid_cell(lat, long)
+        # A heap of the nearest stations found so far, as (-distance, name)
+        # pairs, so that the farthest of them is at the front.
+        found = []
+        ring = 0
+        while True:
+            for cell in _grid_ring(row, column, ring):
+                for name, station_lat, station_long in self._cells.get(cell,
+                                                                       []):
+                    distance = great_circle_distance(
+                        (lat, long), (station_lat, station_long))
+                    if len(found) < k:
+                        heapq.heappush(found, (-distance, name))
+                    elif distance < -found[0][0]:
+                        heapq.heapreplace(found, (-distance, name))
+
+            bound = _grid_bound(lat, long, row, column, ring)
+            if bound == math.inf or (len(found) == k and -found[0][0] <= bound):
+                return sorted(((name, -distance) for distance, name in found),
+                              key=lambda pair: (pair[1], pair[0]))
+            ring += 1
+
+    def within_radius(self, lat: float, long: float,
+                      radius: float) -> list[tuple[str, float]]:
+        """Return the stations in this index within <radius> km of latitude
+        <lat> and longitude <long>, as (name, distance) pairs in order of
+        distance.
+
+        Preconditions:
+        - -90 <= lat <= 90
+        - -180 <= long <= 180
+        - radius >= 0
+
+        >>> index = StationIndex()
+        >>> index.add('Toronto', (43.6529, -79.3849))
+        >>> index.add('Montreal', (45.47, -73.74))
+        >>> [name for name, _ in index.within_radius(45.5, -73.6, 50.0)]
+        ['Montreal']
+        """
+        angle = math.degrees(radius / EARTH_RADIUS)
+        south, north = lat - angle, lat + angle
+        if south <= -90 or north >= 90 or \
+                math.sin(radius / EARTH_RADIUS) >= math.cos(math.radians(lat)):
+            # The circle reaches a pole, so it covers every longitude.
+            west, east = -180.0, 180.0
+        else:
+            half_width = math.degrees(math.asin(
+                math.sin(radius / EARTH_RADIUS) / math.cos(math.radians(lat))))
+            west, east = long - half_width, long + half_width
+
+        result = []
+        for cell in _grid_cells(max(south, -90), west, min(north, 90), east):
+            for name, station_lat, station_long in self._cells.get(cell, []):
+                distance = great_circle_distance((lat, long),
+                                                 (station_lat, station_long))
+                if distance <= radius:
+                    result.append((name, distance))
+
+        return sorted(result, key=lambda pair: (pair[1], pair[0]))
+
+    def within_bbox(self, south: float, west: float, north: float,
+                    east: float) -> list[str]:
+        """Return the names, in sorted order, of the stations in this index
+        with latitude from <south> to <north> and longitude from <west> to
+        <east>, inclusive.
+
+        If <west> is greater than <east>, the box crosses longitude 180, and
+        holds the longitudes from <west> up to 180 and from -180 up to
+        <east>.
+
+        Preconditions:
+        - -90 <= south <= north <= 90
+        - -180 <= west <= 180
+        - -180 <= east <= 180
+
+        >>> index = StationIndex()
+        >>> index.add('Toronto', (43.6529, -79.3849))
+        >>> index.add('Montreal', (45.47, -73.74))
+        >>> index.add('Anadyr', (64.73, 177.5))
+        >>> index.within_bbox(40.0, -80.0, 50.0, -70.0)
+        ['Montreal', 'Toronto']
+        >>> index.within_bbox(60.0, 170.0, 70.0, -170.0)
+        ['Anadyr']
+        """
+        crosses = west > east
+        result = []
+        for cell in _grid_cells(south, west, north,
+                                east + 360 if crosses else east):
+            for name, station_lat, station_long in self._cells.get(cell, []):
+                if south <= station_lat <= north and (
+                        (west <= station_long or station_long <= east)
+                        if crosses else west <= station_long <= east):
+                    result.append(name)
+
+        return sorted(result)
+
+
+@check_contracts
+class Country:
+    """ The weather records for various locations in a country.
+
+    === Instance Attributes ===
+    name: Name of the country.
+
+    === Private Attributes ===
+    _names:
+        The names of the locations in this country, in the order they were
+        added.
+    _histories:
+        The weather records for this country that are loaded. Each key is a
+        location's name, and its value is that location's weather history
+    _loaders:
+        The locations in this country whose weather history is loaded only
+        when it is needed. Each key is a location's name, and its value is a
+        function that loads and returns that location's weather history.
+    _capacity:
+        The most histories from _loaders that are kept loaded at once, or
+        None if there is no limit.
+    _resident:
+        The locations from _loaders whose histories are loaded, least
+        recently used first, when there is a limit on how many are kept
+        loaded. The values are unused.
+    _locations:
+        A spatial index of the coordinates of every location in this
+        country, whether or not its weather history has been loaded.
+    _daily_means:
+        Statistics of the average temperatures of the locations in this
+        country on each date. Each key is a date, and its value describes
+        the average temperature on that date of every indexed location with
+        weather recorded on it.
+    _daily_highs:
+        The hottest location on each date. Each key is a date, and its value
+        is the name and maximum temperature of the indexed location with the
+        highest maximum temperature on that date.
+    _indexed:
+        The locations whose weather is included in _daily_means and
+        _daily_highs. Each key is a location's name, and its value is the
+        version of its weather (see HistoricalWeather.version) that was
+        included, the number of days of weather that were included, and the
+        most recent of those days, or None if there were none.
+
+    === Representation Invariants ===
+    - For each key, k, of _histories, k == _histories[k].name
+    - len(self._locations) == len(self._names)
+    - Every key of _histories and of _loaders is in _names
+    - Every key of _resident is a key of both _histories and _loaders
+    - self._capacity is None or len(self._resident) <= self._capacity
+    - self._capacity is not None or self._resident == {}
+    - Every key of _indexed is in _names
+
+    === Sample Usage ===
+    >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
+    >>> toronto_weather = HistoricalWeather('YYZ', (43.6529, -79.3849))
+    >>> toronto_weather.add_weather(date.today(), weather)
+    >>> canada = Country('Canada')
+    >>> canada.add_history(toronto_weather)
+    >>> yyz = canada.retrieve_history('YYZ')
+    >>> yyz.retrieve_weather(date.today()).avg_temp == 13
+    True
+    """
+    name: str
+    _names: list[str]
+    _histories: dict[str, HistoricalWeather]
+    _loaders: dict[str, Callable[[], HistoricalWeather]]
+    _capacity: Optional[int]
+    _resident: OrderedDict
+    _locations: StationIndex
+    _daily_means: dict[date, RunningStats]
+    _daily_highs: dict[date, tuple[str, float]]
+    _indexed: dict[str, tuple[int, int, Optional[date]]]
+
+    def __init__(self, n: str, capacity: Optional[int] = None) -> None:
+        """ Initialize this Country with name <n> and no weather history so far.
+
+        If <capacity> is not None, at most that many of the histories added
+        with add_pending are kept loaded at once (see retrieve_history).
+
+        Preconditions:
+        - capacity is None or capacity >= 1
+
+        >>> canada = Country('Canada')
+        >>> print(canada.name)
+        Canada
+        """
+        self.name = n
+        self._names = []
+        self._histories = {}
+        self._loaders = {}
+        self._capacity = capacity
+        self._resident = OrderedDict()
+        self._locations = StationIndex()
+        self._daily_means = {}
+        self._daily_highs = {}
+        self._indexed = {}
+
+    def __str__(self) -> str:
+        """Return a str representing this Country.
+
+        >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
+        >>> weather_2 = DailyWeather((14, 10, 21), (5, 0, 2.0))
+        >>> canada = Country('Canada')
+        >>> the_date = date(2024,7,13)
+        >>> loc1_data = HistoricalWeather('Toronto', (43.6, -79.63))
+        >>> loc1_data.add_weather(the_date, weather)
+        >>> loc2_data = HistoricalWeather('YYZ', (43.6529, -79.3849))
+        >>> loc2_data.add_weather(the_date - timedelta(1), weather)
+        >>> loc2_data.add_weather(the_date + timedelta(1), weather_2)
+        >>> canada.add_history(loc1_data)
+        >>> canada.add_history(loc2_data)
+        >>> print(canada)
+        Canada:
+        Toronto (43.60, -79.63):
+        2024-07-13: Average: 13.00 Low: 9.00 High: 20.00 Precipitation: 5.00 \
+Snow: 0.00 Rain: 0.00
+        YYZ (43.65, -79.38):
+        2024-07-12: Average: 13.00 Low: 9.00 High: 20.00 Precipitation: 5.00 \
+Snow: 0.00 Rain: 0.00
+        2024-07-14: Average: 14.00 Low: 10.00 High: 21.00 Precipitation: 5.00 \
+Snow: 2.00 Rain: 0.00
+        """
+        result = f'{self.name}:\n'
+
+        for locations in self.histories():
+            result += f'{locations}\n'
+
+        return result.strip()
+
+    def add_history(self, hw: HistoricalWeather) -> None:
+        """Add a location to this Country. <hw> is the location's weather
+        history, and hw.name is the location's name.
+
+        If a location with the name hw.name is already recorded in this Country,
+        then do nothing (i.e. do not change the data that is already present
+        for that location).
+
+        >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
+        >>> toronto_weather = HistoricalWeather('YYZ', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date.today(), weather)
+        >>> canada = Country('Canada')
+        >>> canada.add_history(toronto_weather)
+        >>> yyz = canada.retrieve_history('YYZ')
+        >>> yyz.retrieve_weather(date.today()).avg_temp == 13
+        True
+        """
+        if hw.name not in self._histories and hw.name not in self._loaders:
+            self._names.append(hw.name)
+            self._histories[hw.name] = hw
+            self._locations.add(hw.name, hw.coordinates)
+
+    def num_locations(self) -> int:
+        """Return the number of locations in this Country, whether or not
+        their weather histories have been loaded.
+
+        >>> generate_usage_example().num_locations()
+        2
+        """
+        return len(self._locations)
+
+    def retrieve_history(self, name: str) -> Optional[HistoricalWeather]:
+        """Return the weather history for the location called <name>, or
+        None if no such location has been recorded in this Country.
+
+        >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
+        >>> toronto_weather = HistoricalWeather('YYZ', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date.today(), weather)
+        >>> canada = Country('Canada')
+        >>> canada.add_history(toronto_weather)
+        >>> yyz = canada.retrieve_history('YYZ')
+        >>> yyz.retrieve_weather(date.today()).avg_temp == 13
+        True
+        """
+        if name in self._resident:
+            self._resident.move_to_end(name)
+        elif name in self._loaders and name not in self._histories:
+            self._histories[name] = self._loaders[name]()
+            if self._capacity is not None:
+                self._resident[name] = None
+                if len(self._resident) > self._capacity:
+                    del self._histories[self._resident.popitem(last=False)[0]]
+
+        if name in self._histories:
+            return self._histories[name]
+        else:
+            return None
+
+    def save_snapshot(self, path: str) -> None:
+        """Save all the weather records in this Country to a new snapshot file
+        at <path>, which open_snapshot can read back.
+
+        A snapshot starts with a header giving the name of the country and
+        the number of locations, followed by an index with a fixed-width
+        entry for each location: the position and length of its name, its
+        coordinates, its number of recorded days, and the position of its
+        data. Each location's data is stored column by column, in the same
+        layout as a WeatherColumns: the date ordinals as 8-byte integers,
+        then the six measurements as 8-byte floats, then the trace masks as
+        single bytes. Everything is little-endian.
+
+        >>> import os, tempfile
+        >>> canada = generate_usage_example()
+        >>> path = os.path.join(tempfile.mkdtemp(), 'canada.snapshot')
+        >>> canada.save_snapshot(path)
+        >>> str(open_snapshot(path)) == str(canada)
+        True
+        """
+        with open(path, 'wb') as f:
+            self.write_snapshot(f)
+
+    def write_snapshot(self, f: BinaryIO) -> None:
+        """Write all the weather records in this Country to <f>, a binary file
+        opened for writing, as a snapshot in the layout described in
+        save_snapshot.
+
+        Preconditions:
+        - Nothing has been written to f yet
+        """
+        written = 0
+        for offset, data in self.snapshot_parts()[1]:
+            f.write(bytes(offset - written))
+            f.write(data)
+            written = offset + len(data)
+
+    def snapshot_parts(self) -> tuple[int, Iterator[tuple[int, bytes]]]:
+        """Return the size in bytes of a snapshot of this Country, in the
+        layout described in save_snapshot, and an iterator of (offset, data)
+        pairs, in increasing order of offset, giving the bytes that go at
+        each offset of the snapshot. Any bytes not given are zero.
+
+        Only the size and the index are worked out before returning. Each
+        location's data is produced as the iterator reaches it, so at most
+        one location's data is held in memory at once. Each history is
+        retrieved twice: once to work out the index, and once for its data.
+
+        Preconditions:
+        - This Country does not change until the iterator is exhausted.
+
+        >>> canada = generate_usage_example()
+        >>> size, parts = canada.snapshot_parts()
+        >>> snapshot = bytearray(size)
+        >>> for offset, data in parts:
+        ...     snapshot[offset:offset + len(data)] = data
+        >>> str(_snapshot_country(memoryview(snapshot), None)) == str(canada)
+        True
+        """
+        stations = [(hw.name.encode(), hw.coordinates, hw.num_days())
+                    for hw in self.histories()]
+        country_name = self.name.encode()
+
+        # Work out where the index, the names and each station's data go.
+        names_start = (_SNAPSHOT_HEADER.size + len(country_name)
+                       + _SNAPSHOT_ENTRY.size * len(stations))
+        data_start = names_start + sum(len(name) for name, _, _ in stations)
+        entries = []
+        data_offsets = []
+        name_offset = names_start
+        data_offset = _align(data_start)
+        for name, (lat, long), rows in stations:
+            entries.append(_SNAPSHOT_ENTRY.pack(name_offset, len(name), lat,
+                                                long, rows, data_offset))
+            data_offsets.append(data_offset)
+            name_offset += len(name)
+            data_offset = _align(data_offset + _SNAPSHOT_ROW_SIZE * rows)
+
+        head = b''.join([_SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC,
+                                               len(country_name),
+                                               len(stations)),
+                         country_name] + entries
+                        + [name for name, _, _ in stations])
+        return data_offset, self._snapshot_data(head, data_offsets)
+
+    def _snapshot_data(self, head: bytes, data_offsets: list[int]
+                       ) -> Iterator[tuple[int, bytes]]:
+        """Yield the (offset, data) pairs of snapshot_parts: <head>, which
+        goes at the start, then each column of each location's data, where
+        <data_offsets> gives the offset of each location's data.
+        """
+        yield 0, head
+        for history, offset in zip(self.histories(), data_offsets):
+            columns = history.columns()
+            for column in (columns.days, columns.avg_temps,
+                           columns.low_temps, columns.high_temps,
+                           columns.precipitation, columns.rainfall,
+                           columns.snowfall, columns.trace):
+                yield offset, _little_endian(column)
+                offset += column.itemsize * len(column)
+
+    def add_pending(self, name: str, coordinates: tuple[float, float],
+                    load: Callable[[], HistoricalWeather]) -> None:
+        """Add the location called <name> at <coordinates> to this Country
+        without loading its weather history yet. <load> is a function that
+        loads and returns that history; it is called the first time the
+        history is needed, and again whenever it is needed after being
+        unloaded to keep within this Country's capacity. Changes made to a
+        history that is unloaded are lost.
+
+        If a location called <name> is already recorded in this Country,
+        then do nothing.
+
+        Preconditions:
+        - load() returns a HistoricalWeather whose name is <name> and whose
+          coordinates are <coordinates>
+
+        >>> canada = Country('Canada')
+        >>> canada.add_pending('YYZ', (0, 0),
+        ...                    lambda: HistoricalWeather('YYZ', (0, 0)))
+        >>> canada.retrieve_history('YYZ').name
+        'YYZ'
+        """
+        if name not in self._histories and name not in self._loaders:
+            self._names.append(name)
+            self._loaders[name] = load
+            self._locations.add(name, coordinates)
+
+    def nearest(self, lat: float, long: float,
+                k: int = 1) -> list[tuple[str, float]]:
+        """Return the <k> locations in this Country nearest to latitude
+        <lat> and longitude <long>, as (name, distance in km) pairs in order
+        of distance. If there are fewer than <k> locations, return them all.
+        In the case of a tie for the last place, any of the tied locations
+        can be returned.
+
+        No weather histories are loaded to answer this.
+
+        Preconditions:
+        - -90 <= lat <= 90
+        - -180 <= long <= 180
+        - k >= 1
+
+        >>> canada = generate_usage_example()
+        >>> [name for name, _ in canada.nearest(43.7, -79.4, 2)]
+        ['YYZ', 'Toronto']
+        """
+        return self._locations.nearest(lat, long, k)
+
+    def within_radius(self, lat: float, long: float,
+                      radius: float) -> list[tuple[str, float]]:
+        """Return the locations in this Country within <radius> km of
+        latitude <lat> and longitude <long>, as (name, distance in km) pairs
+        in order of distance.
+
+        Preconditions:
+        - -90 <= lat <= 90
+        - -180 <= long <= 180
+        - radius >= 0
+
+        >>> canada = generate_usage_example()
+        >>> [name for name, _ in canada.within_radius(43.6, -79.63, 10.0)]
+        ['Toronto']
+        """
+        return self._locations.within_radius(lat, long, radius)
+
+    def within_bbox(self, south: float, west: float, north: float,
+                    east: float) -> list[str]:
+        """Return the names, in sorted order, of the locations in this
+        Country with latitude from <south> to <north> and longitude from
+        <west> to <east>, inclusive. See StationIndex.within_bbox.
+
+        Preconditions:
+        - -90 <= south <= north <= 90
+        - -180 <= west <= 180
+        - -180 <= east <= 180
+
+        >>> canada = generate_usage_example()
+        >>> canada.within_bbox(40.0, -80.0, 50.0, -79.5)
+        ['Toronto']
+        """
+        return self._locations.within_bbox(south, west, north, east)
+
+    def location_names(self) -> list[str]:
+        """Return the names of the locations in this Country, in the order
+        they were added.
+
+        >>> generate_usage_example().location_names()
+        ['Toronto', 'YYZ']
+        """
+        return list(self._names)
+
+    def capacity(self) -> Optional[int]:
+        """Return the most weather histories this Country keeps loaded at
+        once, or None if there is no limit (see retrieve_history).
+
+        >>> Country('Canada', 3).capacity()
+        3
+        """
+        return self._capacity
+
+    def histories(self) -> Iterator[HistoricalWeather]:
+        """Yield the weather history of every location in this Country, in
+        the order they were added, loading each one when it is reached (see
+        retrieve_history).
+        """
+        for name in self._names:
+            yield self.retrieve_history(name)
+
+    def map_statistic(self, statistic: str, args: tuple = (),
+                      executor: Optional['StationExecutor'] = None
+                      ) -> list[tuple[str, Any]]:
+        """Return a (name, result) pair for every location in this Country,
+        in the order they were added, where result is what the
+        HistoricalWeather method called <statistic> returns when it is called
+        with <args> on that location's weather history.
+
+        The calls are run by <executor>, or one location at a time if it is
+        None (see StationExecutor).
+
+        Preconditions:
+        - statistic is the name of a HistoricalWeather method
+        - executor is None or executor.country is self
+
+        >>> canada = generate_usage_example()
+        >>> canada.map_statistic('num_days')
+        [('Toronto', 1), ('YYZ', 2)]
+        """
+        if executor is None:
+            executor = StationExecutor(self)
+        return list(executor.map(statistic, args))
+
+    def snowiest_location(self,
+                          executor: Optional['StationExecutor'] = None) \
+            -> Union[tuple[str, float], tuple[None, None]]:
+        """Return the name of location with the highest percentage snowfall in
+        this Country, and its percentage snowfall.
+
+        In the case of a tie, the location added to this Country first is
+        returned. The percentage snowfall of each location is computed by
+        <executor>, or one location at a time if it is None (see
+        StationExecutor).
+
+        If there are no locations in this Country, return (None, None).
+
+        Preconditions:
+        - For all locations in this Country, at least one day's
+          weather has been recorded where snowfall > 0 or rainfall > 0
+          or both.
+
+        >>> weather = DailyWeather((13, 9, 20), (5, 2, 3))
+        >>> other_weather = DailyWeather((13, 4, 20), (5, 2, 2))
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> mtl_weather = HistoricalWeather('Montreal', (45.47, -73.74))
+        >>> toronto_weather.add_weather(date.today(), weather)
+        >>> mtl_weather.add_weather(date.today(), other_weather)
+        >>> canada = Country('Canada')
+        >>> canada.add_history(toronto_weather)
+        >>> canada.add_history(mtl_weather)
+        >>> result = canada.snowiest_location()
+        >>> result[0]
+        'Toronto'
+        >>> result[1]
+        0.6
+        """
+        if not self._names:
+            return None, None
+        else:
+            location = None
+            percent_snowfall = 0.0
+
+            if executor is None:
+                executor = StationExecutor(self)
+            for name, snowfall in executor.map('percentage_snowfall'):
+                if snowfall > percent_snowfall:
+                    location = name
+                    percent_snowfall = snowfall
+
+            return location, percent_snowfall
+
+    def snowiest_locations(self, n: int) -> list[tuple[str, float]]:
+        """Return the names and percentage snowfall of the <n> locations
+        with the highest percentage snowfall in this Country, as
+        (name, percentage snowfall) pairs, snowiest first. If there are
+        fewer than <n> locations, return them all.
+
+        Locations with no snowfall or rainfall recorded are left out. Each
+        location's percentage snowfall is computed from its precipitation
+        totals (see HistoricalWeather.precipitation_totals), and the <n>
+        snowiest are picked with a heap, so this takes O(m log n) time for
+        a Country with m locations. In the case of a tie, the location added
+        to this Country first comes first.
+
+        Preconditions:
+        - n >= 1
+
+        >>> canada = Country('Canada')
+        >>> for name, snow in [('Toronto', 1), ('Iqaluit', 9), ('Ottawa', 3)]:
+        ...     history = HistoricalWeather(name, (45.0, -75.0))
+        ...     weather = DailyWeather((0, 0, 0), (10, 10 - snow, snow))
+        ...     history.add_weather(date(2024, 1, 1), weather)
+        ...     canada.add_history(history)
+        >>> canada.snowiest_locations(2)
+        [('Iqaluit', 0.9), ('Ottawa', 0.3)]
+        """
+        percentages = []
+        for history in self.histories():
+            snowfall, rainfall = history.precipitation_totals()
+            if snowfall + rainfall > 0:
+                percentages.append((history.name,
+                                    snowfall / (snowfall + rainfall)))
+
+        return heapq.nlargest(n, percentages, key=lambda pair: pair[1])
+
+    def hottest_location(self, d: date) \
+            -> Union[tuple[str, float], tuple[None, None]]:
+        """Return the name of the location in this Country with the highest
+        maximum temperature on the date <d>, and that temperature.
+
+        In the case of a tie, any one of the tied locations can be returned.
+        If no location in this Country has weather recorded on <d>, return
+        (None, None).
+
+        This is answered from an index of every location's weather by date,
+        which is brought up to date first (see _update_daily).
+
+        >>> canada = generate_usage_example()
+        >>> canada.hottest_location(date(2024, 7, 14))
+        ('YYZ', 21.0)
+        >>> canada.hottest_location(date(2024, 7, 15))
+        (None, None)
+        """
+        self._update_daily()
+        if d in self._daily_highs:
+            return self._daily_highs[d]
+        else:
+            return None, None
+
+    def national_mean_temperature(self, d: date) -> Optional[float]:
+        """Return the mean of the average temperatures on the date <d> of
+        all the locations in this Country with weather recorded on <d>, or
+        None if there are no such locations.
+
+        This is answered from an index of every location's weather by date,
+        which is brought up to date first (see _update_daily).
+
+        >>> canada = generate_usage_example()
+        >>> canada.national_mean_temperature(date(2024, 7, 13))
+        13.0
+        >>> canada.add_history(HistoricalWeather('Montreal', (45.47, -73.74)))
+        >>> canada.retrieve_history('Montreal').add_weather(
+        ...     date(2024, 7, 13), DailyWeather((16, 9, 20), (0, 0, 0)))
+        >>> canada.national_mean_temperature(date(2024, 7, 13))
+        14.5
+        """
+        self._update_daily()
+        if d in self._daily_means:
+            return self._daily_means[d].average()
+        else:
+            return None
+
+    def _update_daily(self) -> None:
+        """Bring _daily_means and _daily_highs up to date with the weather
+        recorded in every location in this Country.
+
+        Locations that have not been indexed yet are added to the index, so
+        each location's weather is only read once. If weather has been
+        recorded in an indexed location since it was indexed, and all of it
+        is for days after the ones that were indexed (as when new rows are
+        appended to its csv file), only the new days are added to the index.
+        Otherwise, the index is rebuilt from scratch. Locations that have
+        been unloaded since they were indexed are not loaded again to check
+        them, since they are loaded again unchanged.
+        """
+        appended = {}
+        for name, (version, days, last) in self._indexed.items():
+            if name not in self._histories:
+                continue
+            history = self._histories[name]
+            if version != history.version():
+                start = None if last is None else last + timedelta(1)
+                new_days = list(history.iter_range(start))
+                if len(new_days) != history.num_days() - days:
+                    self._daily_means = {}
+                    self._daily_highs = {}
+                    self._indexed = {}
+                    appended = {}
+                    break
+                appended[name] = (history, new_days)
+
+        for name in self._names:
+            if name in appended:
+                history, new_days = appended[name]
+                last = self._index_days(name, new_days,
+                                        self._indexed[name][2])
+            elif name not in self._indexed:
+                history = self.retrieve_history(name)
+                last = self._index_days(name, history.iter_range(), None)
+            else:
+                continue
+            self._indexed[name] = (history.version(), history.num_days(), last)
+
+    def _index_days(self, name: str,
+                    days: Iterable[tuple[date, DailyWeather]],
+                    last: Optional[date]) -> Optional[date]:
+        """Add <days>, the weather recorded in the location called <name> on
+        some days in order from oldest to most recent, to _daily_means and
+        _daily_highs.
+
+        Return the most recent of <days>, or <last> if there are none.
+        """
+        for d, w in days:
+            if d not in self._daily_means:
+                self._daily_means[d] = RunningStats()
+            self._daily_means[d].add(float(w.avg_temp))
+            if d not in self._daily_highs or \
+                    w.high_temp > self._daily_highs[d][1]:
+                self._daily_highs[d] = (name, float(w.high_temp))
+            last = d
+        return last
+
+    @_profiled('Country.generate_summary', _country_locations)
+    def generate_summary(self, path: str = 'report.md',
+                         workers: Optional[int] = 1,
+                         executor: Optional['StationExecutor'] = None
+                         ) -> None:
+        """Write a summary of interesting statistics for the locations
+        in this Country to a markdown file called <path>.
+
+        Each location's statistics are computed in a single pass over its
+        records (see HistoricalWeather.summarize), and each row is written
+        as soon as it is ready. If <executor> is not None, the locations are
+        summarized by it. Otherwise, if <workers> is more than 1, they are
+        summarized in parallel by that many worker processes, and if it is
+        None, by one worker process per CPU (see StationExecutor). The rows
+        are in the same order either way.
+
+        Preconditions:
+        - All locations in this Country have at least one row of data
+          recorded in December of any year
+        - Data has been recorded for Dec 25 in at least one year
+        - workers is None or workers >= 1
+        - executor is None or executor.country is self
+
+        >>> import os, tempfile
+        >>> weather = DailyWeather((0, -3, 2), (2, 1, 1))
+        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
+        >>> toronto_weather.add_weather(date(2023, 12, 25), weather)
+        >>> canada = Country('Canada')
+        >>> canada.add_history(toronto_weather)
+        >>> path = os.path.join(tempfile.mkdtemp(), 'report.md')
+        >>> canada.generate_summary(path)
+        >>> print(open(path).read().splitlines()[2].rstrip())
+        Toronto              | 2.0        | -3.0 | 1                        \
+| 0.5
+        """
+        with open(path, 'w') as f:
+            _write_report_header(f)
+            if executor is not None:
+                for _, summary in executor.map('summarize'):
+                    f.write(summary.report_row())
+            else:
+                kind = 'serial' if workers == 1 else 'process'
+                with StationExecutor(self, kind, workers) as pool:
+                    for _, summary in pool.map('summarize'):
+                        f.write(summary.report_row())
+
+
+@check_contracts
+class StationExecutor:
+    """Runs a HistoricalWeather statistic on the weather history of every
+    location in a Country: one location at a time, in a pool of threads, or
+    in a pool of worker processes.
+
+    A pool of processes is not sent the histories themselves. Instead, a
+    snapshot of the Country (see Country.save_snapshot) is written to a
+    block of shared memory when the executor is made, and each task is just
+    the names of a few locations. The worker process running it copies each
+    of those locations' columns out of the block the first time it needs
+    them, and keeps the history, up to the Country's capacity, for as long as
+    the executor is open. So the Country must not change while the executor
+    is open, or the worker processes will not see the changes.
+
+    Whatever the kind of executor, the results come back in the order the
+    locations were added to the Country, no matter which call finishes
+    first, so anything worked out from them, such as which of several tied
+    locations wins, is the same every time.
+
+    === Instance Attributes ===
+    country:
+        The Country whose locations the statistics are run on.
+    kind:
+        'serial', 'thread' or 'process'.
+
+    === Private Attributes ===
+    _pool:
+        The pool of threads or processes, or None if the kind is 'serial' or
+        this executor has been closed.
+    _block:
+        The block of shared memory holding the snapshot of the Country, or
+        None if the kind is not 'process' or this executor has been closed.
+    _chunksize:
+        The number of locations sent to a worker process at a time.
+    _window:
+        The most locations a pool of threads is given at once. Each of them
+        holds on to its location's history until its statistic is taken
+        from it, so this bounds how many histories a Country that loads them
+        lazily has loaded at once, on top of its capacity.
+
+    === Representation Invariants ===
+    - self.kind in ('serial', 'thread', 'process')
+    - self._block is None or self.kind == 'process'
+    - self._chunksize >= 1
+    - self._window >= 1
+
+    === Sample Usage ===
+    >>> canada = generate_usage_example()
+    >>> with StationExecutor(canada, 'thread', 2) as executor:
+    ...     executor.map_statistic('precipitation_totals')
+    [('Toronto', (0.0, 0.0)), ('YYZ', (2.0, 0.0))]
+    """
+    country: Country
+    kind: str
+    _pool: Optional[Executor]
+    _block: Optional[SharedMemory]
+    _chunksize: int
+    _window: int
+
+    def __init__(self, country: Country, kind: str = 'serial',
+                 workers: Optional[int] = None, chunksize: int = 4) -> None:
+        """Initialize an executor of the given <kind> for the locations in
+        <country>, with <workers> threads or worker processes, or a number
+        based on the number of CPUs if <workers> is None.
+
+        Preconditions:
+        - kind in ('serial', 'thread', 'process')
+        - workers is None or workers >= 1
+        - chunksize >= 1
+        """
+        self.country = country
+        self.kind = kind
+        self._pool = None
+        self._block = None
+        self._chunksize = chunksize
+        if workers is None:
+            # The same number of threads as ThreadPoolExecutor picks.
+            workers = min(32, (os.cpu_count() or 1) + 4) if kind == 'thread' \
+                else os.cpu_count() or 1
+        self._window = workers * chunksize
+        if kind == 'thread':
+            self._pool = ThreadPoolExecutor(max_workers=workers)
+        elif kind == 'process':
+            size, parts = country.snapshot_parts()
+            # The block is made before the pool, so that the worker processes
+            # share this process's record of it and leave unlinking it to
+            # close. The snapshot is written straight into it, a column at a
+            # time, rather than built up elsewhere first.
+            self._block = SharedMemory(create=True, size=size)
+            for offset, data in parts:
+                self._block.buf[offset:offset + len(data)] = data
+            self._pool = ProcessPoolExecutor(max_workers=workers)
+
+    def __enter__(self) -> 'StationExecutor':
+        """Return this executor."""
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        """Close this executor."""
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the threads or worker processes of this executor and
+        free its block of shared memory, if it has them.
+
+        Preconditions:
+        - None of the iterators returned by map are still being used.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._block is not None:
+            self._block.close()
+            self._block.unlink()
+            self._block = None
+
+    def map(self, statistic: str,
+            args: tuple = ()) -> Iterator[tuple[str, Any]]:
+        """Return an iterator of a (name, result) pair for every location in
+        the Country, in the order they were added, where result is what the
+        HistoricalWeather method called <statistic> returns when it is called
+        with <args> on that location's weather history. Each pair is produced
+        as soon as it and every pair before it are ready.
+
+        Preconditions:
+        - statistic is the name of a HistoricalWeather method
+        - This executor has not been closed, or its kind is 'serial'.
+        - If the kind of this executor is 'process', args and the results of
+          the calls can be pickled.
+        """
+        names = list(self.country.location_names())
+        if self._pool is None:
+            results = (_call_statistic(statistic, args, history)
+                       for history in self.country.histories())
+        elif self._block is None:
+            results = self._thread_results(statistic, args)
+        else:
+            results = self._pool.map(
+                partial(_shared_statistic, self._block.name,
+                        self.country.capacity(), statistic, args),
+                names, chunksize=self._chunksize)
+        return zip(names, results)
+
+    def _thread_results(self, statistic: str,
+                        args: tuple) -> Iterator[Any]:
+        """Yield the result of calling the HistoricalWeather method called
+        <statistic> with <args> on each location's weather history, in
+        order, run in the pool of threads.
+
+        The next history is only retrieved once fewer than self._window are
+        waiting for their result to be yielded.
+        """
+        pending = deque()
+        for history in self.country.histories():
+            if len(pending) == self._window:
+                yield pending.popleft().result()
+            pending.append(self._pool.submit(_call_statistic, statistic,
+                                             args, history))
+        while pending:
+            yield pending.popleft().result()
+
+    def map_statistic(self, statistic: str,
+                      args: tuple = ()) -> list[tuple[str, Any]]:
+        """Return a list of the (name, result) pairs given by map.
+
+        Preconditions:
+        - statistic is the name of a HistoricalWeather method
+        - This executor has not been closed, or its kind is 'serial'.
+        - If the kind of this executor is 'process', args and the results of
+          the calls can be pickled.
+        """
+        return list(self.map(statistic, args))
+
+
+@check_contracts
+class StationFeed:
+    """A station's csv file that new rows of weather are appended to, and the
+    weather history loaded from it so far.
+
+    Each refresh reads only the bytes appended to the file since the one
+    before it, a line at a time, so keeping the history up to date takes
+    time proportional to the new rows rather than to the whole file, and
+    memory that does not grow with either. The new rows are recorded
+    with HistoricalWeather.add_weather_many, which updates the history's
+    record highs and lows, monthly statistics and precipitation totals
+    with each new row, so none of them has to rescan the earlier rows.
+
+    === Instance Attributes ===
+    path:
+        The path of the csv file.
+    history:
+        The weather history loaded from the file so far, or None if no row
+        read so far names the station.
+
+    === Private Attributes ===
+    _columnar:
+        Whether history is a ColumnarWeather.
+    _offset:
+        The number of bytes at the start of the file that have been read.
+    _unnamed_rows:
+        The rows read before the first row naming the station, split into
+        their columns, which cannot be recorded until history has been made.
+
+    === Representation Invariants ===
+    - self._offset >= 0
+    - self.history is None or self._unnamed_rows == []
+
+    === Sample Usage ===
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'toronto.csv')
+    >>> row = '-79.4,43.67,TORONTO CITY,6158355,2024-07-{},2024,7,{},,' \\
+    ...       '20.3,,9.2,,13.1,,4.9,,0.0,,1.2,,0.0,,1.2,,0,,,,,\\n'
+    >>> with open(path, 'w') as f:
+    ...     _ = f.write('Longitude (x),Latitude (y),Station Name,...\\n')
+    ...     _ = f.write(row.format(13, 13))
+    >>> feed = StationFeed(path)
+    >>> feed.refresh()
+    1
+    >>> feed.history.monthly_statistics()['Jul'].count
+    1
+    >>> with open(path, 'a') as f:
+    ...     _ = f.write(row.format(14, 14))
+    >>> feed.refresh()
+    1
+    >>> feed.history.num_days()
+    2
+    >>> feed.history.monthly_statistics()['Jul'].count
+    2
+    >>> feed.history.record_highs()[(7, 14)]
+    20.3
+    >>> feed.refresh()
+    0
+    """
+    path: str
+    history: Optional[HistoricalWeather]
+    _columnar: bool
+    _offset: int
+    _unnamed_rows: list[list[str]]
+
+    def __init__(self, path: str, columnar: bool = False) -> None:
+        """Initialize a feed of the csv file at <path> that has not read any
+        of it yet.
+
+        If <columnar> is True, the history loaded from it will be a
+        ColumnarWeather.
+        """
+        self.path = path
+        self.history = None
+        self._columnar = columnar
+        self._offset = 0
+        self._unnamed_rows = []
+
+    def offset(self) -> int:
+        """Return the number of bytes at the start of this feed's file that
+        have been read.
+        """
+        return self._offset
+
+    def refresh(self) -> int:
+        """Record the weather in the rows appended to this feed's file since
+        it was last refreshed, and return the number of rows read.
+
+        The first refresh reads the whole file, skipping its header. A last
+        line that does not end with a newline yet is left for a later
+        refresh to read, in case it is still being written.
+
+        Preconditions:
+        - The file at self.path exists and obeys the format specified in the
+          handout.
+        - The file is only ever changed by appending rows to it.
+        """
+        rows = 0
+
+        def new_lines(f: TextIO) -> Iterator[str]:
+            """Yield each complete line of <f> after its header, moving the
+            offset past each line read, header included.
+            """
+            nonlocal rows
+            for line in f:
+                if not line.endswith('\n'):
+                    return
+                header = self._offset == 0
+                self._offset += len(line.encode(f.encoding))
+                if not header:
+                    rows += 1
+                    yield line
+
+        # newline='' keeps each line's own line ending, so that its length
+        # in bytes is the number of bytes it takes in the file.
+        with open(self.path, 'r', newline='') as f:
+            f.seek(self._offset)
+            self.history = _load_lines(new_lines(f), self._columnar,
+                                       self.history, self._unnamed_rows)
+        return rows
+
+
+@check_contracts
+class CountryFeed:
+    """A folder of station csv files that new rows of weather are appended
+    to, and the Country loaded from it so far.
+
+    Each refresh reads only the rows appended to each file since the one
+    before it (see StationFeed), and picks up any files added to the folder.
+    Locations whose histories were already in the Country are updated in
+    place, so their statistics, and the Country's, are kept up to date
+    without reading their earlier rows again.
+
+    === Instance Attributes ===
+    country:
+        The Country loaded from the folder so far.
+
+    === Private Attributes ===
+    _folder_name:
+        The name of the folder.
+    _columnar:
+        Whether each location's history is a ColumnarWeather.
+    _feeds:
+        The files in the folder that have been read. Each key is a file's
+        path, and its value is its feed.
+
+    === Representation Invariants ===
+    - For each key, k, of _feeds, k == _feeds[k].path
+
+    === Sample Usage ===
+    >>> import os, tempfile
+    >>> folder = tempfile.mkdtemp()
+    >>> row = '-79.4,43.67,TORONTO CITY,6158355,2024-07-{},2024,7,{},,' \\
+    ...       '20.3,,9.2,,13.1,,4.9,,0.0,,1.2,,0.0,,1.2,,0,,,,,\\n'
+    >>> path = os.path.join(folder, 'toronto.csv')
+    >>> with open(path, 'w') as f:
+    ...     _ = f.write('Longitude (x),Latitude (y),Station Name,...\\n')
+    ...     _ = f.write(row.format(13, 13))
+    >>> feed = CountryFeed(folder, 'Canada')
+    >>> feed.refresh()
+    1
+    >>> feed.country.hottest_location(date(2024, 7, 14))
+    (None, None)
+    >>> with open(path, 'a') as f:
+    ...     _ = f.write(row.format(14, 14))
+    >>> feed.refresh()
+    1
+    >>> feed.country.hottest_location(date(2024, 7, 14))
+    ('TORONTO CITY', 20.3)
+    """
+    country: Country
+    _folder_name: str
+    _columnar: bool
+    _feeds: dict[str, StationFeed]
+
+    def __init__(self, folder_name: str, name: str,
+                 columnar: bool = False) -> None:
+        """Initialize a feed of the station files in the folder called
+        <folder_name>, with an empty Country called <name>.
+
+        If <columnar> is True, each location's history will be a
+        ColumnarWeather.
+        """
+        self.country = Country(name)
+        self._folder_name = folder_name
+        self._columnar = columnar
+        self._feeds = {}
+
+    def refresh(self) -> int:
+        """Record the weather in the rows appended to the files in this
+        feed's folder since it was last refreshed, and return the number of
+        rows read.
+
+        As in load_country, if two files hold data for locations with the
+        same name, the first one to name its location is kept.
+
+        Preconditions:
+        - Each file in the folder obeys the preconditions of load_country.
+        - Files are only ever changed by appending rows to them, and are
+          never removed from the folder.
+        """
+        rows = 0
+        for path in _station_paths(self._folder_name):
+            if path not in self._feeds:
+                self._feeds[path] = StationFeed(path, self._columnar)
+            feed = self._feeds[path]
+
+            named = feed.history is not None
+            rows += feed.refresh()
+            if not named and feed.history is not None:
+                self.country.add_history(feed.history)
+        return rows
+
+
+@check_contracts
+class WeatherRegistry:
+    """A collection of Countries, such as the countries of a continent, that
+    can be queried together.
+
+    Countries loaded side by side hold weather for mostly the same dates.
+    Set INTERN_DATES to True before loading them, so that all of their
+    locations share one date object for each day (see interned_date).
+    Location names are always interned.
+
+    === Private Attributes ===
+    _countries:
+        The countries in this registry. Each key is a country's name, and
+        its value is that country, in the order they were added.
+
+    === Representation Invariants ===
+    - For each key, k, of _countries, k == _countries[k].name
+
+    === Sample Usage ===
+    >>> registry = WeatherRegistry()
+    >>> registry.add_country(generate_usage_example())
+    >>> registry.retrieve_country('Canada').name
+    'Canada'
+    >>> registry.hottest_location(date(2024, 7, 14))
+    ('Canada', 'YYZ', 21.0)
+    """
+    _countries: dict[str, Country]
+
+    def __init__(self) -> None:
+        """Initialize this registry with no countries so far.
+
+        >>> WeatherRegistry().country_names()
+        []
+        """
+        self._countries = {}
+
+    def add_country(self, country: Country) -> None:
+        """Add <country> to this registry.
+
+        If a country with the name country.name is already in this registry,
+        then do nothing.
+        """
+        if country.name not in self._countries:
+            self._countries[country.name] = country
+
+    def retrieve_country(self, name: str) -> Optional[Country]:
+        """Return the country called <name> in this registry, or None if
+        there is no such country.
+        """
+        return self._countries.get(name)
+
+    def country_names(self) -> list[str]:
+        """Return the names of the countries in this registry, in the order
+        they were added.
+        """
+        return list(self._countries)
+
+    def snowiest_locations(self, n: int) -> list[tuple[str, str, float]]:
+        """Return the <n> locations with the highest percentage snowfall in
+        any country in this registry, as (country name, location name,
+        percentage snowfall) triples, snowiest first. If there are fewer
+        than <n> locations, return them all.
+
+        The <n> snowiest of each country are found with
+        Country.snowiest_locations, and the <n> snowiest of those picked
+        with a heap. In the case of a tie, the location from the country
+        added to this registry first comes first.
+
+        Preconditions:
+        - n >= 1
+
+        >>> registry = WeatherRegistry()
+        >>> for country_name, snow in [('Canada', 8), ('Mexico', 1)]:
+        ...     country = Country(country_name)
+        ...     history = HistoricalWeather('Capital', (45.0, -75.0))
+        ...     weather = DailyWeather((0, 0, 0), (10, 10 - snow, snow))
+        ...     history.add_weather(date(2024, 1, 1), weather)
+        ...     country.add_history(history)
+        ...     registry.add_country(country)
+        >>> registry.snowiest_locations(1)
+        [('Canada', 'Capital', 0.8)]
+        """
+        return heapq.nlargest(
+            n, ((country.name, name, percentage)
+                for country in self._countries.values()
+                for name, percentage in country.snowiest_locations(n)),
+            key=lambda triple: triple[2])
+
+    def hottest_location(self, d: date) \
+            -> Union[tuple[str, str, float], tuple[None, None, None]]:
+        """Return the name of the country and of the location in it with the
+        highest maximum temperature on the date <d> of any location in this
+        registry, and that temperature.
+
+        In the case of a tie, any one of the tied locations can be returned.
+        If no location in this registry has weather recorded on <d>, return
+        (None, None, None). See Country.hottest_location.
+        """
+        result = (None, None, None)
+        for country in self._countries.values():
+            name, high = country.hottest_location(d)
+            if name is not None and (result[0] is None or high > result[2]):
+                result = (country.name, name, high)
+        return result
+
+
+# The DailyWeathers shared by interned_weather, keyed by the bytes of their
+# temperature statistics as 8-byte floats (see _DRY_DAY_KEY).
+_DRY_DAYS = {}
+_DRY_DAY_KEY = struct.Struct('<3d')
+_NO_PRECIPITATION = _DRY_DAY_KEY.pack(0.0, 0.0, 0.0)
+
+# The dates shared by interned_date, keyed by their ordinals, and keyed by the
+# year, month and day columns of the csv rows they were made from.
+_DATES = {}
+_DATE_COLUMNS = {}
+
+# The block of shared memory this worker process last read a Country from in
+# _shared_statistic, and that Country, keyed by the name of the block.
+_SHARED_COUNTRIES = {}
+
+
+def interned_weather(temperature_statistics: tuple[float, float, float],
+                     precipitation_statistics: tuple[float, float, float]
+                     ) -> DailyWeather:
+    """Return a DailyWeather with the given temperature and precipitation
+    statistics, which may be shared.
+
+    If there was no precipitation at all, given as 0.0 rather than -0.0,
+    the same DailyWeather is returned
+    for every call with the same temperature statistics, so it must not be
+    modified. Its statistics are all floats, and temperatures are only the
+    same if they are the same float, so 0.0 and -0.0 are kept apart and
+    print differently, as they would without sharing. Up to
+    INTERNED_DRY_DAYS_LIMIT DailyWeathers are kept for sharing: once that
+    many are, they are all forgotten and sharing starts over. Otherwise, a
+    new DailyWeather is returned.
+
+    Preconditions:
+    - temperature_statistics and precipitation_statistics satisfy the
+      preconditions of DailyWeather.__init__
+
+    >>> dry = interned_weather((13.0, 9.0, 20.0), (0.0, 0.0, 0.0))
+    >>> dry is interned_weather((13.0, 9.0, 20.0), (0.0, 0.0, 0.0))
+    True
+    >>> wet = interned_weather((13.0, 9.0, 20.0), (1.0, 1.0, 0.0))
+    >>> wet is interned_weather((13.0, 9.0, 20.0), (1.0, 1.0, 0.0))
+    False
+    >>> print(interned_weather((0.0, -0.0, 1.0), (0.0, 0.0, 0.0)).low_temp)
+    -0.0
+    >>> interned_weather((13, 9, 20), (0, 0, 0)).avg_temp
+    13.0
+    >>> print(interned_weather((13.0, 9.0, 20.0), (-0.0, 0.0, 0.0)))
+    Average: 13.00 Low: 9.00 High: 20.00 Precipitation: -0.00 Snow: 0.00 \
+Rain: 0.00
+    """
+    if _DRY_DAY_KEY.pack(*precipitation_statistics) == _NO_PRECIPITATION:
+        key = _DRY_DAY_KEY.pack(*temperature_statistics)
+        if key not in _DRY_DAYS:
+            if len(_DRY_DAYS) >= INTERNED_DRY_DAYS_LIMIT:
+                _DRY_DAYS.clear()
+            _DRY_DAYS[key] = DailyWeather(
+                (float(temperature_statistics[0]),
+                 float(temperature_statistics[1]),
+                 float(temperature_statistics[2])), (0.0, 0.0, 0.0))
+        return _DRY_DAYS[key]
+    else:
+        return DailyWeather(temperature_statistics, precipitation_statistics)
+
+
+def interned_date(year: str, month: str, day: str) -> date:
+    """Return the date with the given <year>, <month> and <day>, as written
+    in the columns of a csv file, which may be shared.
+
+    The same date is returned for every call for the same day, for as long
+    as this program runs, so the dates of every location loaded while
+    INTERN_DATES is True are shared, and each row of a csv file after the
+    first for a day is read without parsing its date at all.
+
+    Raise ValueError if the columns do not give a valid date.
+
+    >>> first = interned_date('2024', '07', '13')
+    >>> first is interned_date('2024', '7', '13')
+    True
+    >>> interned_date('2024', '02', '30')
+    Traceback (most recent call last):
+    ...
+    ValueError: day is out of range for month
+    """
+    # A single string is a smaller key to keep than a tuple of three.
+    key = f'{year}-{month}-{day}'
+    if key not in _DATE_COLUMNS:
+        d = date(int(year), int(month), int(day))
+        _DATE_COLUMNS[key] = _DATES.setdefault(d.toordinal(), d)
+    return _DATE_COLUMNS[key]
+
+
+def _write_report_header(f: TextIO) -> None:
+    """Write the header of the report written by Country.generate_summary to
+    <f>.
+    """
+    headers = ["Location", "record high <br/> for Dec 25",
+               "december <br/> average",
+               "contiguous <br/> precipitation",
+               "percentage <br/> snowfall"]
+    f.write(" | ".join(headers) + "\n")
+    f.write(":|-".join(["-" * len(col) for col in headers]) + ":\n")
+
+
+def _call_statistic(statistic: str, args: tuple,
+                    history: HistoricalWeather) -> Any:
+    """Return the result of calling the method of <history> called
+    <statistic> with <args>.
+    """
+    return getattr(history, statistic)(*args)
+
+
+def _shared_statistic(block: str, capacity: Optional[int], statistic: str,
+                      args: tuple, location: str) -> Any:
+    """Return the result of calling the HistoricalWeather method called
+    <statistic> with <args> on the weather history of <location>, in the
+    Country whose snapshot is held in the block of shared memory called
+    <block> (see StationExecutor).
+
+    This is a module-level function so that worker processes can run it.
+    Each worker process attaches to the block and reads its index only once,
+    and keeps up to <capacity> histories copied out of it (see
+    Country.retrieve_history).
+    """
+    if block not in _SHARED_COUNTRIES:
+        _SHARED_COUNTRIES.clear()
+        memory = SharedMemory(name=block)
+        _SHARED_COUNTRIES[block] = (memory,
+                                    _snapshot_country(memory.buf, capacity))
+    history = _SHARED_COUNTRIES[block][1].retrieve_history(location)
+    return getattr(history, statistic)(*args)
+
+
+def _record_high_py(columns: WeatherColumns, m: int, d: int, lo: int = 0,
+                    hi: Optional[int] = None) -> float:
+    """Return the highest temperature in <columns> on month <m> and day <d>
+    of any year, by looking at each day in turn.
+
+    Only the days at positions <lo> up to but not including <hi> in
+    <columns> are looked at. If <hi> is None, every day from <lo> on is.
+
+    Preconditions:
+    - The weather on month m and day d is in the given positions of columns
+      for at least one year.
+
+    >>> columns = WeatherColumns()
+    >>> columns.append(date(2023, 6, 8).toordinal(), (1, 0, 30), (0, 0, 0))
+    >>> columns.append(date(2024, 6, 8).toordinal(), (1, 0, 40), (0, 0, 0))
+    >>> _record_high_py(columns, 6, 8)
+    40.0
+    >>> _record_high_py(columns, 6, 8, 0, 1)
+    30.0
+    """
+    max_temp = None
+
+    for i in range(lo, len(columns) if hi is None else hi):
+        day = date.fromordinal(columns.days[i])
+        if day.month == m and day.day == d:
+            if max_temp is None or columns.high_temps[i] > max_temp:
+                max_temp = columns.high_temps[i]
+
+    return max_temp
+
+
+def _record_high_np(columns: WeatherColumns, m: int, d: int, lo: int = 0,
+                    hi: Optional[int] = None) -> float:
+    """Return the same result as _record_high_py, computed with NumPy.
+
+    >>> columns = WeatherColumns()
+    >>> columns.append(date(2023, 6, 8).toordinal(), (1, 0, 30), (0, 0, 0))
+    >>> columns.append(date(2024, 6, 8).toordinal(), (1, 0, 40), (0, 0, 0))
+    >>> _record_high_np(columns, 6, 8)
+    40.0
+    >>> _record_high_np(columns, 6, 8, 0, 1)
+    30.0
+    """
+    months, days = _np_months_and_days(columns, lo, hi)
+    high_temps = NUMPY.frombuffer(columns.high_temps)[lo:hi]
+    return float(high_temps[(months == m) & (days == d)].max())
+
+
+def _monthly_average_py(columns: WeatherColumns, attribute: str, lo: int = 0,
+                        hi: Optional[int] = None
+                        ) -> dict[str, Optional[float]]:
+    """Return the average of the <attribute> temperatures in <columns> for
+    each month, in the same form as HistoricalWeather.monthly_average, by
+    looking at each day in turn.
+
+    Only the days at positions <lo> up to but not including <hi> in
+    <columns> are looked at. If <hi> is None, every day from <lo> on is.
+
+    Preconditions:
+    - attribute in TEMPERATURES
+
+    >>> columns = WeatherColumns()
+    >>> columns.append(date(2023, 1, 1).toordinal(), (1, 11, 30), (0, 0, 0))
+    >>> columns.append(date(2024, 1, 18).toordinal(), (1, 0, 30), (0, 0, 0))
+    >>> _monthly_average_py(columns, 'low_temp')['Jan']
+    5.5
+    >>> _monthly_average_py(columns, 'low_temp', 1)['Jan']
+    0.0
+    """
+    values = columns.column(attribute)
+    totals = [0.0] * 12
+    counts = [0] * 12
+
+    for i in range(lo, len(columns) if hi is None else hi):
+        month_num = date.fromordinal(columns.days[i]).month - 1
+        totals[month_num] += values[i]
+        counts[month_num] += 1
+
+    monthly_avg = {}
+    for month_num in range(12):
+        if counts[month_num] > 0:
+            monthly_avg[MONTH_NAMES[month_num]] = (totals[month_num]
+                                                   / counts[month_num])
+        else:
+            monthly_avg[MONTH_NAMES[month_num]] = None
+
+    return monthly_avg
+
+
+def _monthly_average_np(columns: WeatherColumns, attribute: str, lo: int = 0,
+                        hi: Optional[int] = None
+                        ) -> dict[str, Optional[float]]:
+    """Return the same result as _monthly_average_py, computed with NumPy.
+
+    >>> columns = WeatherColumns()
+    >>> columns.append(date(2023, 1, 1).toordinal(), (1, 11, 30), (0, 0, 0))
+    >>> columns.append(date(2024, 1, 18).toordinal(), (1, 0, 30), (0, 0, 0))
+    >>> _monthly_average_np(columns, 'low_temp')['Jan']
+    5.5
+    >>> _monthly_average_np(columns, 'low_temp', 1)['Jan']
+    0.0
+    """
+    months = _np_months_and_days(columns, lo, hi)[0]
+    values = NUMPY.frombuffer(columns.column(attribute))[lo:hi]
+    # bincount adds the values up one at a time in order, just like the
+    # loop in _monthly_average_py, so the totals are exactly the same.
+    totals = NUMPY.bincount(months - 1, weights=values, minlength=12)
+    counts = NUMPY.bincount(months - 1, minlength=12)
+
+    monthly_avg = {}
+    for month_num in range(12):
+        if counts[month_num] > 0:
+            monthly_avg[MONTH_NAMES[month_num]] = float(totals[month_num]
+                                                        / counts[month_num])
+        else:
+            monthly_avg[MONTH_NAMES[month_num]] = None
+
+    return monthly_avg
+
+
+def _contiguous_precipitation_py(columns: WeatherColumns, lo: int = 0,
+                                 hi: Optional[int] = None
+                                 ) -> tuple[date, int]:
+    """Return the start date and length of the longest sequence of
+    consecutive days in <columns> that had precipitation, as
+    HistoricalWeather.contiguous_precipitation does, by looking at each day in
+    turn. If there is a tie, return the earliest of the tied sequences.
+
+    Only the days at positions <lo> up to but not including <hi> in
+    <columns> are looked at. If <hi> is None, every day from <lo> on is.
+
+    Preconditions:
+    - There is at least one day at the given positions in columns.
+
+    >>> columns = WeatherColumns()
+    >>> for day in [3, 5, 6]:
+    ...     columns.append(date(2024, 4, day).toordinal(), (0, 0, 0),
+    ...                    (-1, 0, 0))
+    >>> _contiguous_precipitation_py(columns)
+    (datetime.date(2024, 4, 5), 2)
+    >>> _contiguous_precipitation_py(columns, 0, 2)
+    (datetime.date(2024, 4, 3), 1)
+    """
+    runs = PrecipitationRuns()
+    runs.add_many((ordinal, precipitation != 0 or trace & PRECIP_TRACE != 0)
+                  for ordinal, precipitation, trace in islice(
+                      zip(columns.days, columns.precipitation, columns.trace),
+                      lo, hi))
+    return runs.longest()
+
+
+def _contiguous_precipitation_np(columns: WeatherColumns, lo: int = 0,
+                                 hi: Optional[int] = None
+                                 ) -> tuple[date, int]:
+    """Return the same result as _contiguous_precipitation_py, computed with
+    NumPy.
+
+    >>> columns = WeatherColumns()
+    >>> for day in [3, 5, 6]:
+    ...     columns.append(date(2024, 4, day).toordinal(), (0, 0, 0),
+    ...                    (-1, 0, 0))
+    >>> _contiguous_precipitation_np(columns)
+    (datetime.date(2024, 4, 5), 2)
+    >>> _contiguous_precipitation_np(columns, 0, 2)
+    (datetime.date(2024, 4, 3), 1)
+    """
+    return _longest_wet_run_np(
+        NUMPY.frombuffer(columns.days, dtype=NUMPY.int64)[lo:hi],
+        _np_wet(columns, lo, hi))
+
+
+def _run_precipitation_py(columns: RunColumns, lo: int = 0,
+                          hi: Optional[int] = None) -> tuple[date, int]:
+    """Return the start date and length of the longest sequence of
+    consecutive days in <columns> that had precipitation, as
+    _contiguous_precipitation_py does. If there is a tie, return the
+    earliest of the tied sequences.
+
+    Only the days at positions <lo> up to but not including <hi> in
+    <columns> are looked at. If <hi> is None, every day from <lo> on is.
+
+    Preconditions:
+    - There is at least one day at the given positions in columns.
+
+    >>> columns = RunColumns()
+    >>> for day in [3, 5, 6]:
+    ...     columns.append(date(2024, 4, day).toordinal(), (0, 0, 0),
+    ...                    (-1, 0, 0))
+    >>> _run_precipitation_py(columns)
+    (datetime.date(2024, 4, 5), 2)
+    >>> _run_precipitation_py(columns, 0, 2)
+    (datetime.date(2024, 4, 3), 1)
+    """
+    runs = PrecipitationRuns()
+    runs.add_many((ordinal, precipitation != 0 or trace & PRECIP_TRACE != 0)
+                  for ordinal, precipitation, trace in zip(
+                      columns.ordinals(lo, hi),
+                      islice(columns.precipitation, lo, hi),
+                      islice(columns.trace, lo, hi)))
+    return runs.longest()
+
+
+def _run_precipitation_np(columns: RunColumns, lo: int = 0,
+                          hi: Optional[int] = None) -> tuple[date, int]:
+    """Return the same result as _run_precipitation_py, computed with NumPy.
+
+    >>> columns = RunColumns()
+    >>> for day in [3, 5, 6]:
+    ...     columns.append(date(2024, 4, day).toordinal(), (0, 0, 0),
+    ...                    (-1, 0, 0))
+    >>> _run_precipitation_np(columns)
+    (datetime.date(2024, 4, 5), 2)
+    >>> _run_precipitation_np(columns, 0, 2)
+    (datetime.date(2024, 4, 3), 1)
+    """
+    hi = len(columns) if hi is None else hi
+    runs = list(columns.runs(lo, hi))
+    # Each day's ordinal is that of the start of its run plus how far into
+    # the run it is.
+    offsets = NUMPY.array([ordinal - start for ordinal, start, _ in runs],
+                          dtype=NUMPY.int64)
+    days = NUMPY.repeat(offsets, [stop - start for _, start, stop in runs]) \
+        + NUMPY.arange(lo, hi, dtype=NUMPY.int64)
+    return _longest_wet_run_np(days, _np_wet(columns, lo, hi))
+
+
+def _np_wet(columns: Union[WeatherColumns, RunColumns], lo: int,
+            hi: Optional[int]) -> object:
+    """Return a NumPy array of whether each day at positions <lo> up to but
+    not including <hi> in <columns> had precipitation, including trace
+    amounts.
+    """
+    return ((NUMPY.frombuffer(columns.precipitation)[lo:hi] != 0)
+            | (NUMPY.frombuffer(columns.trace, dtype=NUMPY.uint8)[lo:hi]
+               & PRECIP_TRACE != 0))
+
+
+def _longest_wet_run_np(days: object, wet: object) -> tuple[date, int]:
+    """Return the start date and length of the longest sequence of
+    consecutive days that had precipitation, as PrecipitationRuns.longest
+    does, where <days> is a NumPy array of ordinals in increasing order and
+    <wet> is a NumPy array of whether each of those days had precipitation.
+
+    Preconditions:
+    - len(days) == len(wet) > 0
+    """
+    wet_days = days[wet]
+    if len(wet_days) == 0:
+        return date.fromordinal(int(days[0])), 1
+
+    # A new sequence starts wherever a day with precipitation does not
+    # directly follow the previous day with precipitation.
+    starts = NUMPY.concatenate(
+        ([0], NUMPY.flatnonzero(NUMPY.diff(wet_days) != 1) + 1))
+    lengths = NUMPY.diff(NUMPY.append(starts, len(wet_days)))
+    # argmax picks the first of any tied maximums, so the earliest sequence.
+    longest = int(NUMPY.argmax(lengths))
+    return (date.fromordinal(int(wet_days[starts[longest]])),
+            int(lengths[longest]))
+
+
+def _percentage_snowfall_py(columns: WeatherColumns, lo: int = 0,
+                            hi: Optional[int] = None) -> float:
+    """Return the fraction of the snowfall and rainfall in <columns> that
+    was snowfall, not counting trace amounts, by adding up the days exactly
+    with math.fsum.
+
+    Only the days at positions <lo> up to but not including <hi> in
+    <columns> are counted. If <hi> is None, every day from <lo> on is.
+
+    Preconditions:
+    - Some day at the given positions in columns has snowfall > 0 or
+      rainfall > 0 or both.
+
+    >>> columns = WeatherColumns()
+    >>> columns.append(1, (0, 0, 0), (1, -1, 1))
+    >>> columns.append(2, (0, 0, 0), (3, 3, 0))
+    >>> _percentage_snowfall_py(columns)
+    0.25
+    >>> _percentage_snowfall_py(columns, 1)
+    0.0
+    """
+    snowfall = math.fsum(islice(columns.snowfall, lo, hi))
+    rainfall = math.fsum(islice(columns.rainfall, lo, hi))
+    return snowfall / (snowfall + rainfall)
+
+
+def _percentage_snowfall_np(columns: WeatherColumns, lo: int = 0,
+                            hi: Optional[int] = None) -> float:
+    """Return the same result as _percentage_snowfall_py, for when NumPy is
+    used.
+
+    NumPy's sum adds up the days pairwise, which can round differently, and
+    NumPy has no exact sum, so the days are added up with math.fsum as in
+    _percentage_snowfall_py, which is quicker than converting them first.
+
+    >>> columns = WeatherColumns()
+    >>> columns.append(1, (0, 0, 0), (1, -1, 1))
+    >>> columns.append(2, (0, 0, 0), (3, 3, 0))
+    >>> _percentage_snowfall_np(columns)
+    0.25
+    >>> _percentage_snowfall_np(columns, 1)
+    0.0
+    """
+    return _percentage_snowfall_py(columns, lo, hi)
 
-        for locations in self._histories.values():
-            result += f'{locations}\n'
 
-        return result.strip()
+def _np_months_and_days(columns: WeatherColumns, lo: int = 0,
+                        hi: Optional[int] = None) -> tuple:
+    """Return two NumPy arrays holding the month (1-12) and the day of the
+    month of each date at positions <lo> up to but not including <hi> in
+    <columns>.
+    """
+    # NumPy counts days from Jan 1, 1970.
+    dates = (NUMPY.frombuffer(columns.days, dtype=NUMPY.int64)[lo:hi]
+             - date(1970, 1, 1).toordinal()).astype('datetime64[D]')
+    month_starts = dates.astype('datetime64[M]')
+    months = (month_starts - dates.astype('datetime64[Y]')).astype(int) + 1
+    days = (dates - month_starts).astype(int) + 1
+    return months, days
 
-    def add_history(self, hw: HistoricalWeather) -> None:
-        """Add a location to this Country. <hw> is the location's weather
-        history, and hw.name is the location's name.
 
-        If a location with the name hw.name is already recorded in this Country,
-        then do nothing (i.e. do not change the data that is already present
-        for that location).
+def great_circle_distance(point1: tuple[float, float],
+                          point2: tuple[float, float]) -> float:
+    """Return the distance in km along the surface of the Earth between
+    <point1> and <point2>, each a (latitude, longitude) pair, using the
+    haversine formula.
 
-        >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
-        >>> toronto_weather = HistoricalWeather('YYZ', (43.6529, -79.3849))
-        >>> toronto_weather.add_weather(date.today(), weather)
-        >>> canada = Country('Canada')
-        >>> canada.add_history(toronto_weather)
-        >>> yyz = canada.retrieve_history('YYZ')
-        >>> yyz.retrieve_weather(date.today()).avg_temp == 13
-        True
-        """
-        if hw.name not in self._histories:
-            self._histories[hw.name] = hw
+    >>> round(great_circle_distance((43.6529, -79.3849), (45.47, -73.74)))
+    491
+    """
+    lat1, long1 = math.radians(point1[0]), math.radians(point1[1])
+    lat2, long2 = math.radians(point2[0]), math.radians(point2[1])
+    haversine = (math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1)
+                 * math.cos(lat2) * math.sin((long2 - long1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(haversine)))
 
-    def retrieve_history(self, name: str) -> Optional[HistoricalWeather]:
-        """Return the weather history for the location called <name>, or
-        None if no such location has been recorded in this Country.
 
-        >>> weather = DailyWeather((13, 9, 20), (5, 0, 0))
-        >>> toronto_weather = HistoricalWeather('YYZ', (43.6529, -79.3849))
-        >>> toronto_weather.add_weather(date.today(), weather)
-        >>> canada = Country('Canada')
-        >>> canada.add_history(toronto_weather)
-        >>> yyz = canada.retrieve_history('YYZ')
-        >>> yyz.retrieve_weather(date.today()).avg_temp == 13
-        True
-        """
-        if name in self._histories:
-            return self._histories[name]
-        else:
-            return None
+def _grid_cell(lat: float, long: float) -> tuple[int, int]:
+    """Return the (row, column) of the StationIndex grid cell that holds
+    latitude <lat> and longitude <long>.
 
-    def snowiest_location(self) -> Union[tuple[str, float], tuple[None, None]]:
-        """Return the name of location with the highest percentage snowfall in
-        this Country, and its percentage snowfall.
+    >>> _grid_cell(-90, -180), _grid_cell(90, 180)
+    ((0, 0), (179, 0))
+    """
+    rows, columns = _grid_size()
+    return (min(int((lat + 90) // GRID_DEGREES), rows - 1),
+            int((long + 180) // GRID_DEGREES) % columns)
 
-        In the case of a tie, any one of the tied locations can be returned.
 
-        If there are no locations in this Country, return (None, None).
+def _grid_size() -> tuple[int, int]:
+    """Return the number of rows and columns in the StationIndex grid."""
+    return math.ceil(180 / GRID_DEGREES), math.ceil(360 / GRID_DEGREES)
 
-        Preconditions:
-        - For all locations in this Country, at least one day's
-          weather has been recorded where snowfall > 0 or rainfall > 0
-          or both.
 
-        >>> weather = DailyWeather((13, 9, 20), (5, 2, 3))
-        >>> other_weather = DailyWeather((13, 4, 20), (5, 2, 2))
-        >>> toronto_weather = HistoricalWeather('Toronto', (43.6529, -79.3849))
-        >>> mtl_weather = HistoricalWeather('Montreal', (45.47, -73.74))
-        >>> toronto_weather.add_weather(date.today(), weather)
-        >>> mtl_weather.add_weather(date.today(), other_weather)
-        >>> canada = Country('Canada')
-        >>> canada.add_history(toronto_weather)
-        >>> canada.add_history(mtl_weather)
-        >>> result = canada.snowiest_location()
-        >>> result[0]
-        'Toronto'
-        >>> result[1]
-        0.6
-        """
-        if not self._histories:
-            return None, None
-        else:
-            location = None
-            percent_snowfall = 0.0
+def _grid_cells(south: float, west: float, north: float,
+                east: float) -> Iterator[tuple[int, int]]:
+    """Yield each StationIndex grid cell that overlaps the part of the
+    Earth with latitude from <south> to <north> and longitude from <west> to
+    <east>. Longitudes outside -180 to 180 wrap around the Earth.
 
-            for locations in self._histories:
-                if (self._histories[locations].percentage_snowfall()
-                        > percent_snowfall):
-                    location = locations
-                    percent_snowfall = (
-                        self._histories[locations].percentage_snowfall())
+    Preconditions:
+    - -90 <= south <= north <= 90
+    - west <= east
 
-            return location, percent_snowfall
+    >>> list(_grid_cells(0.5, 179.5, 0.5, 180.5))
+    [(90, 359), (90, 0)]
+    """
+    columns = _grid_size()[1]
+    first_row = _grid_cell(south, 0)[0]
+    last_row = _grid_cell(north, 0)[0]
+    first_column = math.floor((west + 180) / GRID_DEGREES)
+    last_column = min(math.floor((east + 180) / GRID_DEGREES),
+                      first_column + columns - 1)
+    for row in range(first_row, last_row + 1):
+        for column in range(first_column, last_column + 1):
+            yield row, column % columns
 
-    def generate_summary(self) -> None:
-        """Write a summary of interesting statistics for the locations
-        in this Country to a markdown file called report.md
 
-        Precondition:
-        - All locations in this Country have at least one row of data
-          recorded in December of any year
-        - Data has been recorded for Dec 25 in at least one year
-        """
-        headers = ["Location", "record high <br/> for Dec 25",
-                   "december <br/> average",
-                   "contiguous <br/> precipitation",
-                   "percentage <br/> snowfall"]
-
-        with open("report.md", 'w') as f:
-            f.write(" | ".join(headers) + "\n")
-            f.write(":|-".join(["-" * len(col) for col in headers]) + ":\n")
-            for key in self._histories:
-                loc = self._histories[key]
-                (rec_high, mon_avg,
-                 ctgs_prec, perc_snow) = (loc.record_high(12, 25),
-                                          loc.monthly_average(),
-                                          loc.contiguous_precipitation(),
-                                          loc.percentage_snowfall())
-                f.write(f"{key : <20} | {rec_high : <10.4} | "
-                        f"{mon_avg['Dec']} | "
-                        f"{ctgs_prec[1] : <24} | {perc_snow : <18.2}\n")
-
-
-def load_data(f: TextIO) -> Optional[HistoricalWeather]:
+def _grid_ring(row: int, column: int,
+               ring: int) -> Iterator[tuple[int, int]]:
+    """Yield each StationIndex grid cell in the block of cells <ring> steps
+    out from the cell (<row>, <column>) that is not in the block <ring> - 1
+    steps out. See _grid_block for the cells in each block.
+
+    >>> list(_grid_ring(90, 0, 0))
+    [(90, 0)]
+    >>> len(list(_grid_ring(90, 0, 1))), len(list(_grid_ring(179, 0, 1)))
+    (8, 360)
+    """
+    rows = _grid_size()[0]
+    inner_columns = set(_block_columns(row, column, ring - 1))
+    for r in range(max(row - ring, 0), min(row + ring, rows - 1) + 1):
+        for c in _block_columns(row, column, ring):
+            if abs(r - row) == ring or c not in inner_columns:
+                yield r, c
+
+
+def _grid_block(row: int, ring: int) -> tuple[float, float, int]:
+    """Return the (south, north, half_width) of the block of StationIndex
+    grid cells <ring> steps out from a cell in row <row>.
+
+    The block holds the rows at most <ring> away from <row>, which reach
+    from latitude south to latitude north, and the columns at most
+    half_width away from the cell's column. Cells are narrower towards the
+    poles, so more columns than rows are taken to keep the block about as
+    wide as it is high; once the block reaches a pole, it takes every
+    column, since the points across the pole are as near as those beside it.
+    The block grows with <ring>.
+    """
+    columns = _grid_size()[1]
+    south = (row - ring) * GRID_DEGREES - 90
+    north = (row + ring + 1) * GRID_DEGREES - 90
+    if south <= -90 or north >= 90:
+        return south, north, columns
+    else:
+        widest = math.radians(max(abs(south), abs(north)))
+        return south, north, min(columns, round(ring / math.cos(widest)))
+
+
+def _block_columns(row: int, column: int, ring: int) -> list[int]:
+    """Return the distinct columns of the block of StationIndex grid cells
+    <ring> steps out from the cell (<row>, <column>), or no columns if
+    <ring> is negative.
+    """
+    columns = _grid_size()[1]
+    half_width = _grid_block(row, ring)[2] if ring >= 0 else -1
+    if 2 * half_width + 1 >= columns:
+        return list(range(columns))
+    else:
+        return [(column + offset) % columns
+                for offset in range(-half_width, half_width + 1)]
+
+
+def _grid_bound(lat: float, long: float, row: int, column: int,
+                ring: int) -> float:
+    """Return a lower bound on the distance from latitude <lat> and
+    longitude <long>, which is in the grid cell (<row>, <column>), to any
+    point outside the block of cells <ring> steps out from that cell.
+    Return math.inf if the block covers the whole Earth.
+
+    A path to a point outside the block must cross one of its edges, so the
+    bound is the distance to the nearest edge: the parallels at its north
+    and south, and the half-meridians at its east and west.
+    """
+    columns = _grid_size()[1]
+    south, north, half_width = _grid_block(row, ring)
+    edges = [math.inf]
+    if south > -90:
+        edges.append(math.radians(lat - south))
+    if north < 90:
+        edges.append(math.radians(north - lat))
+    if 2 * half_width + 1 < columns:
+        long = (long + 180) % 360 - 180
+        for width in (long - ((column - half_width) * GRID_DEGREES - 180),
+                      (column + half_width + 1) * GRID_DEGREES - 180 - long):
+            if width >= 90:
+                # The nearest point on the half-meridian is a pole.
+                edges.append(math.pi / 2 - abs(math.radians(lat)))
+            else:
+                edges.append(math.asin(math.sin(math.radians(width))
+                                       * math.cos(math.radians(lat))))
+    return EARTH_RADIUS * max(0.0, min(edges))
+
+
+@_profiled('load_data', _loaded_days)
+def load_data(f: TextIO, columnar: bool = False) \
+        -> Optional[HistoricalWeather]:
     """Return a HistoricalWeather record representing the weather data in the
     already open csv file <f>.
 
     If <f> contains no lines of data aside from its header, return None.
+    If <columnar> is True, the record returned is a ColumnarWeather.
 
     The data might not consistently cover consecutive days, but will be
     in order from the oldest dates to most recent dates.
@@ -621,33 +5178,144 @@ def load_data(f: TextIO) -> Optional[HistoricalWeather]:
     A "T" in the file indicates that there were trace values.
     Record trace values as -1 in the corresponding attribute.
 
+    <f> is read one line at a time rather than all at once, so the memory
+    needed does not grow with the size of the file, and only the columns up
+    to LAST_COLUMN_USED are split out of each line.
+
     Preconditions:
     - f is open and is set to the beginning of the file.
     - The first line of f is a header, and the remaining lines
       follow the format specified in the handout.
     - There may be no lines of data, but there is at least a header.
+
+    >>> from io import StringIO
+    >>> header = 'Longitude (x),Latitude (y),Station Name,...\\n'
+    >>> row = '-79.4,43.67,TORONTO CITY,6158355,2024-07-13,2024,7,13,,' \\
+    ...       '20.3,,9.2,,13.1,,4.9,,0.0,,1.2,,0.0,T,1.2,,0,,,,,\\n'
+    >>> toronto = load_data(StringIO(header + row))
+    >>> print(toronto)
+    TORONTO CITY (43.67, -79.40):
+    2024-07-13: Average: 13.10 Low: 9.20 High: 20.30 Precipitation: 1.20 \
+Snow: -1.00 Rain: 1.20
+    >>> load_data(StringIO(header)) is None
+    True
     """
-    lines = f.readlines()[1:]
-    if not lines:
-        return None
+    f.readline()
 
-    for line in lines:
-        data = line.split(',')
-        if data[STN_NAME]:
-            try:
-                result = HistoricalWeather(data[STN_NAME],
-                                           (float(data[LAT]),
-                                            float(data[LONG])))
+    # Rows that come before the first row naming the station, which cannot
+    # be recorded until the HistoricalWeather has been made.
+    unnamed_rows = []
+    return _load_lines(f, columnar, None, unnamed_rows)
+
+
+def _load_lines(lines: Iterable[str], columnar: bool,
+                result: Optional[HistoricalWeather],
+                unnamed_rows: list[list[str]]) -> Optional[HistoricalWeather]:
+    """Record the weather in <lines>, rows of a station's csv file without
+    its header, in <result> and return it.
+
+    If <result> is None, a HistoricalWeather (or a ColumnarWeather if
+    <columnar> is True) is made from the first row naming the station, and
+    returned. Rows that come before it are kept in <unnamed_rows> until then,
+    and stay there if no row names the station.
+    """
+    # The time taken by each step of loading the rows, and the number of
+    # rows it handled, recorded in PROFILER while PROFILE is True.
+    profile = PROFILE
+    timings = {'split': [0.0, 0], 'parse': [0.0, 0]}
+
+    rows = (line.split(',', LAST_COLUMN_USED + 1) for line in lines)
+    if profile:
+        rows = _timed(rows, timings['split'])
+    if result is None:
+        for data in rows:
+            unnamed_rows.append(data)
+            result = _new_history(data, columnar)
+            if result is not None:
                 break
+        else:
+            return None
+
+    # The rows are recorded in batches, so that a file in date order is
+    # appended a day at a time with no other checks (see add_weather_many).
+    split_before = timings['split'][0]
+    start = time.perf_counter()
+    for batch in (unnamed_rows, rows):
+        parsed = _parsed_rows(batch)
+        if profile:
+            parsed = _timed(parsed, timings['parse'])
+        result.add_weather_many(parsed)
+    unnamed_rows.clear()
+
+    if profile:
+        # Each step's time includes the time of the steps it pulls its rows
+        # from, which is taken off.
+        elapsed = time.perf_counter() - start
+        split, parse = timings['split'], timings['parse']
+        PROFILER.record('load_data.split', split[0], split[1])
+        PROFILER.record('load_data.parse',
+                        parse[0] - (split[0] - split_before), parse[1])
+        PROFILER.record('load_data.record', elapsed - parse[0], parse[1])
+    return result
+
+
+def _timed(items: Iterable, timing: list) -> Iterator:
+    """Yield each of <items>, adding the time, in seconds, taken to get each
+    one to timing[0], and the number of items to timing[1].
+    """
+    items = iter(items)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(items)
+        except StopIteration:
+            timing[0] += time.perf_counter() - start
+            return
+        timing[0] += time.perf_counter() - start
+        timing[1] += 1
+        yield item
+
+
+def _new_history(data: list[str], columnar: bool) \
+        -> Optional[HistoricalWeather]:
+    """Return a new HistoricalWeather, or a ColumnarWeather if <columnar> is
+    True, for the station named in <data>, one row of a csv file split into
+    its columns.
+
+    If the row does not name the station or give its coordinates, return
+    None.
+    """
+    station = _station(data)
+    if station is None:
+        return None
+    history_type = ColumnarWeather if columnar else HistoricalWeather
+    return history_type(*station)
 
-            except ValueError:
-                pass
 
-    for line in lines:
-        data = line.split(',')
-        if not (data[LAT] and data[LONG] and data[STN_NAME]):
+def _station(data: list[str]) -> Optional[tuple[str, tuple[float, float]]]:
+    """Return the name and coordinates of the station named in <data>, one
+    row of a csv file split into its columns, or None if the row does not
+    name the station or give its coordinates.
+    """
+    if data[STN_NAME]:
+        try:
+            return (sys.intern(data[STN_NAME]),
+                    (float(data[LAT]), float(data[LONG])))
+        except ValueError:
             pass
+    return None
+
 
+def _parsed_rows(rows: Iterable[list[str]]) \
+        -> Iterator[tuple[date, tuple[float, float, float],
+                          tuple[float, float, float]]]:
+    """Yield the date, temperature statistics and precipitation statistics
+    of each of <rows>, rows of a csv file split into their columns, for
+    HistoricalWeather.add_weather_many.
+
+    Rows missing any of the data needed are skipped.
+    """
+    for data in rows:
         try:
             precip = _replace_trace(float(data[TOTAL_PRECIP]),
                                     data[TOTAL_PRECIP_FLAG])
@@ -656,19 +5324,96 @@ def load_data(f: TextIO) -> Optional[HistoricalWeather]:
             snow = _replace_trace(float(data[TOTAL_SNOW]),
                                   data[TOTAL_SNOW_FLAG])
 
-            result.add_weather(
-                date(int(data[YEAR]), int(data[MONTH]), int(data[DAY])),
-                DailyWeather(
-                    (float(data[MEAN_TEMP]),
-                     float(data[MIN_TEMP]), float(data[MAX_TEMP])),
-                    (precip, rain, snow)
-                )
-            )
+            if INTERN_DATES:
+                d = interned_date(data[YEAR], data[MONTH], data[DAY])
+            else:
+                d = date(int(data[YEAR]), int(data[MONTH]), int(data[DAY]))
+
+            yield (d,
+                   (float(data[MEAN_TEMP]),
+                    float(data[MIN_TEMP]), float(data[MAX_TEMP])),
+                   (precip, rain, snow))
 
         except ValueError:
             pass
 
-    return result
+
+def _tenths(value: float) -> Optional[int]:
+    """Return <value> as a whole number of tenths that fits in a RunColumns
+    temperature column of typecode 'h', or None if it cannot be stored
+    exactly that way.
+
+    -0.0 is stored as -2 ** 15, so that it still prints as -0.00.
+
+    >>> _tenths(13.1), _tenths(-0.0), _tenths(13.15), _tenths(4000.0)
+    (131, -32768, None, None)
+    """
+    if value == 0 and math.copysign(1, value) < 0:
+        return -2 ** 15
+    if not math.isfinite(value):
+        return None
+    tenths = round(value * 10)
+    if -2 ** 15 < tenths < 2 ** 15 and tenths / 10 == value:
+        return tenths
+    return None
+
+
+def _from_tenths(tenths: int) -> float:
+    """Return the temperature stored as <tenths> by _tenths.
+
+    >>> _from_tenths(131), _from_tenths(-2 ** 15)
+    (13.1, -0.0)
+    """
+    if tenths == -2 ** 15:
+        return -0.0
+    return tenths / 10
+
+
+def _exact_units(value: float) -> int:
+    """Return the finite float <value> as a whole number of 2 ** -1074 units.
+
+    Adding these up gives the exact sum of the floats, and dividing the sum
+    by _EXACT_SCALE rounds it to the nearest float only once.
+
+    >>> _exact_units(0.5) == _EXACT_SCALE // 2
+    True
+    >>> (_exact_units(0.1) + _exact_units(0.2)) / _EXACT_SCALE
+    0.30000000000000004
+    """
+    numerator, denominator = float(value).as_integer_ratio()
+    return numerator * (_EXACT_SCALE // denominator)
+
+
+def _snowfall_fraction(snowfall_units: int, rainfall_units: int) -> float:
+    """Return total snowfall / (total snowfall + total rainfall), given the
+    totals as whole numbers of 1 / _EXACT_SCALE units (see _exact_units).
+
+    Each total is rounded to the nearest float before dividing, as if it had
+    been added up with math.fsum.
+
+    >>> _snowfall_fraction(_exact_units(1.0), _exact_units(3.0))
+    0.25
+    """
+    snowfall = snowfall_units / _EXACT_SCALE
+    return snowfall / (snowfall + rainfall_units / _EXACT_SCALE)
+
+
+def _trace_mask(precipitation: float, rainfall: float,
+                snowfall: float) -> int:
+    """Return the WeatherColumns trace mask for a day with the given
+    precipitation, rainfall and snowfall, where -1 means trace amounts.
+
+    >>> _trace_mask(-1, 0, -1) == PRECIP_TRACE | SNOW_TRACE
+    True
+    """
+    trace = 0
+    if precipitation == -1:
+        trace |= PRECIP_TRACE
+    if rainfall == -1:
+        trace |= RAIN_TRACE
+    if snowfall == -1:
+        trace |= SNOW_TRACE
+    return trace
 
 
 def _replace_trace(value: float, flag: str) -> float:
@@ -679,27 +5424,452 @@ def _replace_trace(value: float, flag: str) -> float:
         return value
 
 
-def load_country(folder_name: str, name: str) -> Country:
+@_profiled('load_country', _country_locations)
+def load_country(folder_name: str, name: str, columnar: bool = False,
+                 workers: Optional[int] = 1, chunksize: int = 4) -> Country:
     """Return a Country called <name> that contains all the historical weather
      data stored in the files that are in the folder called <folder_name>.
 
-    Precondition:
+    If <columnar> is True, each location's history is a ColumnarWeather.
+
+    If <workers> is more than 1, the files are loaded in parallel by that
+    many worker processes, each handed <chunksize> files at a time. If it is
+    None, one worker process per CPU is used. Either way, the histories are
+    added to the Country in the same order as when loading one file at a
+    time, so if two files hold data for locations with the same name, the
+    first one listed in the folder is kept.
+
+    Preconditions:
+    - Each file in the folder called folder_name:
+        - is a .csv files that obeys the format specified in the handout
+        - contains data for one location within this Country
+    - workers is None or workers >= 1
+    - chunksize >= 1
+    """
+    paths = _station_paths(folder_name)
+
+    country = Country(name)
+    if workers == 1:
+        for path in paths:
+            history = _load_file(path, columnar)
+            if history is not None:
+                country.add_history(history)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # Executor.map gives back results in the order of paths, no
+            # matter which worker finishes first.
+            for history in executor.map(_load_file, paths,
+                                        [columnar] * len(paths),
+                                        chunksize=chunksize):
+                if history is not None:
+                    country.add_history(history)
+
+    return country
+
+
+def summarize_data(f: TextIO) -> Optional[StationSummary]:
+    """Return a StationSummary of the weather data in the already open csv
+    file <f>, the same as load_data(f).summarize(), without recording the
+    weather anywhere.
+
+    Each row is parsed and added to the summary as soon as it is read, and
+    then dropped, so the memory needed does not grow with the size of the
+    file. This relies on the rows being in date order; a row for a date no
+    later than one already read is skipped, so a repeated date keeps its
+    first row, as in load_data.
+
+    If no row of <f> names the station, return None.
+
+    Preconditions:
+    - f obeys the preconditions of load_data.
+
+    >>> from io import StringIO
+    >>> header = 'Longitude (x),Latitude (y),Station Name,...\\n'
+    >>> row = '-79.4,43.67,TORONTO CITY,6158355,2023-12-{0},2023,12,{0},,' \\
+    ...       '2.0,,-3.0,,-0.5,,3.5,,0.0,,1.2,,0.8,,2.0,,0,,,,,\\n'
+    >>> summary = summarize_data(StringIO(header + row.format(24)
+    ...                                   + row.format(25)))
+    >>> summary.name, summary.record_high(), summary.percentage_snowfall()
+    ('TORONTO CITY', 2.0, 0.4)
+    >>> summary.report_row() == load_data(StringIO(
+    ...     header + row.format(24) + row.format(25))).summarize().report_row()
+    True
+    """
+    f.readline()
+    rows = (line.split(',', LAST_COLUMN_USED + 1) for line in f)
+
+    # Rows that come before the first row naming the station are summarized
+    # once the StationSummary has been made, as in load_data.
+    unnamed_rows = []
+    for data in rows:
+        unnamed_rows.append(data)
+        station = _station(data)
+        if station is not None:
+            summary = StationSummary(station[0])
+            break
+    else:
+        return None
+
+    summary.add_many(_parsed_rows(unnamed_rows))
+    summary.add_many(_parsed_rows(rows))
+    return summary
+
+
+def summarize_country(folder_name: str, path: str = 'report.md',
+                      workers: Optional[int] = 1, chunksize: int = 4) -> None:
+    """Write the same report to the markdown file called <path> as
+    load_country(folder_name, name).generate_summary(path) does, without
+    loading any weather history.
+
+    Each file in the folder called <folder_name> is summarized with
+    summarize_data, so the memory needed is a StationSummary per station
+    rather than a history per station. <workers> and <chunksize> are as in
+    load_country, and the rows are in the same order either way.
+
+    Preconditions:
+    - The folder obeys the preconditions of load_country.
+    - Every location in the folder obeys the preconditions of
+      Country.generate_summary.
+    - workers is None or workers >= 1
+    - chunksize >= 1
+    """
+    paths = _station_paths(folder_name)
+
+    with open(path, 'w') as f:
+        _write_report_header(f)
+        if workers == 1:
+            _write_report_rows(f, map(_summarize_file, paths))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                _write_report_rows(f, executor.map(_summarize_file, paths,
+                                                   chunksize=chunksize))
+
+
+def _write_report_rows(f: TextIO,
+                       summaries: Iterable[Optional[StationSummary]]) -> None:
+    """Write the row of the report written by Country.generate_summary for
+    each of <summaries> to <f>, in order.
+
+    As in load_country, a summary for the same location as an earlier one,
+    or that is None because its file names no station, is left out.
+    """
+    names = set()
+    for summary in summaries:
+        if summary is not None and summary.name not in names:
+            names.add(summary.name)
+            f.write(summary.report_row())
+
+
+async def load_country_async(folder_name: str, name: str,
+                             columnar: bool = False, readers: int = 4,
+                             queue_size: int = 8,
+                             open_file: Optional[
+                                 Callable[[str], Awaitable[TextIO]]] = None
+                             ) -> Country:
+    """Return a Country called <name> that contains all the historical weather
+    data stored in the files that are in the folder called <folder_name>,
+    just as load_country does, reading the files while earlier ones are
+    being parsed.
+
+    Up to <readers> files are opened at once by <open_file>, which is given
+    the path of a file and returns it open for reading as text. By default,
+    each file is opened in a separate thread, so that waiting on a slow disk
+    or network mount does not hold up parsing. Files that have been opened
+    are handed to the parser through a queue of at most <queue_size> files,
+    and the parser reads each one a line at a time, as load_data does, and
+    closes it. Once <readers> + <queue_size> files have been opened but not
+    yet added to the Country, no more are opened until the earliest of them
+    has been, so the memory needed does not grow with the number of files in
+    the folder, and no file is ever held in memory whole.
+
+    The histories are added to the Country in the same order as by
+    load_country, so if two files hold data for locations with the same
+    name, the first one listed in the folder is kept.
+
+    Preconditions:
     - Each file in the folder called folder_name:
         - is a .csv files that obeys the format specified in the handout
         - contains data for one location within this Country
+    - readers >= 1
+    - queue_size >= 1
+
+    >>> import tempfile
+    >>> folder = tempfile.mkdtemp()
+    >>> header = 'Longitude (x),Latitude (y),Station Name,...\\n'
+    >>> row = '-79.4,43.67,{0},6158355,2024-07-13,2024,7,13,,' \\
+    ...       '20.3,,9.2,,13.1,,4.9,,0.0,,1.2,,0.0,T,1.2,,0,,,,,\\n'
+    >>> for station in ['TORONTO CITY', 'OTTAWA', 'MONTREAL']:
+    ...     with open(os.path.join(folder, station + '.csv'), 'w') as f:
+    ...         _ = f.write(header + row.format(station))
+    >>> async def slow_open(path: str) -> TextIO:
+    ...     await asyncio.sleep(0.01)
+    ...     return open(path)
+    >>> canada = asyncio.run(load_country_async(folder, 'Canada', readers=2,
+    ...                                         queue_size=1,
+    ...                                         open_file=slow_open))
+    >>> str(canada) == str(load_country(folder, 'Canada'))
+    True
     """
+    if open_file is None:
+        open_file = _open_file_async
+    all_paths = _station_paths(folder_name)
+    paths = enumerate(all_paths)
+    queue = asyncio.Queue(maxsize=queue_size)
+    # Each file holds one of these from just before it is opened until its
+    # history has been added to the Country.
+    in_flight = asyncio.Semaphore(readers + queue_size)
+
+    async def open_files() -> None:
+        """Open files one after another and put them, or the error raised
+        while opening them, onto the queue, until there are no more files.
+        """
+        while True:
+            await in_flight.acquire()
+            # The semaphore hands out its places in turn, and no other task
+            # runs between acquiring one and taking the next file, so the
+            # files in flight are always the earliest ones not yet added.
+            try:
+                i, path = next(paths)
+            except StopIteration:
+                in_flight.release()
+                return
+            try:
+                await queue.put((i, await open_file(path)))
+            except (OSError, UnicodeDecodeError) as error:
+                await queue.put((i, error))
+
+    tasks = [asyncio.create_task(open_files()) for _ in range(readers)]
     country = Country(name)
-    for filename in os.listdir(folder_name):
-        # If there are any "dot files", ignore them.
-        if not filename.startswith('.'):
-            with open(os.path.join(folder_name, filename), 'r') as loc_file:
-                history = load_data(loc_file)
+    # The histories that have been loaded but are waiting for an earlier
+    # file to be added first, keyed by the position of their file.
+    loaded = {}
+    next_file = 0
+    try:
+        while next_file < len(all_paths):
+            i, f = await queue.get()
+            if isinstance(f, Exception):
+                raise f
+            with f:
+                loaded[i] = load_data(f, columnar)
+            while next_file in loaded:
+                history = loaded.pop(next_file)
                 if history is not None:
                     country.add_history(history)
+                next_file += 1
+                in_flight.release()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # Close any files that were opened but never parsed.
+        while not queue.empty():
+            f = queue.get_nowait()[1]
+            if not isinstance(f, Exception):
+                f.close()
+
+    return country
+
+
+def open_country(folder_name: str, name: str, columnar: bool = False,
+                 capacity: Optional[int] = None) -> Country:
+    """Return a Country called <name> for the files in the folder called
+    <folder_name>, without loading their weather histories yet.
+
+    Only each file's name and rows up to the first one naming its station
+    are read, for the station's name and coordinates. Each location's
+    weather history is loaded from its file the first time it is needed
+    (see load_data for <columnar>). If <capacity> is not None, at most that
+    many histories are kept loaded at once, and the least recently used one
+    is unloaded to make room for another (see Country.retrieve_history), so
+    a huge folder can be served in little memory.
+
+    As in load_country, if two files hold data for locations with the same
+    name, the first one listed in the folder is kept, and a file with no row
+    naming its station is left out.
+
+    Preconditions:
+    - The folder obeys the preconditions of load_country.
+    - capacity is None or capacity >= 1
+
+    >>> import os, tempfile
+    >>> folder = tempfile.mkdtemp()
+    >>> row = '{},43.6,{},0,2024-07-13,2024,7,13,,' \\
+    ...       '20.3,,9.2,,13.1,,4.9,,0.0,,1.2,,0.0,,1.2,,0,,,,,\\n'
+    >>> for station, long in [('TORONTO', '-79.4'), ('OTTAWA', '-75.7')]:
+    ...     with open(os.path.join(folder, station + '.csv'), 'w') as f:
+    ...         _ = f.write('Longitude (x),Latitude (y),Station Name,...\\n')
+    ...         _ = f.write(row.format(long, station))
+    >>> canada = open_country(folder, 'Canada', capacity=1)
+    >>> [name for name, _ in canada.nearest(43.6, -79.0)]
+    ['TORONTO']
+    >>> canada.retrieve_history('OTTAWA').record_high(7, 13)
+    20.3
+    """
+    country = Country(name, capacity)
+    for path in _station_paths(folder_name):
+        station = _scan_station(path)
+        if station is not None:
+            country.add_pending(station[0], station[1],
+                                partial(_load_file, path, columnar))
+    return country
+
+
+def _scan_station(path: str) -> Optional[tuple[str, tuple[float, float]]]:
+    """Return the name and coordinates of the station in the csv file at
+    <path>, from the first row that gives them, or None if no row does.
+    """
+    with open(path, 'r') as f:
+        f.readline()
+        for line in f:
+            station = _station(line.split(',', LAST_COLUMN_USED + 1))
+            if station is not None:
+                return station
+    return None
+
+
+def _station_paths(folder_name: str) -> list[str]:
+    """Return the paths of the station files in the folder called
+    <folder_name>, in the order they are listed.
+    """
+    # If there are any "dot files", ignore them.
+    return [os.path.join(folder_name, filename)
+            for filename in os.listdir(folder_name)
+            if not filename.startswith('.')]
+
+
+def _load_file(path: str, columnar: bool) -> Optional[HistoricalWeather]:
+    """Return the result of load_data for the csv file at <path>.
+    """
+    with open(path, 'r') as loc_file:
+        return load_data(loc_file, columnar)
+
+
+def _summarize_file(path: str) -> Optional[StationSummary]:
+    """Return the result of summarize_data for the csv file at <path>.
+    """
+    with open(path, 'r') as loc_file:
+        return summarize_data(loc_file)
+
+
+async def _open_file_async(path: str) -> TextIO:
+    """Return the text file at <path>, opened for reading in a separate
+    thread.
+    """
+    return await asyncio.to_thread(open, path, 'r')
+
+
+def open_snapshot(path: str, capacity: Optional[int] = None) -> Country:
+    """Return the Country saved in the snapshot file at <path> by
+    Country.save_snapshot.
+
+    The file is memory-mapped and only its index is read, so this takes
+    very little time no matter how big the file is. Each location's weather
+    history is read from the file the first time it is needed, as a
+    ColumnarWeather. If <capacity> is not None, at most that many histories
+    are kept loaded at once (see Country.retrieve_history).
+
+    Preconditions:
+    - path is a snapshot file written by Country.save_snapshot
+    - capacity is None or capacity >= 1
+
+    >>> import os, tempfile
+    >>> from io import StringIO
+    >>> header = 'Longitude (x),Latitude (y),Station Name,...\\n'
+    >>> row = '-79.4,43.67,TORONTO CITY,6158355,2024-07-{0},2024,7,{0},,' \\
+    ...       '20.3,,9.2,,13.1,,4.9,,0.0,,1.2,,0.0,T,1.2,,0,,,,,\\n'
+    >>> csv = header + row.format(13) + row.format(14) + row.format(17)
+    >>> canada = Country('Canada')
+    >>> canada.add_history(load_data(StringIO(csv)))
+    >>> path = os.path.join(tempfile.mkdtemp(), 'canada.snapshot')
+    >>> canada.save_snapshot(path)
+    >>> reopened = open_snapshot(path)
+    >>> str(reopened) == str(canada)
+    True
+    >>> toronto = reopened.retrieve_history('TORONTO CITY')
+    >>> toronto.contiguous_precipitation()[1], toronto.record_high(7, 17)
+    (2, 20.3)
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if _SNAPSHOT_HEADER.unpack_from(mapped)[0] != _SNAPSHOT_MAGIC:
+        raise ValueError(f'{path} is not a weather snapshot')
+    return _snapshot_country(mapped, capacity)
+
+
+def _snapshot_country(mapped: Union[mmap.mmap, memoryview],
+                      capacity: Optional[int] = None) -> Country:
+    """Return the Country saved in <mapped>, the contents of a snapshot
+    written by Country.save_snapshot, reading each location's weather
+    history from <mapped> the first time it is needed.
+
+    Preconditions:
+    - mapped holds a snapshot written by Country.save_snapshot
+    - capacity is None or capacity >= 1
+    """
+    _, name_length, station_count = _SNAPSHOT_HEADER.unpack_from(mapped)
+    offset = _SNAPSHOT_HEADER.size
+    country = Country(bytes(mapped[offset:offset + name_length]).decode(),
+                      capacity)
+    offset += name_length
+
+    for _ in range(station_count):
+        (name_offset, name_length, lat, long, rows,
+         data_offset) = _SNAPSHOT_ENTRY.unpack_from(mapped, offset)
+        offset += _SNAPSHOT_ENTRY.size
+        name = bytes(mapped[name_offset:name_offset + name_length]).decode()
+        country.add_pending(name, (lat, long),
+                            partial(_read_snapshot_station, mapped, name,
+                                    (lat, long), rows, data_offset))
 
     return country
 
 
+def _read_snapshot_station(mapped: Union[mmap.mmap, memoryview], name: str,
+                           coordinates: tuple[float, float], rows: int,
+                           offset: int) -> ColumnarWeather:
+    """Return the weather history for the location called <name> at
+    <coordinates>, whose <rows> days of data start at byte <offset> of the
+    snapshot <mapped>.
+    """
+    columns = WeatherColumns()
+    view = memoryview(mapped)
+    for column in (columns.days, columns.avg_temps, columns.low_temps,
+                   columns.high_temps, columns.precipitation,
+                   columns.rainfall, columns.snowfall, columns.trace):
+        end = offset + column.itemsize * rows
+        column.frombytes(view[offset:end])
+        if sys.byteorder == 'big':
+            column.byteswap()
+        offset = end
+    view.release()
+
+    history = ColumnarWeather(name, coordinates)
+    history.set_columns(columns)
+    return history
+
+
+def _align(offset: int) -> int:
+    """Return the smallest multiple of 8 that is at least <offset>.
+
+    >>> _align(16), _align(17)
+    (16, 24)
+    """
+    return (offset + 7) // 8 * 8
+
+
+def _little_endian(column: array) -> bytes:
+    """Return the contents of <column> as little-endian bytes.
+
+    >>> _little_endian(array('q', [1]))
+    b'\\x01\\x00\\x00\\x00\\x00\\x00\\x00\\x00'
+    """
+    if sys.byteorder == 'big':
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
 def generate_usage_example() -> Country:
     """Generate a toy example.
     """
@@ -720,11 +5890,21 @@ def generate_usage_example() -> Country:
 if __name__ == '__main__':
     CHECK_PYTA = False  # Set to False to disable pyta checking
     if CHECK_PYTA:
+        import python_ta
         python_ta.check_all(config={
-            'allowed-io': ['load_country', 'Country.generate_summary'],
+            'allowed-io': ['_load_file', 'open_snapshot',
+                           'Country.generate_summary', 'Country.save_snapshot',
+                           'StationFeed.refresh', 'ProfileRegistry.dump',
+                           '_scan_station', 'summarize_country',
+                           '_summarize_file'],
             'allowed-import-modules': [
                 'doctest', 'python_ta', 'python_ta.contracts', 'typing',
-                'datetime', 'os'],
+                'datetime', 'os', 'array', 'bisect', 'copy', 'math',
+                'concurrent.futures', 'functools', 'heapq', 'mmap', 'struct',
+                'sys', 'collections', 'inspect', 'asyncio',
+                'json', 'time', 'multiprocessing.shared_memory',
+                'contextvars', 'random', 'itertools', 'importlib',
+                'types'],
             'disable': ['E1136'],
             'max-attributes': 15,
         })